@@ -1,10 +1,146 @@
+import functools
+import io
+import os
+import re
+
 import streamlit as st
-import pandas as pd
-from modules.uploader import upload_files
-from modules.cleaner import clean_data
+from modules.uploader import choose_sheets, upload_files
+from modules.admin import show_admin_panel
+from modules.cleaner import clean_data, cleaned_frame_loaders, get_pipeline_cache
+from modules.combiner import combine_data, combined_frame_loaders, forget_combined
+from modules.explorer import explore_data, forget_frame_index
+from modules.performance import show_performance_panel
 from modules.selector import select_columns
+from modules.validator import validate_data
 from modules.visualizer import visualize_data
 from modules.converter import convert_and_download
+from modules.recipes import manage_recipes
+from utils import settings
+from utils.backends import OUT_OF_CORE_FORMATS, duckdb_available, open_upload_out_of_core
+from utils.csv_stream import MemoryCeilingExceeded, read_csv_streaming
+from utils.dtypes import memory_bytes, optimize_dtypes
+from utils.frame_view import display_safe
+from utils.instrumentation import RunProfiler, RunRecorder, start_metrics_server
+from utils.parallel import run_parallel
+from utils.parse_cache import get_parse_cache, hash_file_content, make_cache_key
+from utils.profiler import describe_table, dtype_counts, profile_frame
+from utils.readers import detect_format, read_file
+from utils.session_store import SessionFrames, current_session_id, get_session_store, session_liveness
+from utils.validation import csv_read_options, sniff_csv
+from utils.warmup import start_warmup
+
+STYLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets", "style.css")
+
+# Per-file entries in session state that are released when a file is removed
+PER_FILE_STATE = (
+    'selected_columns', 'file_hashes', 'data_versions', 'compacted_files',
+    'column_versions', 'cleaning_steps', 'read_options',
+)
+
+
+@functools.lru_cache(maxsize=1)
+def page_style():
+    """
+    Read the page stylesheet, stripping comments and collapsing whitespace.
+
+    Returns:
+        str: A <style> block for st.markdown
+    """
+    with open(STYLE_PATH, encoding='utf-8') as stylesheet:
+        css = stylesheet.read()
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s*([{};:,])\s*", r"\1", re.sub(r"\s+", " ", css))
+    return f"<style>{css.strip()}</style>"
+
+
+def load_dataframe(file, content_hash, streaming=False, on_progress=None, read_options=None):
+    """
+    Parse an uploaded file, reusing the process-wide parse cache when possible.
+
+    Args:
+        file: Uploaded file object
+        content_hash (str): Hash of the file contents
+        streaming (bool): Whether large CSV files are read in chunks
+        on_progress (callable): Progress callback for streamed reads
+        read_options (dict): Reader options such as the Excel 'sheet_name' and 'columns'
+
+    Returns:
+        tuple: (pd.DataFrame, dict) with the parsed dataframe and load statistics,
+            or (None, None) for unsupported types
+    """
+    file_format, compression = detect_format(file.name)
+    if file_format is None:
+        return None, None
+    read_options = read_options or {}
+
+    # Files that cannot fit under the memory ceiling are queried in place
+    can_go_out_of_core = file_format in OUT_OF_CORE_FORMATS and duckdb_available()
+    if can_go_out_of_core and file.size > settings.MEMORY_CEILING_BYTES:
+        return open_upload_out_of_core(file, content_hash), {'out_of_core': True}
+
+    stream_csv = streaming and file_format == 'csv' and file.size >= settings.CSV_STREAMING_MIN_BYTES
+    if stream_csv:
+        read_func = lambda f: read_csv_streaming(f, on_progress=on_progress, compression=compression, **read_options)
+    else:
+        read_func = lambda f: (read_file(f, **read_options), {})
+
+    cache = get_parse_cache()
+    cache_key = make_cache_key(
+        content_hash, file_format, {'compression': compression, 'streaming': stream_csv, **read_options}
+    )
+    df = cache.get(cache_key)
+    if df is not None:
+        return df, {'cache_hit': True}
+
+    source = file
+    if 'sheet_name' in read_options:
+        # Sheets of one workbook load concurrently, so each read gets its own cursor
+        source = io.BytesIO(file.getvalue())
+        source.name = file.name
+    source.seek(0)
+    try:
+        df, load_stats = read_func(source)
+    except MemoryCeilingExceeded:
+        if not can_go_out_of_core:
+            raise
+        return open_upload_out_of_core(file, content_hash), {'out_of_core': True}
+    cache.put(cache_key, df)
+    return df, load_stats
+
+
+def forget_files(file_keys):
+    """
+    Release the frames, cached cleaning results and per-file state of removed files.
+
+    Args:
+        file_keys (iterable): Keys of files that are no longer uploaded
+    """
+    file_keys = set(file_keys)
+    if not file_keys:
+        return
+
+    # Cached cleaning results are shared by files with identical content
+    versions_in_use = set()
+    for file_key, version in st.session_state.data_versions.items():
+        if file_key not in file_keys:
+            versions_in_use.update((version, st.session_state.file_hashes.get(file_key)))
+    cache = get_pipeline_cache()
+    for file_key in file_keys:
+        for version in (st.session_state.data_versions.get(file_key), st.session_state.file_hashes.get(file_key)):
+            if version is not None and version not in versions_in_use:
+                cache.discard(version)
+
+    for file_key in file_keys:
+        st.session_state.dataframes.pop(file_key, None)
+        for name in PER_FILE_STATE:
+            st.session_state.get(name, {}).pop(file_key, None)
+        st.session_state.pop(f"selected_cols_{file_key}", None)
+        forget_frame_index(file_key)
+
+    # Combined frames built from a removed file go with it
+    for name, entry in list(st.session_state.get('combine_recipes', {}).items()):
+        if file_keys.intersection(entry['recipe']['inputs']):
+            forget_combined(name)
 
 
 def main():
@@ -19,61 +155,34 @@ def main():
         layout="wide",
         initial_sidebar_state="expanded"
     )
+    # Later stages import their heavy dependencies on first use; get those ready meanwhile
+    if settings.WARMUP:
+        start_warmup()
 
-    # Inject custom CSS for enhanced styling
-    st.markdown("""
-    <style>
-    .main-header {
-        font-size: 2.5rem;
-        color: #1f77b4;
-        text-align: center;
-        margin-bottom: 0.5rem;
-    }
-    .sub-header {
-        font-size: 1.2rem;
-        color: #666666;
-        text-align: center;
-        margin-bottom: 2rem;
-    }
-    .section-header {
-        font-size: 1.5rem;
-        color: #444444;
-        border-bottom: 2px solid #e0e0e0;
-        padding-bottom: 0.5rem;
-        margin-top: 2rem;
-    }
-    .file-card {
-        background-color: #f8f9fa;
-        color: #333333;
-        border-radius: 8px;
-        padding: 1rem;
-        margin: 0.5rem 0;
-        border-left: 4px solid #1f77b4;
-    }
-    .metric-container {
-        background-color: #f0f8ff;
-        color: #333333;
-        border-radius: 8px;
-        padding: 1rem;
-        text-align: center;
-        margin: 0.5rem;
-    }
-    .success-message {
-        background-color: #d4edda;
-        color: #155724;
-        padding: 1rem;
-        border-radius: 0.5rem;
-        margin: 1rem 0;
-    }
-    .warning-message {
-        background-color: #fff3cd;
-        color: #856404;
-        padding: 1rem;
-        border-radius: 0.5rem;
-        margin: 1rem 0;
-    }
-    </style>
-    """, unsafe_allow_html=True)
+    # Frames this rerun reads stay loaded until it ends instead of being spilled between stages
+    with get_session_store().rerun(current_session_id()):
+        render_page()
+
+
+def render_page():
+    """
+    Render every section of the page for the current rerun.
+    """
+
+    # Stage timings of this rerun, plus an optional profile of the whole rerun
+    recorder = RunRecorder()
+    profiler = None
+    if st.session_state.get('profile_reruns'):
+        profiler = RunProfiler(st.session_state.get('profile_engine', "cProfile"))
+        try:
+            profiler.start()
+        except (ImportError, ValueError) as e:
+            # e.g. another session's profiler is already active in this process
+            st.sidebar.warning(f"⚠️ Profiling unavailable for this rerun: {str(e)}")
+            profiler = None
+
+    # Custom CSS, read and minified once per process
+    st.markdown(page_style(), unsafe_allow_html=True)
 
     # Header Section
     st.markdown('<h1 class="main-header">🧹 Data Sweeper</h1>', unsafe_allow_html=True)
@@ -82,90 +191,298 @@ def main():
     # Initialize session state variables
     if 'uploaded_files' not in st.session_state:
         st.session_state.uploaded_files = None
+    # Uploaded frames live in the process-wide session store, which enforces the memory budget
+    session_store = get_session_store()
+    session_store.prune(session_liveness())
     if 'dataframes' not in st.session_state:
-        st.session_state.dataframes = {}
-    if 'cleaned_dataframes' not in st.session_state:
-        st.session_state.cleaned_dataframes = {}
+        st.session_state.dataframes = SessionFrames(session_store, current_session_id(), 'dataframes')
     if 'selected_columns' not in st.session_state:
         st.session_state.selected_columns = {}
     if 'current_step' not in st.session_state:
         st.session_state.current_step = 1
+    if 'file_hashes' not in st.session_state:
+        st.session_state.file_hashes = {}
+    if 'upload_hashes' not in st.session_state:
+        st.session_state.upload_hashes = {}
+    if 'data_versions' not in st.session_state:
+        st.session_state.data_versions = {}
+    if 'compacted_files' not in st.session_state:
+        st.session_state.compacted_files = {}
+    if 'csv_layouts' not in st.session_state:
+        st.session_state.csv_layouts = {}
+    if 'read_options' not in st.session_state:
+        st.session_state.read_options = {}
 
     # File Upload Section
     st.markdown('<h2 class="section-header">📁 Upload Files</h2>', unsafe_allow_html=True)
     uploaded_files = upload_files()
 
+    streaming = st.sidebar.checkbox(
+        "🌊 Stream large CSV files",
+        value=True,
+        help=(
+            f"Read CSV files over {settings.CSV_STREAMING_MIN_BYTES / 1024 ** 2:,.0f} MB in chunks "
+            f"with a {settings.MEMORY_CEILING_BYTES / 1024 ** 3:,.1f} GB memory ceiling"
+        ),
+        key="streaming_ingestion"
+    )
+    compact_memory = st.sidebar.checkbox(
+        "🗜️ Compact memory",
+        value=False,
+        help="Convert low-cardinality text to categories, use Arrow strings and downcast numbers after loading",
+        key="compact_memory"
+    )
+
     if uploaded_files:
         st.session_state.uploaded_files = uploaded_files
 
-        # Process each uploaded file
-        for file in uploaded_files:
-            if file.name not in st.session_state.dataframes:
-                # Load the dataframe
+        # Hash new uploads once, in parallel; reruns reuse the stored digests
+        upload_ids = [getattr(file, 'file_id', None) or f"{file.name}:{file.size}" for file in uploaded_files]
+        unhashed = [
+            (upload_id, file) for upload_id, file in zip(upload_ids, uploaded_files)
+            if upload_id not in st.session_state.upload_hashes
+        ]
+        with recorder.stage("hash uploads"):
+            hash_outcomes = run_parallel(lambda item: hash_file_content(item[1]), unhashed)
+        for (upload_id, file), (content_hash, error) in zip(unhashed, hash_outcomes):
+            if error is not None:
+                st.error(f"Error reading file {file.name}: {str(error)}")
+                continue
+            st.session_state.upload_hashes[upload_id] = content_hash
+
+        # Work out which uploads need loading; different files sharing a name get distinct keys
+        seen_names = {}
+        current_keys = []
+        pending = []
+        csv_sources = {}
+        for upload_id, file in zip(upload_ids, uploaded_files):
+            content_hash = st.session_state.upload_hashes.get(upload_id)
+            if content_hash is None:
+                continue
+            seen_names[file.name] = seen_names.get(file.name, 0) + 1
+            file_key = file.name if seen_names[file.name] == 1 else f"{file.name} ({seen_names[file.name]})"
+            # Workbooks become one entry per chosen sheet; other files are a single entry
+            entries = [(file_key, {}, content_hash)]
+            file_format, compression = detect_format(file.name)
+            if file_format == 'excel':
                 try:
-                    if file.name.endswith('.csv'):
-                        df = pd.read_csv(file)
-                    elif file.name.endswith(('.xlsx', '.xls')):
-                        df = pd.read_excel(file)
-                    else:
-                        st.error(f"Unsupported file type: {file.name}")
+                    entries = choose_sheets(file, file_key, content_hash)
+                except Exception as e:
+                    st.error(f"Error reading workbook {file.name}: {str(e)}")
+                    continue
+            elif file_format == 'csv':
+                # Sniff the delimiter, encoding and header from the first bytes, once per content
+                layout = st.session_state.csv_layouts.get(content_hash)
+                if layout is None:
+                    try:
+                        layout = st.session_state.csv_layouts[content_hash] = sniff_csv(file, compression)
+                    except Exception as e:
+                        st.error(f"Error reading file {file.name}: {str(e)}")
                         continue
+                entries = [(file_key, csv_read_options(layout), content_hash)]
+                csv_sources[file_key] = (file, compression)
+            for entry_key, read_options, version in entries:
+                current_keys.append(entry_key)
+                # Frames of an ended session may have been pruned from the store, so check both
+                if (st.session_state.file_hashes.get(entry_key) != version
+                        or entry_key not in st.session_state.dataframes):
+                    pending.append((file, entry_key, version, content_hash, read_options))
+        forget_files(key for key in st.session_state.file_hashes if key not in current_keys)
 
-                    st.session_state.dataframes[file.name] = df
-                    st.session_state.cleaned_dataframes[file.name] = df.copy()
+        # Load the dataframes on the worker pool, keeping upload order for results
+        report_progress = None
+        outcomes = []
+        if pending:
+            progress_bar = st.progress(0, text=f"Loading {len(pending)} file(s)...")
+            if len(pending) == 1:
+                # A single file loads on this thread, so it can report streaming progress
+                def report_progress(bytes_read, total_bytes, rows_read, bar=progress_bar, name=pending[0][1]):
+                    fraction = bytes_read / total_bytes if total_bytes else 0
+                    bar.progress(min(fraction, 1.0), text=f"Loading {name}: {bytes_read:,} bytes, {rows_read:,} rows")
 
-                    # Display file card
-                    with st.container():
-                        st.markdown(f"""
-                        <div class="file-card">
-                            <strong>📄 {file.name}</strong><br>
-                            Size: {file.size:,} bytes<br>
-                            Shape: {df.shape[0]:,} rows × {df.shape[1]:,} columns
-                        </div>
-                        """, unsafe_allow_html=True)
+            def report_batch(completed, total, bar=progress_bar):
+                bar.progress(completed / total, text=f"Loaded {completed} of {total} file(s)")
 
-                except Exception as e:
-                    st.error(f"Error loading file {file.name}: {str(e)}")
+            with recorder.stage("parse") as record:
+                outcomes = run_parallel(
+                    lambda item: load_dataframe(item[0], item[3], streaming, report_progress, item[4]),
+                    pending,
+                    on_done=report_batch
+                )
+                record['rows'] = sum(
+                    result[0].shape[0] for result, error in outcomes if error is None and result[0] is not None
+                )
+            progress_bar.empty()
+
+        for (file, file_key, version, content_hash, read_options), outcome in zip(pending, outcomes):
+            result, error = outcome
+            layout = st.session_state.csv_layouts.get(content_hash)
+            if layout and layout['ragged_lines']:
+                lines = ", ".join(map(str, layout['ragged_lines'][:10]))
+                st.warning(
+                    f"⚠️ {file_key}: line(s) {lines} do not have the {layout['field_count']} fields "
+                    f"found on the other sampled lines"
+                )
+            if isinstance(error, MemoryCeilingExceeded):
+                st.error(f"File {file_key} is too large to load: {str(error)}")
+                continue
+            if error is not None:
+                st.error(f"Error loading file {file_key}: {str(error)}")
+                continue
+
+            df, load_stats = result
+            if df is None:
+                st.error(f"Unsupported file type: {file.name}")
+                continue
+
+            st.session_state.dataframes[file_key] = df
+            st.session_state.file_hashes[file_key] = version
+            st.session_state.data_versions[file_key] = version
+            st.session_state.read_options[file_key] = read_options
+            st.session_state.compacted_files.pop(file_key, None)
+
+            # Display file card
+            if load_stats.get('out_of_core'):
+                load_line = "Too large for memory: opened out of core with DuckDB"
+            elif load_stats.get('cache_hit'):
+                load_line = "Loaded from parse cache"
+            elif 'rows_per_second' in load_stats:
+                load_line = (
+                    f"Streamed {load_stats['bytes_processed']:,} bytes at "
+                    f"{load_stats['rows_per_second']:,.0f} rows/s"
+                )
+            else:
+                load_line = "Parsed in one pass"
+            if layout and csv_read_options(layout):
+                delimiter = {'\t': "tab", ' ': "space"}.get(layout['delimiter'], f"'{layout['delimiter']}'")
+                header = "" if layout['has_header'] else ", no header row"
+                load_line += f"<br>Detected {delimiter}-separated, {layout['encoding']}{header}"
+            with st.container():
+                st.markdown(f"""
+                <div class="file-card">
+                    <strong>📄 {file_key}</strong><br>
+                    Size: {file.size:,} bytes<br>
+                    Shape: {df.shape[0]:,} rows × {df.shape[1]:,} columns<br>
+                    {load_line}
+                </div>
+                """, unsafe_allow_html=True)
+
+        # Optional memory compaction, applied once per loaded file
+        if compact_memory:
+            to_compact = [
+                (file_key, df) for file_key, df in st.session_state.dataframes.items()
+                if file_key not in st.session_state.compacted_files and not getattr(df, 'out_of_core', False)
+            ]
+            with recorder.stage("compact", rows=sum(len(df) for _, df in to_compact)):
+                compact_outcomes = run_parallel(
+                    lambda item: (memory_bytes(item[1]), optimize_dtypes(item[1])),
+                    to_compact
+                )
+            for (file_key, _), (result, error) in zip(to_compact, compact_outcomes):
+                if error is not None:
+                    st.error(f"Error compacting {file_key}: {str(error)}")
+                    continue
+                before, compacted = result
+                after = memory_bytes(compacted)
+                st.session_state.dataframes[file_key] = compacted
+                st.session_state.data_versions[file_key] = f"{st.session_state.file_hashes[file_key]}-compact"
+                st.session_state.compacted_files[file_key] = (before, after)
+
+            with st.expander("🗜️ Memory compaction", expanded=False):
+                for file_key, (before, after) in st.session_state.compacted_files.items():
+                    ratio = before / after if after else 1.0
+                    st.write(
+                        f"**{file_key}:** {before / 1024 ** 2:,.1f} MB → {after / 1024 ** 2:,.1f} MB "
+                        f"({ratio:,.1f}x smaller)"
+                    )
+
+        # Parse cache counters
+        cache_stats = get_parse_cache().stats()
+        st.sidebar.caption(
+            f"🗄️ Parse cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses, "
+            f"{cache_stats['entries']} files ({cache_stats['bytes'] / 1024 ** 2:,.1f} MB)"
+        )
 
         # Data Preview Section
         st.markdown('<h2 class="section-header">📊 Data Preview</h2>', unsafe_allow_html=True)
-        for filename, df in st.session_state.dataframes.items():
-            with st.expander(f"🔍 Preview: {filename}", expanded=True):
-                tab1, tab2 = st.tabs(["📋 Raw Data", "📈 Summary Stats"])
-
-                with tab1:
-                    st.write(f"**Shape:** {df.shape}")
-                    # Convert problematic columns to string to avoid Arrow conversion issues
-                    df_display = df.head(10).copy()
-                    for col in df_display.columns:
-                        if df_display[col].dtype == 'object':
-                            # Try to convert to string, handling any problematic values
-                            df_display[col] = df_display[col].apply(lambda x: str(x) if pd.notna(x) else x)
-                    st.dataframe(df_display)
-
-                with tab2:
-                    st.write("**Basic Statistics:**")
-                    st.dataframe(df.describe())
-                    st.write("**Data Types:**")
-                    st.write(df.dtypes.value_counts())
+        with recorder.stage("preview") as record:
+            record['rows'] = 0
+            for filename, df in st.session_state.dataframes.items():
+                with st.expander(f"🔍 Preview: {filename}", expanded=True):
+                    tab1, tab2 = st.tabs(["📋 Raw Data", "📈 Summary Stats"])
+
+                    data_version = st.session_state.data_versions.get(filename)
+                    with tab1:
+                        # Filters, sorting and paging run on an index; only the visible page is sent
+                        explore_data(filename, df, data_version)
+
+                    with tab2:
+                        # Column profiles are cached per data version, so reruns reuse them
+                        versions = {col: data_version for col in df.columns} if data_version else None
+                        profiles = profile_frame(df, versions)
+                        st.write("**Basic Statistics:**")
+                        st.dataframe(display_safe(describe_table(profiles)))
+                        st.write("**Data Types:**")
+                        st.write(dtype_counts(profiles))
+                record['rows'] += df.shape[0]
+
+        # Data Validation Section
+        st.markdown('<h2 class="section-header">✅ Validate Data</h2>', unsafe_allow_html=True)
+        with recorder.stage("validate"):
+            validate_data(st.session_state.dataframes, csv_sources)
 
         # Data Cleaning Section
         st.markdown('<h2 class="section-header">🧽 Data Cleaning</h2>', unsafe_allow_html=True)
-        cleaned_dataframes = clean_data(st.session_state.cleaned_dataframes)
-        st.session_state.cleaned_dataframes = cleaned_dataframes
+        with recorder.stage("clean") as record:
+            cleaned_dataframes = clean_data(st.session_state.dataframes, st.session_state.data_versions)
+            record['rows'] = sum(df.shape[0] for df in cleaned_dataframes.values())
+
+        # Combine Section: combined frames join the cleaned files from here on
+        st.markdown('<h2 class="section-header">🔗 Combine Files</h2>', unsafe_allow_html=True)
+        with recorder.stage("combine") as record:
+            combined_dataframes = combine_data(cleaned_dataframes)
+            record['rows'] = sum(df.shape[0] for df in combined_dataframes.values())
+        # Cleaned frames are only held for this rerun: they are either uploads kept by the
+        # session store or results kept by the pipeline cache, which both count against the budget
+        cleaned_dataframes = {**cleaned_dataframes, **combined_dataframes}
 
         # Column Selection Section
         st.markdown('<h2 class="section-header">🔍 Select Columns</h2>', unsafe_allow_html=True)
-        selected_columns = select_columns(st.session_state.cleaned_dataframes)
+        with recorder.stage("select columns"):
+            selected_columns = select_columns(cleaned_dataframes)
         st.session_state.selected_columns = selected_columns
 
         # Visualization Section
         st.markdown('<h2 class="section-header">📈 Visualize Data</h2>', unsafe_allow_html=True)
-        visualize_data(st.session_state.cleaned_dataframes, selected_columns)
+        with recorder.stage("visualize", rows=sum(df.shape[0] for df in cleaned_dataframes.values())):
+            visualize_data(cleaned_dataframes, selected_columns, st.session_state.column_versions)
 
         # Conversion & Download Section
         st.markdown('<h2 class="section-header">💾 Convert & Download</h2>', unsafe_allow_html=True)
-        convert_and_download(st.session_state.cleaned_dataframes, selected_columns)
+        with recorder.stage("convert"):
+            # Downloads fetch their frame when clicked, through the session store and pipeline cache
+            loaders = {
+                **cleaned_frame_loaders(st.session_state.dataframes, st.session_state.data_versions),
+                **combined_frame_loaders(),
+            }
+            convert_and_download(cleaned_dataframes, selected_columns, loaders)
+
+        # Recipes Section
+        st.markdown('<h2 class="section-header">📜 Recipes</h2>', unsafe_allow_html=True)
+        with recorder.stage("recipes"):
+            manage_recipes(st.session_state.dataframes, selected_columns, uploaded_files)
+    else:
+        # Everything was removed from the uploader: release it all
+        st.session_state.uploaded_files = None
+        forget_files(list(st.session_state.file_hashes))
+
+    if settings.ADMIN_PANEL:
+        show_admin_panel()
+    if settings.METRICS_PORT:
+        start_metrics_server(settings.METRICS_PORT)
+    if profiler is not None:
+        st.session_state.last_profile = profiler.stop()
+    show_performance_panel(recorder)
 
     # Footer Section
     st.markdown("---")
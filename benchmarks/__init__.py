@@ -0,0 +1,6 @@
+"""
+Performance benchmarks for Data Sweeper.
+
+Run ``python -m benchmarks run`` to time every stage on synthetic data and
+``python -m benchmarks compare`` to flag regressions between two result files.
+"""
@@ -0,0 +1,108 @@
+"""
+Command-line entry point for the benchmark suite.
+
+Examples:
+    python -m benchmarks run --rows 1000000 -o results.json
+    python -m benchmarks compare baseline.json results.json --threshold 0.15
+"""
+import argparse
+import sys
+
+from benchmarks.datasets import DATASET_FORMATS
+from benchmarks.harness import compare_results, load_results, run_suite, save_results
+
+
+def build_parser():
+    """
+    Build the argument parser for the benchmark command.
+
+    Returns:
+        argparse.ArgumentParser: Configured parser
+    """
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Data Sweeper performance benchmarks.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Time every stage on a synthetic dataset")
+    run.add_argument("-o", "--output", default="benchmark_results.json", help="JSON file for the results")
+    run.add_argument("--rows", type=int, default=100_000, help="Rows in the dataset")
+    run.add_argument("--numeric-columns", type=int, default=4, help="Numeric columns in the dataset")
+    run.add_argument("--string-columns", type=int, default=2, help="Text columns in the dataset")
+    run.add_argument("--null-ratio", type=float, default=0.05, help="Share of missing values")
+    run.add_argument("--duplicate-ratio", type=float, default=0.1, help="Share of duplicated rows")
+    run.add_argument("--cardinality", type=int, default=100, help="Distinct values per text column")
+    run.add_argument("--seed", type=int, default=0, help="Random seed")
+    run.add_argument("--repeat", type=int, default=3, help="Runs per measurement; the best is reported")
+    run.add_argument("--formats", default=",".join(DATASET_FORMATS), help="Comma-separated dataset formats to load")
+    run.add_argument("--excel-rows", type=int, default=50_000, help="Row cap for the Excel dataset")
+    run.add_argument("--backends", action="store_true", help="Also check DuckDB/pandas parity")
+    run.add_argument(
+        "--startup",
+        action="store_true",
+        help="Also time importing the app and its first run in fresh interpreters (python -X importtime)"
+    )
+
+    compare = commands.add_parser("compare", help="Flag regressions between two result files")
+    compare.add_argument("baseline", help="Earlier result file")
+    compare.add_argument("current", help="Newer result file")
+    compare.add_argument("--threshold", type=float, default=0.1, help="Allowed relative slowdown (default 10%%)")
+    return parser
+
+
+def main(argv=None):
+    """
+    Run the benchmark command.
+
+    Args:
+        argv (list): Arguments, defaults to sys.argv[1:]
+
+    Returns:
+        int: Exit status, 1 if compare found a regression
+    """
+    args = build_parser().parse_args(argv)
+
+    if args.command == "run":
+        formats = [name.strip() for name in args.formats.split(",") if name.strip()]
+        unknown = [name for name in formats if name not in DATASET_FORMATS]
+        if unknown:
+            print(f"error: unknown dataset formats: {', '.join(unknown)}", file=sys.stderr)
+            return 2
+        document = run_suite(
+            rows=args.rows, numeric_columns=args.numeric_columns, string_columns=args.string_columns,
+            null_ratio=args.null_ratio, duplicate_ratio=args.duplicate_ratio, cardinality=args.cardinality,
+            seed=args.seed, repeat=args.repeat, formats=formats, excel_rows=args.excel_rows,
+            check_backends=args.backends, check_startup=args.startup, on_stage=lambda name: print(f"Running {name}...", file=sys.stderr)
+        )
+        save_results(document, args.output)
+        for record in document['results']:
+            extra = ""
+            if 'payload_bytes' in record:
+                extra = f"  payload {record['payload_bytes']:,} bytes"
+            elif 'output_bytes' in record:
+                extra = f"  output {record['output_bytes']:,} bytes"
+            elif record.get('differences'):
+                extra = f"  {len(record['differences'])} differences"
+            elif record.get('imports_ms'):
+                extra = "  " + ", ".join(f"{name} {ms:,.0f} ms" for name, ms in record['imports_ms'].items())
+            print(f"{record['stage']:<10} {record['case']:<24} {record['seconds'] * 1000:>10.1f} ms{extra}")
+        print(f"Results written to {args.output}")
+        return 0
+
+    try:
+        baseline, current = load_results(args.baseline), load_results(args.current)
+    except (OSError, ValueError) as error:
+        print(f"error: {error}", file=sys.stderr)
+        return 2
+    comparisons = compare_results(baseline, current, args.threshold)
+    for row in comparisons:
+        flag = "REGRESSION" if row['regression'] else ""
+        print(
+            f"{row['stage']:<10} {row['case']:<24} {row['baseline'] * 1000:>10.1f} ms -> "
+            f"{row['current'] * 1000:>10.1f} ms  x{row['ratio']:.2f} {flag}"
+        )
+    regressions = sum(row['regression'] for row in comparisons)
+    print(f"{regressions} regression(s) in {len(comparisons)} measurements")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+"""
+Synthetic dataset generator for the benchmark suite.
+
+Frames have a controlled number of rows, numeric and text columns, null
+ratio, duplicate ratio and text cardinality, and are generated from a seed so
+repeated runs measure the same data.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from utils.exporter import EXCEL_MAX_ROWS
+
+DATASET_FORMATS = ('csv', 'xlsx', 'parquet')
+
+
+def make_frame(rows, numeric_columns=4, string_columns=2, null_ratio=0.05,
+               duplicate_ratio=0.1, cardinality=100, seed=0):
+    """
+    Generate a synthetic dataframe.
+
+    Args:
+        rows (int): Number of rows
+        numeric_columns (int): Number of numeric columns, alternating int and float
+        string_columns (int): Number of text columns
+        null_ratio (float): Share of missing values in float and text columns
+        duplicate_ratio (float): Share of rows that copy an earlier row
+        cardinality (int): Distinct values per text column
+        seed (int): Random seed
+
+    Returns:
+        pd.DataFrame: Generated data
+    """
+    rng = np.random.default_rng(seed)
+    columns = {}
+    for index in range(numeric_columns):
+        if index % 2 == 0:
+            columns[f"int_{index}"] = rng.integers(0, 1_000_000, rows)
+        else:
+            values = rng.normal(100, 25, rows)
+            values[rng.random(rows) < null_ratio] = np.nan
+            columns[f"float_{index}"] = values
+
+    vocabulary = np.array([f"value_{code:06d}" for code in range(max(cardinality, 1))], dtype=object)
+    for index in range(string_columns):
+        values = vocabulary[rng.integers(0, len(vocabulary), rows)]
+        values[rng.random(rows) < null_ratio] = None
+        columns[f"text_{index}"] = values
+
+    df = pd.DataFrame(columns)
+
+    # Overwrite a share of rows with copies of randomly chosen rows
+    duplicates = int(rows * duplicate_ratio)
+    if duplicates and rows > 1:
+        targets = rng.choice(np.arange(1, rows), size=min(duplicates, rows - 1), replace=False)
+        sources = (rng.random(len(targets)) * targets).astype(np.int64)
+        df.iloc[targets] = df.iloc[sources].to_numpy()
+    return df
+
+
+def write_dataset(df, directory, formats=DATASET_FORMATS, excel_rows=50_000):
+    """
+    Write a frame in each requested file format.
+
+    Args:
+        df (pd.DataFrame): Data to write
+        directory (str): Output directory
+        formats (iterable): Any of DATASET_FORMATS
+        excel_rows (int): Row cap for the Excel file, which is slow to write and read
+
+    Returns:
+        dict: Mapping of format to file path
+    """
+    os.makedirs(directory, exist_ok=True)
+    paths = {}
+    for file_format in formats:
+        path = os.path.join(directory, f"dataset.{file_format}")
+        if file_format == 'csv':
+            df.to_csv(path, index=False)
+        elif file_format == 'xlsx':
+            df.head(min(excel_rows, EXCEL_MAX_ROWS - 1)).to_excel(path, index=False)
+        elif file_format == 'parquet':
+            df.to_parquet(path, index=False)
+        else:
+            raise ValueError(f"Unknown dataset format: {file_format}")
+        paths[file_format] = path
+    return paths
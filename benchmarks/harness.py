@@ -0,0 +1,456 @@
+"""
+Stage timings for the benchmark suite and comparison of result files.
+
+Each stage calls the same functions the app uses (readers, cleaning
+pipeline, combining, explorer index, profiler, figure builders and
+exporters) outside Streamlit, so the numbers reflect server-side work only.
+"""
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from benchmarks.datasets import DATASET_FORMATS, make_frame, write_dataset
+from modules.visualizer import build_box_plot, build_histogram, build_line_chart, build_scatter
+from utils.backends import DuckDBFrame, duckdb_available
+from utils.combine import concat_frames, join_frames
+from utils.csv_stream import read_csv_streaming
+from utils.exporter import EXPORT_FORMATS, write_export
+from utils.explorer import FrameIndex
+from utils.pipeline import run_pipeline
+from utils.profiler import describe_table, profile_frame
+from utils.readers import read_file
+from utils.validation import validate_csv, validate_frame
+
+CLEANING_CASES = {
+    'drop_duplicates': [{'op': 'drop_duplicates'}],
+    'drop_duplicates_exact': [{'op': 'drop_duplicates', 'method': 'exact'}],
+    'drop_duplicates_hash': [{'op': 'drop_duplicates', 'method': 'hash'}],
+    'drop_rows': [{'op': 'missing_values', 'strategy': "Drop rows"}],
+    'fill_zero': [{'op': 'missing_values', 'strategy': "Fill with 0"}],
+    'forward_fill': [{'op': 'missing_values', 'strategy': "Forward fill"}],
+    'backward_fill': [{'op': 'missing_values', 'strategy': "Backward fill"}],
+    'fill_mean': [{'op': 'missing_values', 'strategy': "Fill with mean"}],
+    'fill_median': [{'op': 'missing_values', 'strategy': "Fill with median"}],
+    'fill_mode': [{'op': 'missing_values', 'strategy': "Fill with mode"}],
+    'interpolate': [{'op': 'missing_values', 'strategy': "Interpolate"}],
+    # Per-column plans name columns of the synthetic dataset (see benchmarks.datasets.make_frame)
+    'fill_constant': [{'op': 'impute', 'columns': {
+        'float_1': {'strategy': 'constant', 'value': -1.0},
+        'text_0': {'strategy': 'constant', 'value': "unknown"},
+    }}],
+    'forward_fill_grouped': [{'op': 'impute', 'default': {'strategy': 'ffill', 'group_by': ['text_0']}}],
+    'forward_fill_ordered': [{'op': 'impute', 'default': {'strategy': 'ffill', 'order_by': 'int_0'}}],
+    'forward_fill_grouped_ordered': [
+        {'op': 'impute', 'default': {'strategy': 'ffill', 'group_by': ['text_0'], 'order_by': 'int_0'}}
+    ],
+}
+
+# Timing differences below this many seconds are treated as noise
+NOISE_FLOOR_SECONDS = 0.005
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Packages whose import cost is reported by the startup stage
+STARTUP_PACKAGES = (
+    'streamlit', 'pandas', 'numpy', 'pyarrow', 'plotly', 'plotly.graph_objects', 'plotly.express', 'openpyxl', 'xlsxwriter',
+)
+
+# Runs the app once without uploads in a fresh interpreter and prints the seconds it took
+FIRST_RUN_SCRIPT = (
+    "import time\n"
+    "from streamlit.testing.v1 import AppTest\n"
+    "start = time.perf_counter()\n"
+    "AppTest.from_file('app.py', default_timeout=120).run()\n"
+    "print(time.perf_counter() - start)\n"
+)
+
+
+def time_call(func, repeat=3):
+    """
+    Time a callable several times.
+
+    Args:
+        func (callable): Function to time, called without arguments
+        repeat (int): Number of runs
+
+    Returns:
+        tuple: (last result, list of run times in seconds)
+    """
+    runs = []
+    result = None
+    for _ in range(max(repeat, 1)):
+        start = time.perf_counter()
+        result = func()
+        runs.append(time.perf_counter() - start)
+    return result, runs
+
+
+def _record(stage, case, runs, **extra):
+    record = {
+        'stage': stage,
+        'case': case,
+        'seconds': min(runs),
+        'median_seconds': statistics.median(runs),
+        'runs': runs,
+    }
+    record.update(extra)
+    return record
+
+
+def bench_load(paths, repeat):
+    """Time reading each dataset file through the reader registry."""
+    results = []
+    for file_format, path in paths.items():
+        df, runs = time_call(lambda path=path: read_file(path), repeat)
+        results.append(_record('load', file_format, runs, rows=len(df)))
+        if file_format == 'csv':
+            def streamed(path=path):
+                with open(path, 'rb') as source:
+                    return read_csv_streaming(source)[0]
+            df, runs = time_call(streamed, repeat)
+            results.append(_record('load', 'csv_streaming', runs, rows=len(df)))
+    return results
+
+
+def _case_columns(steps):
+    """Columns a cleaning case names explicitly."""
+    names = set()
+    for step in steps:
+        names.update(step.get('columns') or {})
+        for spec in [*(step.get('columns') or {}).values(), step.get('default') or {}]:
+            names.update(spec.get('group_by') or [])
+            if spec.get('order_by'):
+                names.add(spec['order_by'])
+    return names
+
+
+def bench_clean(df, repeat):
+    """Time each cleaning strategy on its own, without the pipeline cache."""
+    results = []
+    for case, steps in CLEANING_CASES.items():
+        if not _case_columns(steps) <= set(df.columns):
+            continue  # the dataset was generated without a column this case names
+        (cleaned, _), runs = time_call(lambda steps=steps: run_pipeline(df, steps), repeat)
+        results.append(_record('clean', case, runs, rows=len(cleaned)))
+    return results
+
+
+def validation_rules(df):
+    """Rules exercising every check on the synthetic dataset's columns."""
+    rules = {}
+    for col in df.columns:
+        if col.startswith('int_'):
+            rules[col] = {'type': 'integer', 'min': 0, 'max': 999_999, 'not_null': True}
+        elif col.startswith('float_'):
+            rules[col] = {'type': 'float', 'min': 0}
+        elif col.startswith('text_'):
+            rules[col] = {'regex': r'value_\d{6}'}
+    first = df.columns[0]
+    rules[first] = {**rules.get(first, {}), 'unique': True}
+    return rules
+
+
+def bench_validate(df, paths, repeat):
+    """Time rule validation on the loaded frame and streamed from the CSV file."""
+    rules = validation_rules(df)
+    report, runs = time_call(lambda: validate_frame(df, rules), repeat)
+    results = [_record('validate', 'frame', runs, rows=report['rows'])]
+    if 'csv' in paths:
+        report, runs = time_call(lambda: validate_csv(paths['csv'], rules), repeat)
+        results.append(_record('validate', 'csv_streaming', runs, rows=report['rows']))
+    return results
+
+
+def bench_combine(df, repeat):
+    """Time concatenation and each join strategy against a lookup table built from the dataset."""
+    results = []
+    combined, runs = time_call(lambda: concat_frames({'a': df, 'b': df}, 'source_file'), repeat)
+    results.append(_record('combine', 'concat', runs, rows=len(combined)))
+
+    text_columns = [col for col in df.columns if col.startswith('text_')]
+    if text_columns:
+        key = text_columns[0]
+        lookup = pd.DataFrame({key: df[key].dropna().unique()})
+        lookup['label'] = range(len(lookup))
+        for strategy in ('hash', 'categorical', 'chunked'):
+            (joined, _), runs = time_call(
+                lambda strategy=strategy: join_frames(df, lookup, [key], 'left', strategy), repeat
+            )
+            results.append(_record('combine', f"join_{strategy}", runs, rows=len(joined)))
+
+    int_columns = [col for col in df.columns if col.startswith('int_')]
+    if int_columns:
+        key = int_columns[0]
+        ordered = df.sort_values(key, ignore_index=True)
+        lookup = pd.DataFrame({key: ordered[key].drop_duplicates().to_numpy()})
+        lookup['label'] = range(len(lookup))
+        (joined, _), runs = time_call(lambda: join_frames(ordered, lookup, [key], 'inner', 'sort_merge'), repeat)
+        results.append(_record('combine', 'join_sort_merge', runs, rows=len(joined)))
+    return results
+
+
+def bench_explore(df, repeat):
+    """Time building the explorer index, then filtered, searched and sorted queries on the built index."""
+    def build():
+        index = FrameIndex(len(df), budget_bytes=float('inf'))
+        for col in df.columns:
+            index.ranks(df, col)
+        return index
+
+    index, runs = time_call(build, repeat)
+    results = [_record('explore', 'build_index', runs, rows=len(df), index_bytes=index.nbytes)]
+
+    int_columns = [col for col in df.columns if col.startswith('int_')]
+    float_columns = [col for col in df.columns if col.startswith('float_')]
+    text_columns = [col for col in df.columns if col.startswith('text_')]
+    cases = {'sort': {'sort_by': df.columns[0], 'ascending': False}}
+    if text_columns:
+        value = df[text_columns[0]].dropna().iloc[0]
+        cases['filter_values'] = {'filters': {text_columns[0]: ('values', [value])}}
+        cases['search'] = {'search': str(value)[-2:]}
+    if float_columns:
+        low, high = df[float_columns[0]].quantile([0.25, 0.5])
+        cases['filter_range_sorted'] = {
+            'filters': {float_columns[0]: ('range', low, high)},
+            'sort_by': int_columns[0] if int_columns else float_columns[0],
+        }
+    for case, query in cases.items():
+        positions, runs = time_call(lambda query=query: index.query(df, **query), repeat)
+        results.append(_record('explore', case, runs, rows=index.count(positions)))
+    _, runs = time_call(lambda: index.page(df, positions, 0, 100), repeat)
+    results.append(_record('explore', 'page', runs, rows=100))
+    return results
+
+
+def import_times(module="app"):
+    """
+    Import a module in a fresh interpreter with `python -X importtime`.
+
+    Args:
+        module (str): Module to import from the project directory
+
+    Returns:
+        dict: Module or package name -> cumulative import seconds, for the
+            module itself and every package in STARTUP_PACKAGES it imported
+    """
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_DIR, capture_output=True, text=True, check=True
+    )
+    times = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        name = name.strip()
+        if name == module or name in STARTUP_PACKAGES:
+            times[name] = int(cumulative) / 1_000_000
+    return times
+
+
+def bench_startup(repeat):
+    """Time importing the app and its first script run, each in a fresh interpreter."""
+    runs, imports = [], {}
+    for _ in range(max(repeat, 1)):
+        times = import_times("app")
+        runs.append(times.pop("app"))
+        imports = times
+    results = [_record('startup', 'import_app', runs, imports_ms={
+        name: round(seconds * 1000, 1) for name, seconds in imports.items()
+    })]
+
+    def first_run():
+        completed = subprocess.run(
+            [sys.executable, "-c", FIRST_RUN_SCRIPT], cwd=PROJECT_DIR, capture_output=True, text=True, check=True
+        )
+        return float(completed.stdout.strip().splitlines()[-1])
+
+    runs = [first_run() for _ in range(max(repeat, 1))]
+    results.append(_record('startup', 'first_run', runs))
+    return results
+
+
+def bench_describe(df, repeat):
+    """Time column profiling and the summary table, plus pandas' describe for reference."""
+    _, runs = time_call(lambda: describe_table(profile_frame(df)), repeat)
+    results = [_record('describe', 'profile_frame', runs, rows=len(df))]
+    _, runs = time_call(lambda: df.describe(), repeat)
+    results.append(_record('describe', 'pandas_describe', runs, rows=len(df)))
+    return results
+
+
+def bench_figures(df, repeat):
+    """Time figure building and measure the JSON payload sent to the browser."""
+    numeric = df.select_dtypes('number').columns
+    x = df[numeric[0]]
+    y = df[numeric[1]] if len(numeric) > 1 else x
+    builders = {
+        'histogram': lambda: build_histogram(x, "histogram"),
+        'box': lambda: build_box_plot(x, "box"),
+        'scatter_density': lambda: build_scatter(x, y, "scatter", mode="Density"),
+        'scatter_sample': lambda: build_scatter(x, y, "scatter", mode="Sample"),
+        'line': lambda: build_line_chart(x, "line"),
+    }
+    results = []
+    for case, build in builders.items():
+        fig, runs = time_call(build, repeat)
+        results.append(_record('figure', case, runs, payload_bytes=len(fig.to_json())))
+    return results
+
+
+def bench_export(df, repeat):
+    """Time every export format and record the output size."""
+    results = []
+    for output_format in EXPORT_FORMATS:
+        frame = df.head(min(len(df), 100_000)) if output_format == "Excel" else df
+
+        def export(frame=frame, output_format=output_format):
+            stream = io.BytesIO()
+            write_export(frame, stream, output_format)
+            return stream.tell()
+
+        size, runs = time_call(export, repeat)
+        results.append(_record('export', output_format.lower(), runs, rows=len(frame), output_bytes=size))
+    return results
+
+
+def bench_backends(df, repeat):
+    """Time the cleaning pipeline out of core with DuckDB and check it agrees with pandas."""
+    steps = CLEANING_CASES['drop_duplicates'] + CLEANING_CASES['forward_fill']
+    expected, _ = run_pipeline(df, steps)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "backends.parquet")
+        df.to_parquet(path, index=False)
+        actual, runs = time_call(lambda: DuckDBFrame.from_path(path).apply_steps(steps)[0].fetch(), repeat)
+
+    try:
+        pd.testing.assert_frame_equal(actual, expected.reset_index(drop=True), check_dtype=False)
+        differences = []
+    except AssertionError as error:
+        differences = [str(error)]
+    return [_record('backends', 'duckdb_parity', runs, differences=differences)]
+
+
+def run_suite(rows=100_000, numeric_columns=4, string_columns=2, null_ratio=0.05, duplicate_ratio=0.1,
+              cardinality=100, seed=0, repeat=3, formats=DATASET_FORMATS, excel_rows=50_000,
+              check_backends=False, check_startup=False, on_stage=None):
+    """
+    Generate a dataset and time every stage of the app on it.
+
+    Args:
+        rows (int): Rows in the synthetic dataset
+        numeric_columns (int): Numeric columns in the dataset
+        string_columns (int): Text columns in the dataset
+        null_ratio (float): Share of missing values
+        duplicate_ratio (float): Share of duplicated rows
+        cardinality (int): Distinct values per text column
+        seed (int): Random seed
+        repeat (int): Runs per measurement
+        formats (iterable): Dataset file formats to time loading for
+        excel_rows (int): Row cap for the Excel dataset
+        check_backends (bool): Also run the DuckDB parity check when duckdb is installed
+        check_startup (bool): Also time importing the app and its first run in fresh interpreters
+        on_stage (callable): Called with each stage name before it runs
+
+    Returns:
+        dict: Result document with 'meta' and 'results' keys
+    """
+    config = {
+        'rows': rows, 'numeric_columns': numeric_columns, 'string_columns': string_columns,
+        'null_ratio': null_ratio, 'duplicate_ratio': duplicate_ratio, 'cardinality': cardinality,
+        'seed': seed, 'repeat': repeat,
+    }
+    df = make_frame(rows, numeric_columns, string_columns, null_ratio, duplicate_ratio, cardinality, seed)
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        paths = write_dataset(df, directory, formats, excel_rows)
+        stages = [
+            ('load', lambda: bench_load(paths, repeat)),
+            ('validate', lambda: bench_validate(df, paths, repeat)),
+            ('clean', lambda: bench_clean(df, repeat)),
+            ('combine', lambda: bench_combine(df, repeat)),
+            ('explore', lambda: bench_explore(df, repeat)),
+            ('describe', lambda: bench_describe(df, repeat)),
+            ('figure', lambda: bench_figures(df, repeat)),
+            ('export', lambda: bench_export(df, repeat)),
+        ]
+        if check_backends and duckdb_available():
+            stages.append(('backends', lambda: bench_backends(df, 1)))
+        if check_startup:
+            stages.append(('startup', lambda: bench_startup(repeat)))
+        for name, stage in stages:
+            if on_stage is not None:
+                on_stage(name)
+            results.extend(stage())
+
+    return {
+        'meta': {
+            'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'platform': platform.platform(),
+            'config': config,
+        },
+        'results': results,
+    }
+
+
+def save_results(document, path):
+    """Write a result document as JSON."""
+    with open(path, 'w', encoding='utf-8') as out:
+        json.dump(document, out, indent=2)
+
+
+def load_results(path):
+    """Read a result document written by save_results."""
+    with open(path, encoding='utf-8') as source:
+        return json.load(source)
+
+
+def compare_results(baseline, current, threshold=0.1):
+    """
+    Compare two result documents measurement by measurement.
+
+    A measurement regresses when its best time grows by more than the
+    threshold (and by more than NOISE_FLOOR_SECONDS), or when its payload or
+    output size grows by more than the threshold.
+
+    Args:
+        baseline (dict): Earlier result document
+        current (dict): Newer result document
+        threshold (float): Allowed relative slowdown, e.g. 0.1 for 10%
+
+    Returns:
+        list: One dict per measurement present in both documents, with
+            'stage', 'case', 'baseline', 'current', 'ratio' and 'regression'
+    """
+    earlier = {(record['stage'], record['case']): record for record in baseline['results']}
+    comparisons = []
+    for record in current['results']:
+        old = earlier.get((record['stage'], record['case']))
+        if old is None:
+            continue
+        ratio = record['seconds'] / old['seconds'] if old['seconds'] else float('inf')
+        regression = ratio > 1 + threshold and record['seconds'] - old['seconds'] > NOISE_FLOOR_SECONDS
+        for size_key in ('payload_bytes', 'output_bytes'):
+            if old.get(size_key) and record.get(size_key, 0) > old[size_key] * (1 + threshold):
+                regression = True
+        comparisons.append({
+            'stage': record['stage'],
+            'case': record['case'],
+            'baseline': old['seconds'],
+            'current': record['seconds'],
+            'ratio': ratio,
+            'regression': regression,
+        })
+    return comparisons
@@ -0,0 +1,175 @@
+"""
+Command-line entry point for running Data Sweeper pipelines without Streamlit.
+
+Example:
+    python cli.py "exports/*.csv" --dedupe --missing drop --format Parquet -o cleaned/
+"""
+import argparse
+import sys
+
+from utils.backends import duckdb_available
+from utils.batch import expand_inputs, load_spec, run_batch, validate_spec
+from utils.dedup import KEEP_OPTIONS
+from utils.exporter import EXPORT_FORMATS
+from utils.parallel import run_parallel
+from utils.validation import load_rules, validate_path
+
+MISSING_STRATEGIES = {
+    'drop': "Drop rows",
+    'zero': "Fill with 0",
+    'mean': "Fill with mean",
+    'median': "Fill with median",
+    'mode': "Fill with mode",
+    'ffill': "Forward fill",
+    'bfill': "Backward fill",
+    'interpolate': "Interpolate",
+}
+
+
+def build_parser():
+    """
+    Build the argument parser for the data-sweeper command.
+
+    Returns:
+        argparse.ArgumentParser: Configured parser
+    """
+    parser = argparse.ArgumentParser(
+        prog="data-sweeper",
+        description="Clean, project and convert data files in batch."
+    )
+    parser.add_argument("inputs", nargs="+", help="Files, directories or glob patterns to process")
+    parser.add_argument("-o", "--output-dir", default="cleaned", help="Directory for cleaned files")
+    parser.add_argument(
+        "--spec",
+        help="JSON or YAML pipeline spec, e.g. a recipe saved from the app; command-line options override it"
+    )
+    parser.add_argument("--dedupe", action="store_true", default=None, help="Remove duplicate rows")
+    parser.add_argument("--dedupe-on", help="Comma-separated key columns for --dedupe (default: all columns)")
+    parser.add_argument(
+        "--keep",
+        choices=list(KEEP_OPTIONS),
+        default="first",
+        help="Which duplicate to keep; 'none' drops every copy"
+    )
+    parser.add_argument("--missing", choices=sorted(MISSING_STRATEGIES), help="Missing value strategy")
+    parser.add_argument("--columns", help="Comma-separated columns to keep")
+    parser.add_argument("--format", choices=list(EXPORT_FORMATS), help="Output format")
+    parser.add_argument("--compression", choices=["None", "gzip", "zstd"], help="CSV compression")
+    parser.add_argument(
+        "--rules",
+        help="JSON column rules; files that break them are reported and not processed"
+    )
+    parser.add_argument("--workers", type=int, help="Number of parallel workers")
+    parser.add_argument("--threads", action="store_true", help="Use threads instead of processes")
+    parser.add_argument(
+        "--engine",
+        choices=["pandas", "duckdb"],
+        default="pandas",
+        help="Execution engine; duckdb processes CSV/Parquet files larger than memory"
+    )
+    return parser
+
+
+def spec_from_args(args):
+    """
+    Combine an optional spec file with command-line overrides.
+
+    Args:
+        args (argparse.Namespace): Parsed arguments
+
+    Returns:
+        dict: Validated spec
+    """
+    spec = load_spec(args.spec) if args.spec else validate_spec({})
+
+    if args.dedupe is not None or args.missing is not None:
+        steps = []
+        if args.dedupe:
+            subset = [col.strip() for col in args.dedupe_on.split(",") if col.strip()] if args.dedupe_on else None
+            steps.append({'op': 'drop_duplicates', 'subset': subset, 'keep': args.keep})
+        if args.missing:
+            steps.append({'op': 'missing_values', 'strategy': MISSING_STRATEGIES[args.missing]})
+        spec['steps'] = steps
+    if args.columns:
+        spec['columns'] = [col.strip() for col in args.columns.split(",") if col.strip()]
+    if args.format:
+        spec['output_format'] = args.format
+    if args.compression:
+        spec['compression'] = args.compression
+    return validate_spec(spec)
+
+
+def main(argv=None):
+    """
+    Run the data-sweeper command.
+
+    Args:
+        argv (list): Arguments, defaults to sys.argv[1:]
+
+    Returns:
+        int: Exit status, 1 if any file failed
+    """
+    args = build_parser().parse_args(argv)
+    try:
+        spec = spec_from_args(args)
+        rules = load_rules(args.rules) if args.rules else None
+    except (OSError, ValueError) as error:
+        print(f"error: {error}", file=sys.stderr)
+        return 2
+
+    paths = expand_inputs(args.inputs)
+    if not paths:
+        print("error: no supported input files found", file=sys.stderr)
+        return 2
+
+    total = len(paths)
+    failures = 0
+    if args.engine == "duckdb" and not duckdb_available():
+        print("error: the duckdb engine requires the duckdb package", file=sys.stderr)
+        return 2
+
+    if rules:
+        reports = run_parallel(lambda path: validate_path(path, rules), paths, args.workers)
+        valid_paths = []
+        for path, (report, error) in zip(paths, reports):
+            if error is None and report['passed']:
+                valid_paths.append(path)
+                continue
+            failures += 1
+            if error is not None:
+                print(f"INVALID {path}: {error}", file=sys.stderr)
+                continue
+            if report['missing_columns']:
+                print(f"INVALID {path}: missing columns {report['missing_columns']}", file=sys.stderr)
+            for violation in report['violations']:
+                rows = ", ".join(str(sample['row']) for sample in violation['sample'])
+                print(
+                    f"INVALID {path}: {violation['violations']:,} rows break {violation['rule']} on "
+                    f"{violation['column']!r} (expected {violation['expected']}), e.g. rows {rows}",
+                    file=sys.stderr
+                )
+        paths = valid_paths
+
+    try:
+        results = run_batch(
+            paths, spec, args.output_dir, args.workers, use_processes=not args.threads, engine=args.engine
+        )
+    except ValueError as error:
+        print(f"error: {error}", file=sys.stderr)
+        return 2
+    for path, summary, error in results:
+        if error is not None:
+            failures += 1
+            print(f"FAILED {path}: {error}", file=sys.stderr)
+        else:
+            print(
+                f"{path} -> {summary['output']}: {summary['rows_in']:,} -> {summary['rows_out']:,} rows, "
+                f"{summary['columns']} columns in {summary['seconds']:.2f}s"
+            )
+
+    print(f"Processed {total - failures} of {total} files")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
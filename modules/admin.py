@@ -0,0 +1,42 @@
+import streamlit as st
+import pandas as pd
+from utils.session_store import current_session_id, get_session_store
+
+
+def show_admin_panel():
+    """
+    Show memory use of every session in the sidebar.
+
+    Lists resident and spilled frames, cache sizes and idle time per
+    session, against the process-wide budget of the session store.
+    """
+    store = get_session_store()
+    stats = store.stats()
+    usage = store.usage()
+    this_session = current_session_id()
+
+    with st.sidebar.expander("🛡️ Session memory", expanded=False):
+        used = stats['resident_bytes'] + stats['cache_bytes']
+        budget = stats['budget_bytes']
+        st.progress(
+            min(used / budget, 1.0) if budget else 1.0,
+            text=f"{used / 1024 ** 2:,.1f} MB of {budget / 1024 ** 2:,.0f} MB in use"
+        )
+        st.caption(f"{len(usage)} sessions, {stats['spills']} frames spilled, {stats['reloads']} reloaded")
+
+        if not usage:
+            st.info("ℹ️ No session holds any data")
+            return
+
+        rows = []
+        for session_id, row in sorted(usage.items(), key=lambda item: -(item[1]['memory_bytes'] + item[1]['cache_bytes'])):
+            rows.append({
+                'Session': session_id[:8] + (" (you)" if session_id == this_session else ""),
+                'Frames': row['frames'],
+                'Spilled': row['spilled'],
+                'Memory (MB)': round(row['memory_bytes'] / 1024 ** 2, 1),
+                'Caches (MB)': round(row['cache_bytes'] / 1024 ** 2, 1),
+                'On disk (MB)': round(row['disk_bytes'] / 1024 ** 2, 1),
+                'Idle (s)': int(row['idle_seconds']),
+            })
+        st.dataframe(pd.DataFrame(rows), hide_index=True)
@@ -1,23 +1,146 @@
 import streamlit as st
 import pandas as pd
+from utils.dedup import HASH_MIN_COLUMNS
+from utils.frame_view import display_safe
+from utils.imputation import IMPUTE_STRATEGIES, MISSING_VALUE_STRATEGIES
+from utils.parallel import run_parallel
+from utils.pipeline import PipelineCache, column_versions, run_pipeline
+from utils.profiler import profile_frame
+from utils.session_store import current_session_id, get_session_store
 
+# Per-column override choices; "default" follows the frame-wide strategy
+OVERRIDE_OPTIONS = ["default"] + list(IMPUTE_STRATEGIES)
 
-def clean_data(dataframes):
+
+def parse_constant(text, dtype):
+    """
+    Convert a constant typed in the editor to the column's type.
+
+    Args:
+        text (str): Value as typed
+        dtype: Column dtype
+
+    Returns:
+        object: Number for numeric columns, otherwise the text itself
+
+    Raises:
+        ValueError: If a numeric column gets a non-numeric value
+    """
+    if pd.api.types.is_integer_dtype(dtype):
+        number = float(text)
+        return int(number) if number.is_integer() else number
+    if pd.api.types.is_float_dtype(dtype):
+        return float(text)
+    return text
+
+
+def imputation_overrides(edited, dtypes, group_by):
+    """
+    Turn the per-column editor table into imputation specs.
+
+    Args:
+        edited (pd.DataFrame): Editor rows with Column, Strategy and Value
+        dtypes (pd.Series): Column dtypes of the frame
+        group_by (list): Grouping columns for forward and backward fills
+
+    Returns:
+        dict: Column name -> imputation spec, for rows not left on "default"
+    """
+    overrides = {}
+    for row in edited.itertuples(index=False):
+        if row.Strategy == "default":
+            continue
+        spec = {'strategy': row.Strategy}
+        if row.Strategy == 'constant':
+            spec['value'] = parse_constant(str(row.Value or ""), dtypes[row.Column])
+        if row.Strategy in ('ffill', 'bfill') and group_by:
+            spec['group_by'] = list(group_by)
+        overrides[row.Column] = spec
+    return overrides
+
+
+KEEP_LABELS = {
+    "First occurrence": 'first',
+    "Last occurrence": 'last',
+    "None (drop every copy)": 'none',
+}
+
+
+def get_pipeline_cache():
+    """
+    Return this session's pipeline cache, creating it on first use.
+
+    The cache is registered with the session store, which counts its memory
+    against the process budget and may clear it when the session goes idle.
+
+    Returns:
+        PipelineCache: Cache of cleaning results keyed by data version and step prefix
+    """
+    if 'pipeline_cache' not in st.session_state:
+        st.session_state.pipeline_cache = PipelineCache()
+    get_session_store().attach_cache(current_session_id(), st.session_state.pipeline_cache)
+    return st.session_state.pipeline_cache
+
+
+def cleaned_frame_loaders(dataframes, data_versions=None):
+    """
+    Get callables that rebuild each cleaned frame on demand.
+
+    The callables hold the session's stored frames and pipeline cache rather
+    than the cleaned frames themselves, so a download button kept after the
+    rerun does not pin a frame the session store has spilled. Rebuilding is a
+    cache lookup while the result is still cached.
+
+    Args:
+        dataframes (dict): Dictionary of original dataframes, usually the session's SessionFrames
+        data_versions (dict): Optional mapping of filenames to data version identifiers
+
+    Returns:
+        dict: Filename -> zero-argument callable returning the cleaned frame
+    """
+    data_versions = data_versions or {}
+    cache = get_pipeline_cache()
+    steps = st.session_state.get('cleaning_steps', {})
+
+    def loader(filename):
+        file_steps, data_version = list(steps.get(filename, [])), data_versions.get(filename)
+        return lambda: run_pipeline(dataframes[filename], file_steps, data_version, cache)[0]
+
+    return {filename: loader(filename) for filename in dataframes}
+
+
+def clean_data(dataframes, data_versions=None):
     """
     Handle data cleaning operations for the Data Sweeper application.
 
+    The chosen options are turned into a declarative pipeline that is always
+    applied to the original dataframe. Results are memoized per data version
+    and step prefix, so unchanged reruns reuse the cached frame. Pipelines for
+    all files run on the shared worker pool. Per-column
+    version tokens of each cleaned frame are stored in
+    st.session_state.column_versions for the profiler, and each file's steps
+    in st.session_state.cleaning_steps so they can be saved as a recipe.
+
     Args:
-        dataframes (dict): Dictionary of dataframes to clean
+        dataframes (dict): Dictionary of original dataframes to clean
+        data_versions (dict): Optional mapping of filenames to data version identifiers
 
     Returns:
         dict: Dictionary of cleaned dataframes
     """
     cleaned_dataframes = {}
+    data_versions = data_versions or {}
+    cache = get_pipeline_cache()
+    if 'column_versions' not in st.session_state:
+        st.session_state.column_versions = {}
+    if 'cleaning_steps' not in st.session_state:
+        st.session_state.cleaning_steps = {}
 
+    # Collect every file's options first so the pipelines can run on the worker pool
+    jobs = []
     for filename, df in dataframes.items():
         with st.expander(f"🔧 Clean: {filename}", expanded=True):
-            # Create a copy to avoid modifying the original
-            df_clean = df.copy()
+            steps = []
 
             # Option to remove duplicates
             remove_duplicates = st.checkbox(
@@ -25,15 +148,40 @@ def clean_data(dataframes):
                 value=False,
                 key=f"remove_dup_{filename}"
             )
-
+            dup_col1, dup_col2 = st.columns(2)
+            with dup_col1:
+                subset = st.multiselect(
+                    "Key columns (all columns if empty)",
+                    options=list(df.columns),
+                    key=f"dup_subset_{filename}"
+                )
+            with dup_col2:
+                keep = st.radio(
+                    "Keep",
+                    options=list(KEEP_LABELS),
+                    horizontal=True,
+                    key=f"dup_keep_{filename}"
+                )
+            dedupe_step = {
+                'op': 'drop_duplicates',
+                'subset': subset or None,
+                'keep': KEEP_LABELS[keep],
+                'method': 'auto',
+            }
             if remove_duplicates:
-                original_rows = len(df_clean)
-                df_clean = df_clean.drop_duplicates()
-                removed_rows = original_rows - len(df_clean)
-                if removed_rows > 0:
-                    st.success(f"✅ Removed {removed_rows} duplicate rows from {filename}")
-                else:
-                    st.info(f"ℹ️ No duplicates found in {filename}")
+                steps.append(dedupe_step)
+            elif st.button("🔢 Count duplicates", key=f"count_dup_{filename}"):
+                # Run the step on its own; the cached result is reused once it is applied
+                try:
+                    _, dedupe_stats = run_pipeline(df, [dedupe_step], data_versions.get(filename), cache)
+                    key_count = len(subset or df.columns)
+                    method = "hashed" if key_count >= HASH_MIN_COLUMNS else "exact"
+                    st.info(
+                        f"ℹ️ {dedupe_stats[0]['rows_removed']} duplicate rows would be removed "
+                        f"from {filename} ({method} match on {key_count} column{'s' if key_count != 1 else ''})"
+                    )
+                except Exception as e:
+                    st.error(f"❌ Error counting duplicates in {filename}: {str(e)}")
 
             # Option to handle missing values
             col1, col2 = st.columns(2)
@@ -41,39 +189,121 @@ def clean_data(dataframes):
             with col1:
                 handle_missing = st.selectbox(
                     f"How to handle missing values in {filename}?",
-                    options=["Keep as is", "Drop rows", "Fill with 0", "Forward fill", "Backward fill"],
+                    options=["Keep as is"] + list(MISSING_VALUE_STRATEGIES),
                     key=f"missing_vals_{filename}"
                 )
+            with col2:
+                group_by = st.multiselect(
+                    "Fill forward/backward within groups of",
+                    options=list(df.columns),
+                    key=f"impute_group_{filename}"
+                )
+
+            # Per-column overrides, listing only columns that have missing values
+            data_version = data_versions.get(filename)
+            null_profiles = profile_frame(df, {col: data_version for col in df.columns} if data_version else None)
+            null_columns = [col for col, profile in null_profiles.items() if profile['nulls']]
+            overrides = {}
+            if null_columns:
+                st.caption("Per-column strategies (leave on \"default\" to use the choice above)")
+                edited = st.data_editor(
+                    pd.DataFrame({
+                        'Column': null_columns,
+                        'Nulls': [null_profiles[col]['nulls'] for col in null_columns],
+                        'Strategy': ["default"] * len(null_columns),
+                        'Value': [""] * len(null_columns),
+                    }),
+                    column_config={
+                        'Column': st.column_config.TextColumn(disabled=True),
+                        'Nulls': st.column_config.NumberColumn(disabled=True),
+                        'Strategy': st.column_config.SelectboxColumn(options=OVERRIDE_OPTIONS, required=True),
+                        'Value': st.column_config.TextColumn(help="Fill value for the constant strategy"),
+                    },
+                    hide_index=True,
+                    key=f"impute_columns_{filename}"
+                )
+                try:
+                    overrides = imputation_overrides(edited, df.dtypes, group_by)
+                except ValueError as e:
+                    st.error(f"❌ Invalid constant for {filename}: {str(e)}")
 
-            if handle_missing != "Keep as is":
-                if handle_missing == "Drop rows":
-                    original_rows = len(df_clean)
-                    df_clean = df_clean.dropna()
-                    removed_rows = original_rows - len(df_clean)
-                    st.success(f"✅ Dropped {removed_rows} rows with missing values in {filename}")
+            if overrides or (group_by and handle_missing in ("Forward fill", "Backward fill")):
+                default = None
+                if handle_missing != "Keep as is":
+                    default = dict(MISSING_VALUE_STRATEGIES[handle_missing])
+                    if group_by and default['strategy'] in ('ffill', 'bfill'):
+                        default['group_by'] = list(group_by)
+                steps.append({'op': 'impute', 'columns': overrides, 'default': default})
+            elif handle_missing != "Keep as is":
+                steps.append({'op': 'missing_values', 'strategy': handle_missing})
 
-                elif handle_missing == "Fill with 0":
-                    numeric_cols = df_clean.select_dtypes(include='number').columns
-                    df_clean[numeric_cols] = df_clean[numeric_cols].fillna(0)
-                    object_cols = df_clean.select_dtypes(include=['object']).columns
-                    df_clean[object_cols] = df_clean[object_cols].fillna('N/A')
-                    st.success(f"✅ Filled missing values with 0/N/A in {filename}")
+            # Results are rendered here once the pipeline has run
+            st.session_state.cleaning_steps[filename] = steps
+            jobs.append((filename, df, steps, st.container()))
 
-                elif handle_missing == "Forward fill":
-                    df_clean = df_clean.fillna(method='ffill')
-                    st.success(f"✅ Forward filled missing values in {filename}")
+    def run_job(job):
+        filename, df, steps, _ = job
+        data_version = data_versions.get(filename)
+        df_clean, step_stats = run_pipeline(df, steps, data_version, cache)
+        versions = {}
+        if data_version is not None:
+            versions = column_versions(data_version, df_clean.columns, steps, step_stats)
+        return df_clean, step_stats, versions, profile_frame(df_clean, versions)
 
-                elif handle_missing == "Backward fill":
-                    df_clean = df_clean.fillna(method='bfill')
-                    st.success(f"✅ Backward filled missing values in {filename}")
+    for (filename, df, steps, result_area), (result, error) in zip(jobs, run_parallel(run_job, jobs)):
+        with result_area:
+            if error is not None:
+                st.error(f"❌ Error cleaning {filename}: {str(error)}")
+                cleaned_dataframes[filename] = df
+                st.session_state.column_versions[filename] = {}
+                continue
+
+            df_clean, step_stats, versions, profiles = result
+            st.session_state.column_versions[filename] = versions
+
+            for step, stats in zip(steps, step_stats):
+                if step['op'] == 'drop_duplicates':
+                    if stats['rows_removed'] > 0:
+                        st.success(f"✅ Removed {stats['rows_removed']} duplicate rows from {filename}")
+                    else:
+                        st.info(f"ℹ️ No duplicates found in {filename}")
+
+                elif step['op'] == 'missing_values':
+                    if step['strategy'] == "Drop rows":
+                        st.success(f"✅ Dropped {stats['rows_removed']} rows with missing values in {filename}")
+                    elif step['strategy'] == "Fill with 0":
+                        st.success(f"✅ Filled missing values with 0/N/A in {filename}")
+                    elif step['strategy'] == "Forward fill":
+                        st.success(f"✅ Forward filled missing values in {filename}")
+                    elif step['strategy'] == "Backward fill":
+                        st.success(f"✅ Backward filled missing values in {filename}")
+                    else:
+                        st.success(f"✅ Applied \"{step['strategy']}\" to missing values in {filename}")
+
+                elif step['op'] == 'impute':
+                    st.success(f"✅ Imputed missing values in {len(stats['null_counts'])} columns of {filename}")
+
+                if stats.get('null_counts'):
+                    st.dataframe(display_safe(pd.DataFrame([
+                        {
+                            'Column': col,
+                            'Strategy': entry['strategy'],
+                            'Nulls before': entry['nulls_before'],
+                            'Nulls after': entry['nulls_after'],
+                            'Fill value': entry['fill_value'],
+                        }
+                        for col, entry in stats['null_counts'].items()
+                    ])), hide_index=True)
 
             # Show info about the cleaned dataframe
-            col1, col2 = st.columns(2)
+            col1, col2, col3 = st.columns(3)
             with col1:
                 st.metric(label="Original Rows", value=df.shape[0])
             with col2:
                 st.metric(label="Cleaned Rows", value=df_clean.shape[0])
+            with col3:
+                st.metric(label="Missing Values", value=sum(p['nulls'] for p in profiles.values()))
 
             cleaned_dataframes[filename] = df_clean
 
-    return cleaned_dataframes
\ No newline at end of file
+    return cleaned_dataframes
@@ -0,0 +1,272 @@
+import hashlib
+
+import streamlit as st
+import pandas as pd
+from utils import settings
+from utils.combine import (
+    JOIN_STRATEGIES, JOIN_TYPES, concat_frames, estimate_concat, estimate_join, join_frames, schema_groups
+)
+from utils.session_store import SessionFrames, current_session_id, get_session_store
+
+STRATEGY_LABELS = {
+    'auto': "Auto (pick by size and key layout)",
+    'hash': "Hash (pandas merge)",
+    'categorical': "Categorical key codes",
+    'sort_merge': "Sort-merge (pre-sorted keys)",
+    'chunked': "Chunked (large right-hand side)",
+}
+
+
+def input_fingerprint(names, dataframes):
+    """
+    Identify the current contents of the frames a combined result was built from.
+
+    Cleaned and combined frames are identified by their column versions. A file
+    whose cleaning produced none falls back to its data version, the hash of the
+    upload's contents, and a frame with neither is hashed row by row.
+
+    Args:
+        names (list): Names of the input frames
+        dataframes (dict): Dictionary of dataframes with filenames as keys
+
+    Returns:
+        str: Digest that changes whenever one of the inputs changes
+    """
+    column_versions = st.session_state.get('column_versions', {})
+    data_versions = st.session_state.get('data_versions', {})
+    parts = []
+    for name in names:
+        versions = column_versions.get(name)
+        if versions:
+            parts.append(repr(sorted(versions.items())))
+        elif data_versions.get(name) is not None:
+            parts.append(f"{name}@{data_versions[name]}")
+        else:
+            df = dataframes[name]
+            content = hashlib.sha1(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+            content.update(repr(list(df.columns)).encode())
+            parts.append(f"{name}#{content.hexdigest()}")
+    return hashlib.sha1("|".join(parts).encode()).hexdigest()[:16]
+
+
+def run_recipe(recipe, dataframes):
+    """
+    Build a combined frame from its recipe.
+
+    Args:
+        recipe (dict): 'mode' ("concat" or "join") and the options of that mode
+        dataframes (dict): Dictionary of dataframes with filenames as keys
+
+    Returns:
+        tuple: (pd.DataFrame, str) with the result and a description of how it was built
+    """
+    if recipe['mode'] == 'concat':
+        frames = {name: dataframes[name] for name in recipe['inputs']}
+        return concat_frames(frames, recipe['source_column']), f"{len(frames)} files concatenated"
+
+    left, right = (dataframes[name] for name in recipe['inputs'])
+    df, strategy = join_frames(left, right, recipe['on'], recipe['how'], recipe['strategy'])
+    return df, f"{recipe['how']} join on {', '.join(map(str, recipe['on']))} ({strategy} strategy)"
+
+
+def show_estimate(estimate):
+    """
+    Display the predicted size of a combined frame.
+
+    Args:
+        estimate (dict): Result of estimate_concat or estimate_join
+    """
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Rows", f"{estimate['rows']:,}")
+    col2.metric("Result size", f"{estimate['memory_bytes'] / 1024 ** 2:,.1f} MB")
+    if 'peak_bytes' in estimate:
+        col3.metric("Peak memory", f"{estimate['peak_bytes'] / 1024 ** 2:,.1f} MB")
+        st.caption(
+            f"Strategy: {estimate['strategy']} · {estimate['key_cardinality']:,} distinct keys · "
+            f"{estimate['left_matched']:,} left and {estimate['right_matched']:,} right rows matched"
+        )
+    peak = estimate.get('peak_bytes', estimate['memory_bytes'])
+    if peak > settings.MEMORY_CEILING_BYTES:
+        st.warning(
+            f"⚠️ This needs about {peak / 1024 ** 3:,.1f} GB, more than the "
+            f"{settings.MEMORY_CEILING_BYTES / 1024 ** 3:,.1f} GB memory ceiling"
+        )
+
+
+def concat_options(dataframes):
+    """
+    Collect the options for concatenating files with matching columns.
+
+    Args:
+        dataframes (dict): Dictionary of dataframes with filenames as keys
+
+    Returns:
+        dict: Recipe, or None when fewer than two files are chosen
+    """
+    groups = schema_groups(dataframes)
+    inputs = st.multiselect(
+        "Files to concatenate",
+        options=list(dataframes),
+        default=groups[0] if len(groups[0]) > 1 else [],
+        key="combine_concat_files",
+        help="Files must have the same columns"
+    )
+    source_column = None
+    if st.checkbox("Add a column with the source file name", value=True, key="combine_source"):
+        source_column = "source_file"
+    if len(inputs) < 2:
+        st.info("ℹ️ Choose at least two files with the same columns")
+        return None
+
+    columns = [frozenset(dataframes[name].columns) for name in inputs]
+    if len(set(columns)) > 1:
+        st.error("❌ The chosen files do not have the same columns")
+        return None
+    show_estimate(estimate_concat({name: dataframes[name] for name in inputs}))
+    return {'mode': 'concat', 'inputs': inputs, 'source_column': source_column}
+
+
+def join_options(dataframes):
+    """
+    Collect the options for joining two files on key columns.
+
+    Args:
+        dataframes (dict): Dictionary of dataframes with filenames as keys
+
+    Returns:
+        dict: Recipe, or None when no key columns are chosen
+    """
+    names = list(dataframes)
+    col1, col2 = st.columns(2)
+    with col1:
+        left_name = st.selectbox("Left file", options=names, key="combine_left")
+    with col2:
+        right_name = st.selectbox("Right file", options=names, index=min(1, len(names) - 1), key="combine_right")
+    left, right = dataframes[left_name], dataframes[right_name]
+
+    common = [col for col in left.columns if col in right.columns]
+    on = st.multiselect("Key columns", options=common, key="combine_on")
+    col1, col2 = st.columns(2)
+    with col1:
+        how = st.radio("Join type", options=list(JOIN_TYPES), horizontal=True, key="combine_how")
+    with col2:
+        strategy = st.selectbox(
+            "Strategy",
+            options=list(JOIN_STRATEGIES),
+            format_func=STRATEGY_LABELS.get,
+            key="combine_strategy"
+        )
+    if not on:
+        st.info("ℹ️ Choose the key columns to join on")
+        return None
+
+    recipe = {
+        'mode': 'join', 'inputs': [left_name, right_name], 'on': on, 'how': how, 'strategy': strategy,
+    }
+    # Estimating factorizes both keys, so it is done once per recipe and input version
+    estimate_key = (repr(recipe), input_fingerprint(recipe['inputs'], dataframes))
+    cached = st.session_state.get('combine_estimate')
+    if cached is None or cached[0] != estimate_key:
+        with st.spinner("Estimating join size..."):
+            cached = (estimate_key, estimate_join(left, right, on, how, strategy))
+        st.session_state.combine_estimate = cached
+    show_estimate(cached[1])
+    return recipe
+
+
+def forget_combined(name):
+    """
+    Release a combined frame, its recipe and its per-file state.
+
+    Args:
+        name (str): Name of the combined frame
+    """
+    st.session_state.combine_recipes.pop(name, None)
+    st.session_state.combined_dataframes.pop(name, None)
+    st.session_state.column_versions.pop(name, None)
+    st.session_state.pop(f"selected_cols_{name}", None)
+
+
+def combined_frame_loaders():
+    """
+    Get callables that fetch each combined frame from the session store on demand.
+
+    Returns:
+        dict: Combined frame name -> zero-argument callable returning the frame
+    """
+    combined = st.session_state.get('combined_dataframes', {})
+    return {name: (lambda name=name: combined[name]) for name in st.session_state.get('combine_recipes', {})}
+
+
+def combine_data(dataframes):
+    """
+    Concatenate files with matching columns or join files on chosen keys.
+
+    Combined frames are kept with their recipe and rebuilt when one of their
+    inputs changes, e.g. after a different cleaning option is picked.
+    Out-of-core files are not offered. Column version tokens of each
+    combined frame are stored in st.session_state.column_versions.
+
+    Args:
+        dataframes (dict): Dictionary of cleaned dataframes with filenames as keys
+
+    Returns:
+        dict: Dictionary of combined dataframes with their names as keys
+    """
+    if 'combine_recipes' not in st.session_state:
+        st.session_state.combine_recipes = {}
+    if 'column_versions' not in st.session_state:
+        st.session_state.column_versions = {}
+    if 'combined_dataframes' not in st.session_state:
+        st.session_state.combined_dataframes = SessionFrames(get_session_store(), current_session_id(), 'combined')
+    recipes = st.session_state.combine_recipes
+    combined = st.session_state.combined_dataframes
+
+    in_memory = {name: df for name, df in dataframes.items() if not getattr(df, 'out_of_core', False)}
+    # Drop combined frames whose inputs are gone
+    for name in [name for name, entry in recipes.items() if any(f not in in_memory for f in entry['recipe']['inputs'])]:
+        forget_combined(name)
+
+    with st.expander("🔗 Combine files", expanded=bool(recipes)):
+        if len(in_memory) < 2:
+            st.info("ℹ️ Upload at least two files to combine them")
+        else:
+            mode = st.radio(
+                "Combine by",
+                options=["Concatenate rows", "Join on keys"],
+                horizontal=True,
+                key="combine_mode"
+            )
+            recipe = concat_options(in_memory) if mode == "Concatenate rows" else join_options(in_memory)
+            name = st.text_input("Name of the combined file", value="combined", key="combine_name").strip()
+            if st.button("🔗 Combine", key="combine_run", disabled=recipe is None or not name):
+                if name in in_memory:
+                    st.error(f"❌ {name} is already the name of an uploaded file")
+                else:
+                    recipes[name] = {'recipe': recipe, 'fingerprint': None}
+
+        for name, entry in list(recipes.items()):
+            fingerprint = input_fingerprint(entry['recipe']['inputs'], in_memory)
+            if entry['fingerprint'] != fingerprint or name not in combined:
+                try:
+                    with st.spinner(f"Building {name}..."):
+                        combined[name], entry['description'] = run_recipe(entry['recipe'], in_memory)
+                    entry['fingerprint'] = fingerprint
+                    version = hashlib.sha1(f"{entry['recipe']!r}|{fingerprint}".encode()).hexdigest()[:16]
+                    st.session_state.column_versions[name] = {
+                        col: f"combined:{version}" for col in combined[name].columns
+                    }
+                except (ValueError, MemoryError) as e:
+                    st.error(f"❌ Error combining {name}: {str(e)}")
+                    forget_combined(name)
+                    continue
+            df = combined[name]
+            col1, col2 = st.columns([4, 1])
+            with col1:
+                st.write(f"**{name}:** {df.shape[0]:,} rows × {df.shape[1]:,} columns · {entry['description']}")
+            with col2:
+                if st.button("🗑️ Remove", key=f"combine_remove_{name}"):
+                    forget_combined(name)
+                    st.rerun()
+
+    return {name: combined[name] for name in recipes}
@@ -1,65 +1,137 @@
-import streamlit as st
-import pandas as pd
 import io
 
+import streamlit as st
+from utils.exporter import (
+    EXCEL_MAX_ROWS,
+    EXPORT_FORMATS,
+    available_compressions,
+    compression_suffix,
+    write_export,
+    write_zip,
+)
+from utils.file_utils import get_base_name, unique_output_names
+from utils.frame_view import FrameView
+from utils.instrumentation import timed_stage
+
+
+def deferred_export(write_to):
+    """
+    Wrap an export writer so it only runs when its download button is clicked.
+
+    Streamlit only accepts a download as one bytes object, which it keeps in
+    memory while serving it, so the whole export is held in memory once built.
+    It is written straight into an in-memory buffer rather than through a
+    temporary file that would only be read back whole.
+
+    The work happens outside the script run, so it is timed into the
+    process-wide stage metrics rather than the rerun's Performance panel.
+
+    Args:
+        write_to (callable): Writes the export into the binary stream it is given
+
+    Returns:
+        callable: Zero-argument callable returning the export bytes
+    """
+    def generate():
+        with timed_stage("export"):
+            buffer = io.BytesIO()
+            write_to(buffer)
+            return buffer.getvalue()
+    return generate
+
 
-def convert_and_download(dataframes, selected_columns):
+def convert_and_download(dataframes, selected_columns, loaders=None):
     """
     Handle file conversion and download functionality for the Data Sweeper application.
 
+    Exports are generated lazily when a download button is clicked, written in
+    chunks into the bytes handed to Streamlit, so idle reruns do no serialization.
+    Streamlit keeps the export callables after the rerun, so they fetch their
+    frame through a loader instead of holding it.
+
     Args:
         dataframes (dict): Dictionary of dataframes to convert
         selected_columns (dict): Dictionary of selected columns for each dataframe
+        loaders (dict): Optional mapping of filenames to zero-argument callables
+            returning the frame at click time; the given frames are used otherwise
     """
+    output_formats = {}
+    if loaders is None:
+        loaders = {filename: (lambda df=df: df) for filename, df in dataframes.items()}
+
+    def export_subset(filename):
+        columns = selected_columns.get(filename)
+        return lambda: FrameView(loaders[filename](), columns).materialize()
+
     for filename, df in dataframes.items():
         with st.expander(f"💾 Convert and download: {filename}", expanded=True):
-            # Get the subset of the dataframe with selected columns only
-            cols_to_use = selected_columns.get(filename, df.columns.tolist())
-            df_subset = df[cols_to_use]
+            view = FrameView(df, selected_columns.get(filename))
+            subset = export_subset(filename)
+            base_name = get_base_name(filename)
 
             # Choose output format
             output_format = st.radio(
                 f"Select output format for {filename}:",
-                options=["CSV", "Excel"],
+                options=list(EXPORT_FORMATS),
                 key=f"format_{filename}",
                 horizontal=True
             )
+            output_formats[filename] = output_format
 
-            # Generate the converted file based on selected format
+            # Generate the converted file only when the button is clicked
             if output_format == "CSV":
-                csv_buffer = io.StringIO()
-                df_subset.to_csv(csv_buffer, index=False)
-                csv_str = csv_buffer.getvalue()
+                compression = st.radio(
+                    f"Compression for {filename}:",
+                    options=available_compressions(),
+                    key=f"compression_{filename}",
+                    horizontal=True
+                )
+                suffix = compression_suffix(compression)
 
                 st.download_button(
                     label=f"📥 Download {filename} as CSV",
-                    data=csv_str,
-                    file_name=f"cleaned_{filename.replace('.csv', '').replace('.xlsx', '').replace('.xls', '')}.csv",
-                    mime="text/csv",
+                    data=deferred_export(lambda stream, s=subset, c=compression: write_export(s(), stream, "CSV", c)),
+                    file_name=f"cleaned_{base_name}.csv{suffix}",
+                    mime="application/octet-stream" if suffix else "text/csv",
                     key=f"download_csv_{filename}"
                 )
 
-            elif output_format == "Excel":
-                excel_buffer = io.BytesIO()
-                with pd.ExcelWriter(excel_buffer, engine='xlsxwriter') as writer:
-                    df_subset.to_excel(writer, index=False, sheet_name='Sheet1')
-                excel_buffer.seek(0)
-
+            else:
+                if output_format == "Excel" and view.shape[0] >= EXCEL_MAX_ROWS:
+                    st.warning(f"⚠️ Excel holds at most {EXCEL_MAX_ROWS - 1:,} rows; use Parquet, Feather or CSV instead.")
+                export_format = EXPORT_FORMATS[output_format]
                 st.download_button(
-                    label=f"📥 Download {filename} as Excel",
-                    data=excel_buffer,
-                    file_name=f"cleaned_{filename.replace('.csv', '').replace('.xlsx', '').replace('.xls', '')}.xlsx",
-                    mime="application/vnd.ms-excel",
-                    key=f"download_excel_{filename}"
+                    label=f"📥 Download {filename} as {output_format}",
+                    data=deferred_export(lambda stream, s=subset, f=output_format: write_export(s(), stream, f)),
+                    file_name=f"cleaned_{base_name}.{export_format['extension']}",
+                    mime=export_format['mime'],
+                    key=f"download_{export_format['extension']}_{filename}"
                 )
 
             # Show file info
             col1, col2 = st.columns(2)
             with col1:
-                st.metric(label="Rows", value=df_subset.shape[0])
+                st.metric(label="Rows", value=view.shape[0])
             with col2:
-                st.metric(label="Columns", value=df_subset.shape[1])
+                st.metric(label="Columns", value=view.shape[1])
+
+    # Download every cleaned file as one zip archive
+    if len(dataframes) > 1:
+        # data.csv and data.xlsx would otherwise both become cleaned_data.csv and shadow each other
+        member_names = unique_output_names(
+            list(dataframes), [EXPORT_FORMATS[output_formats[filename]]['extension'] for filename in dataframes]
+        )
+        members = [
+            (member_name, export_subset(filename), output_formats[filename])
+            for filename, member_name in zip(dataframes, member_names)
+        ]
 
-            # Also provide option to download all as a zip
-            if len(dataframes) > 1:
-                st.info("ℹ️ Note: For multiple files, you can download them individually above.")
\ No newline at end of file
+        st.download_button(
+            label=f"🗜️ Download all {len(dataframes)} files as ZIP",
+            data=deferred_export(lambda stream: write_zip(
+                [(name, subset(), fmt) for name, subset, fmt in members], stream
+            )),
+            file_name="cleaned_files.zip",
+            mime="application/zip",
+            key="download_all_zip"
+        )
@@ -0,0 +1,171 @@
+import math
+import time
+
+import streamlit as st
+import pandas as pd
+from utils.explorer import FrameIndex, is_range_column
+from utils.frame_view import display_safe
+from utils.session_store import current_session_id, get_session_store
+
+PAGE_SIZES = [10, 25, 50, 100, 500]
+
+# Columns with more distinct values get a substring filter; every option of a pick list is sent to the browser
+PICK_LIST_MAX_VALUES = 200
+
+
+def get_frame_index(filename, df, data_version=None):
+    """
+    Return the index of a file, building a new one when the file changed.
+
+    Sort orders are precomputed on a background thread when the index is
+    created, so the first sort usually finds its order ready. The index is
+    registered with the session store, which counts its memory against the
+    process budget and may clear it when the session goes idle.
+
+    Args:
+        filename (str): File key in the session
+        df (pd.DataFrame): Current contents of the file
+        data_version (str): Version token of the contents, if known
+
+    Returns:
+        FrameIndex: Index over the current contents
+    """
+    if 'explorer_indexes' not in st.session_state:
+        st.session_state.explorer_indexes = {}
+    version = data_version if data_version is not None else id(df)
+    cached = st.session_state.explorer_indexes.get(filename)
+    if cached is None or cached[0] != version or cached[1].n_rows != len(df):
+        cached = (version, FrameIndex(len(df)))
+        get_session_store().attach_cache(current_session_id(), cached[1], name=f"explorer:{filename}")
+        cached[1].precompute(df)
+        st.session_state.explorer_indexes[filename] = cached
+    return cached[1]
+
+
+def forget_frame_index(filename):
+    """
+    Release the index of a removed file.
+
+    Args:
+        filename (str): File key in the session
+    """
+    get_session_store().detach_cache(current_session_id(), f"explorer:{filename}")
+    st.session_state.get('explorer_indexes', {}).pop(filename, None)
+
+
+def _plain(value):
+    """Convert a numpy or pandas scalar to the Python type Streamlit widgets take."""
+    if isinstance(value, pd.Timestamp):
+        return value.to_pydatetime()
+    return value.item() if hasattr(value, 'item') else value
+
+
+def column_filter(filename, df, index, col):
+    """
+    Show the filter widget of one column.
+
+    Numeric and datetime columns get a range slider, columns with at most
+    PICK_LIST_MAX_VALUES distinct values a pick list of them and other columns
+    a substring match.
+
+    Args:
+        filename (str): File key in the session
+        df (pd.DataFrame): The file
+        index (FrameIndex): Index over the file
+        col: Column to filter
+
+    Returns:
+        tuple: Filter spec for FrameIndex.query, or None when it keeps every row
+    """
+    key = f"explore_filter_{filename}_{col}"
+    if is_range_column(df[col]):
+        low, high = index.bounds(df, col)
+        if low is None or low == high:
+            st.caption(f"{col}: a single value, nothing to filter")
+            return None
+        low, high = _plain(low), _plain(high)
+        chosen = st.slider(str(col), min_value=low, max_value=high, value=(low, high), key=key)
+        if tuple(chosen) == (low, high):
+            return None
+        return ('range', *chosen)
+
+    _, uniques = index.codes(df, col)
+    if len(uniques) <= PICK_LIST_MAX_VALUES:
+        values = st.multiselect(str(col), options=uniques.tolist(), format_func=str, key=key)
+        return ('values', values) if values else None
+    text = st.text_input(f"{col} contains", key=key).strip()
+    return ('contains', text) if text else None
+
+
+def explore_data(filename, df, data_version=None):
+    """
+    Browse a file page by page with column filters, sorting and text search.
+
+    Queries run against a FrameIndex and return row positions, so only the
+    visible page is copied and sent to the browser. Out-of-core files show
+    their first rows only.
+
+    Args:
+        filename (str): File key in the session
+        df (pd.DataFrame): The file
+        data_version (str): Version token of the file contents, if known
+    """
+    st.write(f"**Shape:** {df.shape}")
+    if getattr(df, 'out_of_core', False):
+        st.dataframe(display_safe(df.head(10)))
+        return
+
+    index = get_frame_index(filename, df, data_version)
+    columns = list(df.columns)
+    col1, col2, col3 = st.columns([3, 2, 1])
+    with col1:
+        search = st.text_input("🔎 Search text columns", key=f"explore_search_{filename}")
+    with col2:
+        sort_by = st.selectbox(
+            "Sort by",
+            options=[None] + columns,
+            format_func=lambda col: "File order" if col is None else str(col),
+            key=f"explore_sort_{filename}"
+        )
+    with col3:
+        descending = st.toggle("Descending", key=f"explore_descending_{filename}", disabled=sort_by is None)
+
+    filters = {}
+    filter_columns = st.multiselect("Filter columns", options=columns, key=f"explore_filters_{filename}")
+    for col in filter_columns:
+        spec = column_filter(filename, df, index, col)
+        if spec is not None:
+            filters[col] = spec
+
+    start = time.perf_counter()
+    # The index keeps the last result, so moving between pages only slices it
+    try:
+        with st.spinner("Querying..."):
+            positions = index.cached_query(df, filters, search, sort_by, ascending=not descending)
+    except (TypeError, ValueError) as e:
+        st.error(f"❌ Could not apply the filters: {str(e)}")
+        return
+    total = index.count(positions)
+
+    col1, col2 = st.columns([1, 1])
+    with col1:
+        page_size = st.selectbox("Rows per page", options=PAGE_SIZES, key=f"explore_page_size_{filename}")
+    pages = max(1, math.ceil(total / page_size))
+    page_key = f"explore_page_{filename}"
+    # A new query starts on its first page
+    page_query = repr((filters, search.strip(), sort_by, descending, page_size))
+    if st.session_state.get(f"explore_query_{filename}") != page_query:
+        st.session_state[f"explore_query_{filename}"] = page_query
+        st.session_state[page_key] = 1
+    st.session_state[page_key] = min(st.session_state.get(page_key, 1), pages)
+    with col2:
+        page = st.number_input(f"Page (of {pages:,})", min_value=1, max_value=pages, step=1, key=page_key)
+
+    first = (page - 1) * page_size
+    last = min(first + page_size, total)
+    st.dataframe(display_safe(index.page(df, positions, first, last)))
+    elapsed = time.perf_counter() - start
+    if total:
+        st.caption(f"Rows {first + 1:,}–{last:,} of {total:,} matching · {elapsed * 1000:,.0f} ms")
+    else:
+        st.caption(f"No rows match · {elapsed * 1000:,.0f} ms")
@@ -0,0 +1,72 @@
+import streamlit as st
+import pandas as pd
+from utils import settings
+from utils.instrumentation import STAGE_METRICS, pyinstrument_available
+from utils.warmup import warmup_status
+
+
+def show_performance_panel(recorder):
+    """
+    Show the sidebar "Performance" panel when it is switched on.
+
+    Lists wall time, CPU time, peak memory growth and rows for each stage of
+    this rerun, offers cProfile/pyinstrument capture of subsequent reruns and
+    a download of the process-wide metrics in Prometheus text format.
+
+    Args:
+        recorder (RunRecorder): Stage records of the current rerun
+    """
+    if not st.sidebar.checkbox("⏱️ Performance", value=False, key="show_performance"):
+        return
+
+    with st.sidebar.container():
+        if recorder.records:
+            rows = [
+                {
+                    'Stage': record['stage'],
+                    'Wall (ms)': round(record['wall_seconds'] * 1000, 1),
+                    'CPU (ms)': round(record['cpu_seconds'] * 1000, 1),
+                    'Peak Δ (MB)': (
+                        round(record['peak_memory_delta'] / 1024 ** 2, 1)
+                        if record['peak_memory_delta'] is not None else None
+                    ),
+                    'Rows': record['rows'],
+                }
+                for record in recorder.records
+            ]
+            st.dataframe(pd.DataFrame(rows), hide_index=True)
+            st.caption(f"Rerun took {recorder.wall_seconds * 1000:,.0f} ms in total")
+        else:
+            st.info("ℹ️ Upload files to see a per-stage breakdown")
+
+        warmup = warmup_status()
+        if warmup['started']:
+            steps = ", ".join(f"{name} {seconds * 1000:,.0f} ms" for name, seconds in warmup['timings'].items())
+            st.caption(f"🔥 Warm-up {'finished' if warmup['done'] else 'running'}: {steps or 'starting'}")
+
+        # Profiling applies from the next rerun onward
+        engines = ["cProfile"] + (["pyinstrument"] if pyinstrument_available() else [])
+        st.checkbox("🔬 Profile reruns", value=False, key="profile_reruns")
+        st.radio("Profiler", options=engines, horizontal=True, key="profile_engine")
+
+        profile = st.session_state.get('last_profile')
+        if profile is not None:
+            with st.expander(f"Last {profile['engine']} profile", expanded=False):
+                st.code(profile['text'], language=None)
+            st.download_button(
+                label="📥 Download profile",
+                data=profile['data'],
+                file_name=profile['filename'],
+                mime="application/octet-stream",
+                key="download_profile"
+            )
+
+        st.download_button(
+            label="📥 Prometheus metrics",
+            data=STAGE_METRICS.prometheus_text(),
+            file_name="data_sweeper_metrics.txt",
+            mime="text/plain",
+            key="download_metrics"
+        )
+        if settings.METRICS_PORT:
+            st.caption(f"Metrics are served at :{settings.METRICS_PORT}/metrics")
@@ -0,0 +1,225 @@
+import io
+import time
+
+import streamlit as st
+import pandas as pd
+from modules.converter import deferred_export
+from utils.batch import (
+    LOAD_OPTIONS, compile_spec, dtype_hints, dump_spec, parse_spec, read_planned, spec_format_for,
+    validate_spec, yaml_available
+)
+from utils.exporter import EXPORT_FORMATS, compression_suffix, write_export, write_zip
+from utils.file_utils import get_base_name, unique_output_names
+from utils.frame_view import FrameView
+from utils.parallel import run_parallel
+from utils.pipeline import run_pipeline
+from utils.readers import detect_format
+from utils.session_store import SessionFrames, current_session_id, get_session_store
+from utils.validation import csv_read_options, sniff_csv
+
+
+def session_recipe(filename, df, selected_columns):
+    """
+    Capture the load options, cleaning steps, column choice and export format of one file.
+
+    Args:
+        filename (str): File key in the session
+        df (pd.DataFrame): The file as loaded, before cleaning
+        selected_columns (list): Columns chosen for the file
+
+    Returns:
+        dict: Validated pipeline spec
+    """
+    known = {name for names in LOAD_OPTIONS.values() for name in names}
+    read_options = st.session_state.get('read_options', {}).get(filename, {})
+    columns = list(selected_columns) if selected_columns is not None else None
+    # Keeping every column is saved as "all", so new columns in later extracts are kept too
+    if columns is not None and columns == list(df.columns):
+        columns = None
+    return validate_spec({
+        'load': {name: value for name, value in read_options.items() if name in known},
+        'dtypes': {} if getattr(df, 'out_of_core', False) else dtype_hints(df),
+        'steps': st.session_state.get('cleaning_steps', {}).get(filename, []),
+        'columns': columns,
+        'output_format': st.session_state.get(f"format_{filename}", "CSV"),
+        'compression': st.session_state.get(f"compression_{filename}", "None"),
+    })
+
+
+def describe_plan(plan):
+    """
+    Summarize what replaying a compiled plan reads.
+
+    Args:
+        plan (dict): Result of utils.batch.compile_spec
+
+    Returns:
+        str: One-line description
+    """
+    if plan['usecols'] is None:
+        reads = "every column"
+    else:
+        reads = f"only {len(plan['usecols'])} column(s): {', '.join(map(str, plan['usecols']))}"
+    hints = f", with {len(plan['dtype'])} dtype hint(s)" if plan['dtype'] else ""
+    return f"Reads {reads}{hints}, then runs {len(plan['steps'])} cleaning step(s)"
+
+
+def replay_file(file, spec, plan):
+    """
+    Run a recipe on one uploaded file.
+
+    Args:
+        file: Uploaded file object
+        spec (dict): Validated spec
+        plan (dict): Compiled plan of the spec
+
+    Returns:
+        tuple: (pd.DataFrame, dict) with the result and its row counts and timing
+    """
+    start = time.perf_counter()
+    # Every file gets its own cursor, since files are replayed concurrently
+    source = io.BytesIO(file.getvalue())
+    source.name = file.name
+    file_format, compression = detect_format(file.name)
+    sniffed = {}
+    if file_format == 'csv':
+        sniffed = csv_read_options(sniff_csv(source, compression))
+        source.seek(0)
+    df = read_planned(source, plan, file.name, **sniffed)
+    cleaned, _ = run_pipeline(df, spec['steps'])
+    result = FrameView(cleaned, spec['columns']).materialize()
+    return result, {
+        'rows_in': len(df),
+        'rows_out': len(result),
+        'columns': result.shape[1],
+        'seconds': time.perf_counter() - start,
+    }
+
+
+def load_recipe(recipe_file):
+    """
+    Parse an uploaded recipe file.
+
+    Args:
+        recipe_file: Uploaded JSON or YAML file
+
+    Returns:
+        dict: Validated spec, or None if it could not be read
+    """
+    spec_format = spec_format_for(recipe_file.name)
+    if spec_format == "yaml" and not yaml_available():
+        st.error("❌ YAML recipes need PyYAML: pip install pyyaml")
+        return None
+    try:
+        return parse_spec(recipe_file.getvalue().decode('utf-8'), spec_format)
+    except (UnicodeDecodeError, ValueError) as e:
+        st.error(f"❌ Invalid recipe {recipe_file.name}: {str(e)}")
+        return None
+
+
+def manage_recipes(dataframes, selected_columns, uploaded_files):
+    """
+    Save each file's pipeline as a recipe and replay a saved recipe on the uploaded files.
+
+    Args:
+        dataframes (dict): Dictionary of uploaded dataframes, before cleaning
+        selected_columns (dict): Dictionary of selected columns for each dataframe
+        uploaded_files (list): Uploaded file objects a recipe can be replayed on
+    """
+    if 'recipe_outputs' not in st.session_state:
+        st.session_state.recipe_outputs = SessionFrames(get_session_store(), current_session_id(), 'recipes')
+    if 'recipe_runs' not in st.session_state:
+        st.session_state.recipe_runs = {}
+    spec_formats = ["JSON", "YAML"] if yaml_available() else ["JSON"]
+
+    with st.expander("💾 Save a recipe", expanded=False):
+        st.caption("Load options, cleaning steps, column selection and export format of one file")
+        filename = st.selectbox("File", options=list(dataframes), key="recipe_source")
+        spec_format = st.radio("Format", options=spec_formats, horizontal=True, key="recipe_format")
+        if filename is not None:
+            spec = session_recipe(filename, dataframes[filename], selected_columns.get(filename))
+            st.caption(describe_plan(compile_spec(spec)))
+            extension = spec_format.lower()
+            st.download_button(
+                label=f"⬇️ Download recipe for {filename}",
+                data=dump_spec(spec, extension),
+                file_name=f"{get_base_name(filename)}_recipe.{extension}",
+                mime="application/json" if extension == "json" else "application/yaml",
+                key="download_recipe"
+            )
+
+    with st.expander("▶️ Replay a recipe", expanded=bool(st.session_state.recipe_runs)):
+        recipe_file = st.file_uploader(
+            "Recipe file",
+            type=["json", "yaml", "yml"],
+            key="recipe_file",
+            help="A recipe saved here, or a spec for the command-line --spec option"
+        )
+        spec = load_recipe(recipe_file) if recipe_file is not None else None
+        if spec is not None:
+            plan = compile_spec(spec)
+            st.caption(describe_plan(plan))
+            if st.button(f"▶️ Replay on {len(uploaded_files)} uploaded file(s)", key="recipe_replay"):
+                for name in list(st.session_state.recipe_outputs):
+                    del st.session_state.recipe_outputs[name]
+                st.session_state.recipe_runs = {}
+                with st.spinner("Replaying recipe..."):
+                    outcomes = run_parallel(lambda file: replay_file(file, spec, plan), uploaded_files)
+                extension = EXPORT_FORMATS[spec['output_format']]['extension']
+                # Inputs sharing a base name must not overwrite each other's output
+                output_names = unique_output_names(
+                    [file.name for file in uploaded_files], [extension] * len(uploaded_files)
+                )
+                for file, (result, error), output_name in zip(uploaded_files, outcomes, output_names):
+                    if error is not None:
+                        st.error(f"❌ Error replaying the recipe on {file.name}: {str(error)}")
+                        continue
+                    df, summary = result
+                    st.session_state.recipe_outputs[output_name] = df
+                    st.session_state.recipe_runs[output_name] = {
+                        **summary, 'input': file.name, 'spec': spec,
+                    }
+
+        runs = st.session_state.recipe_runs
+        if runs:
+            st.dataframe(pd.DataFrame([
+                {
+                    'File': run['input'],
+                    'Output': output_name,
+                    'Rows in': run['rows_in'],
+                    'Rows out': run['rows_out'],
+                    'Columns': run['columns'],
+                    'Seconds': round(run['seconds'], 2),
+                }
+                for output_name, run in runs.items()
+            ]), hide_index=True)
+            outputs = st.session_state.recipe_outputs
+            if len(runs) == 1:
+                output_name, run = next(iter(runs.items()))
+                output_format, compression = run['spec']['output_format'], run['spec']['compression']
+                suffix = compression_suffix(compression) if output_format == "CSV" else ""
+                st.download_button(
+                    label=f"📥 Download {output_name}{suffix}",
+                    data=deferred_export(
+                        lambda stream: write_export(outputs[output_name], stream, output_format, compression)
+                    ),
+                    file_name=f"{output_name}{suffix}",
+                    key="download_recipe_output"
+                )
+            else:
+                # Frames are looked up at click time, so the kept callable holds no frame
+                members = []
+                for output_name, run in runs.items():
+                    output_format, compression = run['spec']['output_format'], run['spec']['compression']
+                    suffix = compression_suffix(compression) if output_format == "CSV" else ""
+                    members.append((output_name, output_name + suffix, output_format, compression))
+                st.download_button(
+                    label=f"🗜️ Download all {len(members)} replayed files as ZIP",
+                    data=deferred_export(lambda stream: write_zip([
+                        (member_name, outputs[output_name], output_format, compression)
+                        for output_name, member_name, output_format, compression in members
+                    ], stream)),
+                    file_name="replayed_files.zip",
+                    mime="application/zip",
+                    key="download_recipe_zip"
+                )
@@ -1,5 +1,7 @@
 import streamlit as st
+from utils.excel import list_sheets, preview_sheet
 from utils.file_utils import validate_file_type
+from utils.readers import strip_suffix, zstd_available
 
 
 def upload_files():
@@ -9,11 +11,17 @@ def upload_files():
     Returns:
         list: List of uploaded file objects
     """
-    st.info("📤 Upload your data files (CSV, Excel formats supported)")
+    st.info("📤 Upload your data files (CSV, compressed CSV, Excel, Parquet and Feather formats supported)")
+
+    file_types = ['csv', 'gz', 'xlsx', 'xls', 'parquet', 'pq', 'feather', 'arrow']
+    if zstd_available():
+        file_types.insert(2, 'zst')
+    else:
+        st.caption("Install the zstandard package to upload .csv.zst files.")
 
     uploaded_files = st.file_uploader(
         label="Choose files",
-        type=['csv', 'xlsx', 'xls'],
+        type=file_types,
         accept_multiple_files=True,
         key="file_uploader"
     )
@@ -35,4 +43,85 @@ def upload_files():
         return valid_files
     else:
         st.info("ℹ️ Please upload at least one file to get started.")
-        return None
\ No newline at end of file
+        return None
+
+
+def sheet_entry_key(file_key, sheet):
+    """
+    Name the entry for one sheet of a workbook, e.g. "book [Sales].xlsx".
+
+    The data suffix stays last so exports are named after the workbook and sheet.
+
+    Args:
+        file_key (str): Key of the uploaded workbook
+        sheet (str): Sheet name
+
+    Returns:
+        str: Entry key
+    """
+    stem = strip_suffix(file_key)
+    if stem == file_key:
+        return f"{file_key} [{sheet}]"
+    return f"{stem} [{sheet}]{file_key[len(stem):]}"
+
+
+def choose_sheets(file, file_key, content_hash):
+    """
+    Let the user pick which sheets, and which of their columns, to load from a workbook.
+
+    Sheet names and the first rows of each sheet are read without parsing the
+    whole workbook and are remembered per file content, so reruns do not open
+    the workbook again.
+
+    Args:
+        file: Uploaded Excel file
+        file_key (str): Key of the uploaded workbook
+        content_hash (str): Hash of the file contents
+
+    Returns:
+        list: (entry key, read options, entry version) for each sheet to load
+    """
+    if 'excel_sheets' not in st.session_state:
+        st.session_state.excel_sheets = {}
+    if 'excel_previews' not in st.session_state:
+        st.session_state.excel_previews = {}
+
+    sheets = st.session_state.excel_sheets.get(content_hash)
+    if sheets is None:
+        sheets = st.session_state.excel_sheets[content_hash] = list_sheets(file)
+
+    if len(sheets) > 1:
+        chosen = st.multiselect(
+            f"📑 Sheets to load from {file_key}",
+            options=sheets,
+            default=sheets[:1],
+            key=f"sheets_{file_key}",
+            help="Each selected sheet is loaded, cleaned and exported as its own dataset"
+        )
+    else:
+        chosen = sheets
+
+    entries = []
+    with st.expander(f"👀 Peek at {file_key}"):
+        for sheet in chosen:
+            preview = st.session_state.excel_previews.get((content_hash, sheet))
+            if preview is None:
+                preview = st.session_state.excel_previews[(content_hash, sheet)] = preview_sheet(file, sheet)
+            entry_key = file_key if len(sheets) == 1 else sheet_entry_key(file_key, sheet)
+            if len(sheets) > 1:
+                st.markdown(f"**{sheet}**")
+            st.dataframe(preview, width='stretch')
+            columns = st.multiselect(
+                "Columns to load (all if empty)",
+                options=list(preview.columns),
+                key=f"sheet_cols_{entry_key}"
+            )
+
+            options = {'sheet_name': sheet}
+            version = content_hash if len(sheets) == 1 else f"{content_hash}#{sheet}"
+            if columns:
+                # Keep workbook order so the result does not depend on click order
+                options['columns'] = [col for col in preview.columns if col in columns]
+                version = f"{version}#{'|'.join(map(str, options['columns']))}"
+            entries.append((entry_key, options, version))
+    return entries
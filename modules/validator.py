@@ -0,0 +1,166 @@
+import json
+
+import streamlit as st
+import pandas as pd
+from utils.frame_view import display_safe
+from utils.validation import RULE_TYPES, validate_csv, validate_frame
+
+
+def parse_bound(text):
+    """
+    Convert a bound or allowed value typed in the rule editor.
+
+    Args:
+        text (str): Value as typed
+
+    Returns:
+        object: int or float for numbers, otherwise the text itself (e.g. a date)
+    """
+    try:
+        number = float(text)
+    except ValueError:
+        return text
+    return int(number) if number.is_integer() else number
+
+
+def editor_rules(edited, dtypes):
+    """
+    Turn the rows of the rule editor into a rule set.
+
+    Args:
+        edited (pd.DataFrame): Editor rows with Column, Type, Min, Max, Pattern,
+            Allowed, Unique and Not null columns
+        dtypes (pd.Series): Column dtypes, so allowed values of numeric columns are parsed as numbers
+
+    Returns:
+        dict: Column name -> rule spec, only for columns with at least one rule
+    """
+    rules = {}
+    for row in edited.to_dict('records'):
+        spec = {}
+        if row['Type']:
+            spec['type'] = row['Type']
+        for key, field in (('min', 'Min'), ('max', 'Max')):
+            if row[field] and str(row[field]).strip():
+                spec[key] = parse_bound(str(row[field]).strip())
+        if row['Pattern']:
+            spec['regex'] = row['Pattern']
+        if row['Allowed'] and str(row['Allowed']).strip():
+            allowed = [value.strip() for value in str(row['Allowed']).split(",")]
+            if pd.api.types.is_numeric_dtype(dtypes[row['Column']]):
+                allowed = [parse_bound(value) for value in allowed]
+            spec['allowed'] = allowed
+        if row['Unique']:
+            spec['unique'] = True
+        if row['Not null']:
+            spec['not_null'] = True
+        if spec:
+            rules[row['Column']] = spec
+    return rules
+
+
+def show_report(filename, report):
+    """
+    Display a validation report with its sampled offending rows.
+
+    Args:
+        filename (str): Name of the checked file
+        report (dict): Result of utils.validation.validate_frame
+    """
+    if report['missing_columns']:
+        st.error(f"❌ {filename} is missing columns: {', '.join(map(str, report['missing_columns']))}")
+    if report['passed']:
+        st.success(f"✅ All {report['rows']:,} rows of {filename} pass the rules")
+        return
+    if not report['violations']:
+        return
+
+    st.warning(f"⚠️ {len(report['violations'])} rule(s) failed in {filename}")
+    st.dataframe(pd.DataFrame([
+        {
+            'Column': violation['column'],
+            'Rule': violation['rule'],
+            'Expected': violation['expected'],
+            'Violations': violation['violations'],
+            'Share of rows': f"{violation['violations'] / report['rows']:.2%}" if report['rows'] else "",
+        }
+        for violation in report['violations']
+    ]), hide_index=True)
+    for violation in report['violations']:
+        st.caption(f"Sample rows failing **{violation['rule']}** on **{violation['column']}**")
+        st.dataframe(display_safe(pd.DataFrame(violation['sample']).set_index('row')))
+
+
+def validate_data(dataframes, csv_sources=None):
+    """
+    Let the user declare column rules and check each dataframe against them.
+
+    CSV uploads are checked by streaming the uploaded file through the chunked
+    reader, parsing only the ruled columns; other files are checked as loaded.
+
+    Args:
+        dataframes (dict): Dictionary of dataframes with filenames as keys
+        csv_sources (dict): Filename -> (uploaded file, compression) for CSV uploads
+
+    Returns:
+        dict: Rule set per filename
+    """
+    all_rules = {}
+    for filename, df in dataframes.items():
+        with st.expander(f"✅ Validate: {filename}"):
+            st.caption("Declare rules per column; empty cells are not checked")
+            columns = list(df.columns)
+            edited = st.data_editor(
+                pd.DataFrame({
+                    'Column': columns,
+                    'Type': [""] * len(columns),
+                    'Min': [""] * len(columns),
+                    'Max': [""] * len(columns),
+                    'Pattern': [""] * len(columns),
+                    'Allowed': [""] * len(columns),
+                    'Unique': [False] * len(columns),
+                    'Not null': [False] * len(columns),
+                }),
+                column_config={
+                    'Column': st.column_config.TextColumn(disabled=True),
+                    'Type': st.column_config.SelectboxColumn(options=["", *RULE_TYPES]),
+                    'Min': st.column_config.TextColumn(help="Lowest allowed number or date"),
+                    'Max': st.column_config.TextColumn(help="Highest allowed number or date"),
+                    'Pattern': st.column_config.TextColumn(help="Regular expression every value must fully match"),
+                    'Allowed': st.column_config.TextColumn(help="Comma-separated list of allowed values"),
+                },
+                hide_index=True,
+                key=f"rules_{filename}"
+            )
+            rules = editor_rules(edited, df.dtypes)
+            all_rules[filename] = rules
+            if not rules:
+                continue
+
+            col1, col2 = st.columns(2)
+            with col1:
+                run = st.button("🔎 Run validation", key=f"validate_{filename}")
+            with col2:
+                st.download_button(
+                    label="⬇️ Download rules",
+                    data=json.dumps(rules, indent=2, default=str),
+                    file_name="rules.json",
+                    mime="application/json",
+                    key=f"download_rules_{filename}",
+                    help="Rules file for the command-line --rules option"
+                )
+            if run:
+                try:
+                    with st.spinner(f"Validating {filename}..."):
+                        source = (csv_sources or {}).get(filename)
+                        if source is not None:
+                            file, compression = source
+                            read_options = st.session_state.get('read_options', {}).get(filename, {})
+                            report = validate_csv(file, rules, compression, **read_options)
+                            file.seek(0)
+                        else:
+                            report = validate_frame(df, rules)
+                    show_report(filename, report)
+                except ValueError as e:
+                    st.error(f"❌ Invalid rules for {filename}: {str(e)}")
+    return all_rules
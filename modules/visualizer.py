@@ -1,36 +1,200 @@
+from functools import partial
+
 import streamlit as st
-import pandas as pd
-import plotly.express as px
+from utils import settings
+from utils.chart_engine import (
+    box_stats,
+    histogram_bins,
+    line_points,
+    scatter_density,
+    stratified_sample,
+)
+from utils.frame_view import FrameView, display_safe
+from utils.parallel import run_parallel
+from utils.profiler import describe_table, profile_frame
+
+
+def build_histogram(series, title, full_fidelity=False):
+    """
+    Build a histogram, binning on the server unless full fidelity is requested.
+
+    Args:
+        series (pd.Series): Numeric column to plot
+        title (str): Figure title
+        full_fidelity (bool): Send every value to Plotly instead of precomputed bins
+
+    Returns:
+        go.Figure: Histogram figure
+    """
+    import plotly.graph_objects as go
+
+    if full_fidelity:
+        import plotly.express as px
+        return px.histogram(series.to_frame(), x=series.name, title=title)
+
+    counts, edges = histogram_bins(series)
+    fig = go.Figure(go.Bar(
+        x=(edges[:-1] + edges[1:]) / 2,
+        y=counts,
+        width=edges[1:] - edges[:-1],
+        name=str(series.name)
+    ))
+    fig.update_layout(title=title, xaxis_title=str(series.name), yaxis_title="count", bargap=0)
+    return fig
+
+
+def build_box_plot(series, title, full_fidelity=False):
+    """
+    Build a box plot from server-side quartiles and a bounded outlier sample.
+
+    Args:
+        series (pd.Series): Numeric column to plot
+        title (str): Figure title
+        full_fidelity (bool): Send every value to Plotly instead of precomputed statistics
+
+    Returns:
+        go.Figure: Box plot figure
+    """
+    import plotly.graph_objects as go
+
+    if full_fidelity:
+        import plotly.express as px
+        return px.box(series.to_frame(), y=series.name, title=title)
 
+    stats = box_stats(series, max_outliers=settings.CHART_POINT_BUDGET)
+    fig = go.Figure()
+    if stats is not None:
+        name = str(series.name)
+        fig.add_trace(go.Box(
+            x=[name],
+            q1=[stats['q1']],
+            median=[stats['median']],
+            q3=[stats['q3']],
+            mean=[stats['mean']],
+            lowerfence=[stats['lowerfence']],
+            upperfence=[stats['upperfence']],
+            name=name,
+            boxpoints=False
+        ))
+        if len(stats['outliers']):
+            fig.add_trace(go.Scattergl(
+                x=[name] * len(stats['outliers']),
+                y=stats['outliers'],
+                mode='markers',
+                name=f"outliers ({stats['outlier_count']:,})"
+            ))
+    fig.update_layout(title=title, yaxis_title=str(series.name))
+    return fig
 
-def visualize_data(dataframes, selected_columns):
+
+def build_scatter(x_series, y_series, title, mode="Density", full_fidelity=False):
+    """
+    Build a scatter plot as a 2D density grid or a stratified sample.
+
+    Args:
+        x_series (pd.Series): Numeric x column
+        y_series (pd.Series): Numeric y column
+        title (str): Figure title
+        mode (str): "Density" or "Sample"
+        full_fidelity (bool): Send every point to Plotly
+
+    Returns:
+        go.Figure: Scatter or density figure
+    """
+    import plotly.graph_objects as go
+
+    if full_fidelity:
+        import plotly.express as px
+        return px.scatter(x=x_series, y=y_series, title=title, labels={'x': x_series.name, 'y': y_series.name})
+
+    if mode == "Density":
+        counts, x_edges, y_edges = scatter_density(x_series, y_series)
+        fig = go.Figure(go.Heatmap(
+            x=(x_edges[:-1] + x_edges[1:]) / 2,
+            y=(y_edges[:-1] + y_edges[1:]) / 2,
+            z=counts.T,
+            colorscale="Blues",
+            colorbar={'title': "count"}
+        ))
+    else:
+        x, y = stratified_sample(x_series, y_series, settings.CHART_POINT_BUDGET)
+        fig = go.Figure(go.Scattergl(x=x, y=y, mode='markers', marker={'size': 4}))
+    fig.update_layout(title=title, xaxis_title=str(x_series.name), yaxis_title=str(y_series.name))
+    return fig
+
+
+def build_line_chart(series, title, full_fidelity=False):
+    """
+    Build a line chart, decimating with LTTB when the column exceeds the point budget.
+
+    Args:
+        series (pd.Series): Numeric column to plot
+        title (str): Figure title
+        full_fidelity (bool): Send every point to Plotly
+
+    Returns:
+        go.Figure: Line chart figure
+    """
+    import plotly.graph_objects as go
+
+    if full_fidelity:
+        import plotly.express as px
+        return px.line(series.to_frame(), y=series.name, title=title)
+
+    x, y = line_points(series, settings.CHART_POINT_BUDGET)
+    fig = go.Figure(go.Scattergl(x=x, y=y, mode='lines', name=str(series.name)))
+    fig.update_layout(title=title, yaxis_title=str(series.name))
+    return fig
+
+
+def visualize_data(dataframes, selected_columns, column_versions=None):
     """
     Handle data visualization for the Data Sweeper application.
 
+    Columns larger than the configured point budget are reduced on the server
+    (bins, quartiles, decimated lines, density grids) before reaching Plotly,
+    unless full fidelity is requested. Figures and statistics for all files
+    are built on the shared worker pool.
+
     Args:
         dataframes (dict): Dictionary of dataframes to visualize
         selected_columns (dict): Dictionary of selected columns for each dataframe
+        column_versions (dict): Optional per-file column version tokens used to
+            reuse cached column profiles
     """
+    column_versions = column_versions or {}
+    jobs = []
     for filename, df in dataframes.items():
         with st.expander(f"📈 Visualizations for: {filename}", expanded=True):
-            # Get the subset of the dataframe with selected columns only
-            cols_to_use = selected_columns.get(filename, df.columns.tolist())
-            df_subset = df[cols_to_use]
+            # Lazy view over the selected columns; only plotted columns are materialized
+            view = FrameView(df, selected_columns.get(filename))
 
             # Identify numeric columns for plotting
-            numeric_cols = df_subset.select_dtypes(include='number').columns.tolist()
+            numeric_cols = view.numeric_columns()
 
             if not numeric_cols:
                 st.info(f"ℹ️ No numeric columns found in {filename} for visualization.")
                 continue
 
             # Create visualization options
+            build_chart = None
             viz_type = st.selectbox(
                 f"Select visualization type for {filename}:",
                 options=["Histogram", "Box Plot", "Scatter Plot", "Line Chart"],
                 key=f"viz_type_{filename}"
             )
 
+            # Small frames are always plotted in full; large ones only on request.
+            # Out-of-core frames are always aggregated by their query engine.
+            out_of_core = getattr(df, 'out_of_core', False)
+            full_fidelity = not out_of_core and len(view) <= settings.CHART_POINT_BUDGET
+            if not full_fidelity and not out_of_core:
+                full_fidelity = st.checkbox(
+                    f"🎯 Full fidelity (send all {len(view):,} rows to the browser)",
+                    value=False,
+                    key=f"full_fidelity_{filename}"
+                )
+
             if viz_type == "Histogram":
                 col_to_plot = st.selectbox(
                     f"Select column for histogram in {filename}:",
@@ -39,8 +203,9 @@ def visualize_data(dataframes, selected_columns):
                 )
 
                 if col_to_plot:
-                    fig = px.histogram(df_subset, x=col_to_plot, title=f"Histogram of {col_to_plot}")
-                    st.plotly_chart(fig, width='stretch')
+                    build_chart = partial(
+                        build_histogram, view.column(col_to_plot), f"Histogram of {col_to_plot}", full_fidelity
+                    )
 
             elif viz_type == "Box Plot":
                 col_to_plot = st.selectbox(
@@ -50,8 +215,9 @@ def visualize_data(dataframes, selected_columns):
                 )
 
                 if col_to_plot:
-                    fig = px.box(df_subset, y=col_to_plot, title=f"Box Plot of {col_to_plot}")
-                    st.plotly_chart(fig, width='stretch')
+                    build_chart = partial(
+                        build_box_plot, view.column(col_to_plot), f"Box Plot of {col_to_plot}", full_fidelity
+                    )
 
             elif viz_type == "Scatter Plot":
                 if len(numeric_cols) >= 2:
@@ -72,9 +238,24 @@ def visualize_data(dataframes, selected_columns):
                             key=f"scatter_y_{filename}"
                         )
 
+                    scatter_mode = "Density"
+                    if not full_fidelity:
+                        scatter_mode = st.radio(
+                            f"Scatter rendering for {filename}:",
+                            options=["Density", "Sample"],
+                            key=f"scatter_mode_{filename}",
+                            horizontal=True
+                        )
+
                     if col_x and col_y:
-                        fig = px.scatter(df_subset, x=col_x, y=col_y, title=f"Scatter Plot: {col_x} vs {col_y}")
-                        st.plotly_chart(fig, width='stretch')
+                        build_chart = partial(
+                            build_scatter,
+                            view.column(col_x),
+                            view.column(col_y),
+                            f"Scatter Plot: {col_x} vs {col_y}",
+                            scatter_mode,
+                            full_fidelity
+                        )
                 else:
                     st.warning(f"⚠️ Not enough numeric columns for scatter plot in {filename}. Need at least 2.")
 
@@ -86,15 +267,28 @@ def visualize_data(dataframes, selected_columns):
                 )
 
                 if col_to_plot:
-                    # Create an index for the line chart if there's no datetime column
-                    fig = px.line(df_subset, y=col_to_plot, title=f"Line Chart of {col_to_plot}")
-                    st.plotly_chart(fig, width='stretch')
-
-            # Show basic statistics in an expander
-            with st.expander("📊 Show statistics"):
-                # Convert problematic columns to avoid Arrow conversion issues
-                desc_df = df_subset.describe().copy()
-                for col in desc_df.columns:
-                    if desc_df[col].dtype == 'object':
-                        desc_df[col] = desc_df[col].apply(lambda x: str(x) if pd.notna(x) else x)
-                st.dataframe(desc_df)
\ No newline at end of file
+                    build_chart = partial(
+                        build_line_chart, view.column(col_to_plot), f"Line Chart of {col_to_plot}", full_fidelity
+                    )
+
+            # Charts and statistics are built on the worker pool, then rendered here
+            chart_area = st.container()
+            stats_area = st.expander("📊 Show statistics")
+            jobs.append((filename, build_chart, view.materialize(numeric_cols), chart_area, stats_area))
+
+    def run_job(job):
+        filename, build_chart, stats_frame, _, _ = job
+        fig = build_chart() if build_chart is not None else None
+        profiles = profile_frame(stats_frame, column_versions.get(filename))
+        return fig, describe_table(profiles)
+
+    for (filename, _, _, chart_area, stats_area), (result, error) in zip(jobs, run_parallel(run_job, jobs)):
+        if error is not None:
+            chart_area.error(f"❌ Error building charts for {filename}: {str(error)}")
+            continue
+
+        fig, stats_table = result
+        if fig is not None:
+            chart_area.plotly_chart(fig, width='stretch')
+        # Convert problematic columns to avoid Arrow conversion issues
+        stats_area.dataframe(display_safe(stats_table))
@@ -0,0 +1,42 @@
+"""
+Start the Streamlit server with the app's dependencies warming up in the background.
+
+`streamlit run app.py` only imports the app when the first visitor arrives.
+This launcher starts the warm-up (see utils/warmup.py) before the server
+boots, so a freshly scaled container has its imports and first-use work
+done by the time it receives traffic.
+
+Example:
+    python serve.py --server.port 8501 --server.headless true
+"""
+import os
+import sys
+
+from utils import settings
+from utils.warmup import start_warmup
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+
+
+def main(argv=None):
+    """
+    Warm up and run the Streamlit server.
+
+    Args:
+        argv (list): Extra `streamlit run` options, defaults to sys.argv[1:]
+
+    Returns:
+        int: Exit status of the server
+    """
+    # Streamlit goes first: plotly, which it loads, looks pandas up in sys.modules
+    # and would trip over a pandas import the warm-up thread has not finished
+    from streamlit.web import cli as stcli
+
+    if settings.WARMUP:
+        start_warmup()
+    sys.argv = ["streamlit", "run", APP_PATH, *(sys.argv[1:] if argv is None else argv)]
+    return stcli.main()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
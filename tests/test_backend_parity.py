@@ -0,0 +1,123 @@
+"""
+The DuckDB backend must clean files exactly like the pandas pipeline does.
+
+Every cleaning operation runs on CSV and Parquet files with missing values,
+once read with pandas and once opened out of core, and the results must match
+value for value and dtype for dtype.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("duckdb")
+pytest.importorskip("pyarrow")
+
+from utils.backends import DuckDBFrame
+from utils.imputation import MISSING_VALUE_STRATEGIES
+from utils.pipeline import run_pipeline
+from utils.readers import read_file
+
+# Row order matters for forward/backward fill and for which duplicate is kept
+SOURCE = pd.DataFrame({
+    'id': pd.array([1, 2, 2, 3, 4, 5, 5, 6], dtype='Int64'),
+    'count': pd.array([1, None, None, 2, 4, None, None, 8], dtype='Int64'),
+    'score': [1.5, np.nan, np.nan, 2.25, np.nan, 3.0, 3.0, 10.0],
+    'city': ["Lahore", None, None, "Karachi", "Lahore", None, None, "Quetta"],
+    'group': ["a", "b", "b", "a", "b", "a", "a", "b"],
+})
+
+STRATEGIES = [name for name in MISSING_VALUE_STRATEGIES if name != "Interpolate"]
+
+STEPS = {
+    **{f"missing_values: {name}": [{'op': 'missing_values', 'strategy': name}] for name in STRATEGIES},
+    **{
+        f"drop_duplicates: keep {keep}": [{'op': 'drop_duplicates', 'subset': None, 'keep': keep, 'method': 'auto'}]
+        for keep in ('first', 'last', 'none')
+    },
+    "drop_duplicates: subset": [{'op': 'drop_duplicates', 'subset': ['id'], 'keep': 'last', 'method': 'auto'}],
+    "impute: per column": [{'op': 'impute', 'columns': {
+        'count': {'strategy': 'median'},
+        'score': {'strategy': 'constant', 'value': -1.0},
+        'city': {'strategy': 'ffill', 'group_by': ['group']},
+    }, 'default': None}],
+    "dedupe then mean": [
+        {'op': 'drop_duplicates', 'subset': None, 'keep': 'first', 'method': 'auto'},
+        {'op': 'missing_values', 'strategy': "Fill with mean"},
+    ],
+}
+
+
+@pytest.fixture(params=['csv', 'parquet', 'parquet-plain'])
+def source_path(request, tmp_path):
+    """A file with missing values: CSV, Parquet written by pandas, or Parquet without pandas metadata."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    if request.param == 'csv':
+        path = tmp_path / "data.csv"
+        SOURCE.to_csv(path, index=False)
+    elif request.param == 'parquet':
+        path = tmp_path / "data.parquet"
+        SOURCE.to_parquet(path, index=False)
+    else:
+        path = tmp_path / "data.parquet"
+        table = pa.Table.from_pandas(SOURCE, preserve_index=False)
+        pq.write_table(table.replace_schema_metadata(None), path)
+    return str(path)
+
+
+@pytest.mark.parametrize('steps', list(STEPS.values()), ids=list(STEPS))
+def test_duckdb_matches_pandas(source_path, steps):
+    expected, expected_stats = run_pipeline(read_file(source_path), steps)
+    actual, actual_stats = DuckDBFrame.from_path(source_path).apply_steps(steps)
+
+    pd.testing.assert_frame_equal(actual.fetch(), expected.reset_index(drop=True))
+    assert [stats['rows_removed'] for stats in actual_stats] == [stats['rows_removed'] for stats in expected_stats]
+    for actual_step, expected_step in zip(actual_stats, expected_stats):
+        assert actual_step.get('null_counts') == expected_step.get('null_counts')
+
+
+def test_mean_of_integer_column_with_nulls_is_not_rounded(tmp_path):
+    path = tmp_path / "ints.csv"
+    path.write_text("a\n1\n\n2\n")
+    steps = [{'op': 'missing_values', 'strategy': "Fill with mean"}]
+
+    result, stats = DuckDBFrame.from_path(str(path)).apply_steps(steps)
+
+    assert result.fetch()['a'].tolist() == [1.0, 1.5, 2.0]
+    assert stats[0]['null_counts']['a']['fill_value'] == 1.5
+
+
+def test_interpolation_is_rejected_out_of_core(tmp_path):
+    path = tmp_path / "data.csv"
+    SOURCE.to_csv(path, index=False)
+    with pytest.raises(ValueError):
+        DuckDBFrame.from_path(str(path)).apply_steps([{'op': 'missing_values', 'strategy': "Interpolate"}])
+
+
+def test_duckdb_matches_pandas_on_generated_data(tmp_path):
+    from benchmarks.datasets import make_frame
+
+    df = make_frame(5_000, seed=1)
+    path = tmp_path / "generated.parquet"
+    df.to_parquet(path, index=False)
+    steps = [{'op': 'drop_duplicates'}, {'op': 'missing_values', 'strategy': "Forward fill"}]
+
+    expected, _ = run_pipeline(df, steps)
+    actual, _ = DuckDBFrame.from_path(str(path)).apply_steps(steps)
+
+    pd.testing.assert_frame_equal(actual.fetch(), expected.reset_index(drop=True))
+
+
+def test_line_points_after_dropping_rows_stay_within_the_threshold(tmp_path):
+    values = np.full(100_000, np.nan)
+    values[::10] = np.arange(10_000, dtype=np.float64)
+    path = tmp_path / "sparse.parquet"
+    pd.DataFrame({'v': values}).to_parquet(path, index=False)
+
+    frame, _ = DuckDBFrame.from_path(str(path)).apply_steps([{'op': 'missing_values', 'strategy': "Drop rows"}])
+    x, y = frame.line_points('v', 1_000)
+
+    assert len(frame) == 10_000
+    assert len(x) <= 1_000
+    assert x[0] == 0 and x[-1] == 99_990
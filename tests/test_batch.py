@@ -0,0 +1,126 @@
+"""Batch specs, read plans and collision-free output paths."""
+import os
+
+import pandas as pd
+import pytest
+
+from utils import batch
+from utils.batch import (
+    compile_spec,
+    output_path,
+    output_paths,
+    parse_spec,
+    process_file,
+    read_planned,
+    run_batch,
+    validate_spec,
+)
+
+
+@pytest.fixture
+def spec():
+    return validate_spec({
+        'dtypes': {'id': 'int64', 'amount': 'float64', 'region': 'category'},
+        'steps': [{'op': 'drop_duplicates', 'subset': ['id']}],
+        'columns': ['amount'],
+    })
+
+
+@pytest.fixture
+def sales(tmp_path):
+    df = pd.DataFrame({
+        'id': [1, 2, 2, 3],
+        'amount': [10.0, 20.0, 20.0, None],
+        'region': ["N", "S", "S", "N"],
+        'note': ["a", "b", "c", "d"],
+    })
+    path = tmp_path / "sales.csv"
+    df.to_csv(path, index=False)
+    return df, str(path)
+
+
+def test_specs_are_validated():
+    assert parse_spec('{"columns": ["a"]}')['output_format'] == "CSV"
+    with pytest.raises(ValueError, match="Invalid JSON"):
+        parse_spec("{")
+    with pytest.raises(ValueError, match="Unknown pipeline step"):
+        validate_spec({'steps': [{'op': 'shuffle'}]})
+    with pytest.raises(ValueError, match="Unknown load options"):
+        validate_spec({'load': {'skiprows': 2}})
+    with pytest.raises(ValueError, match="Unknown dtype"):
+        validate_spec({'dtypes': {'a': 'int65'}})
+
+
+def test_compile_spec_loads_kept_and_step_columns(spec):
+    plan = compile_spec(spec)
+    assert plan['usecols'] == ['amount', 'id']
+    assert plan['dtype'] == {'amount': 'float64', 'id': 'int64'}
+
+
+def test_compile_spec_loads_everything_when_a_step_reads_every_column(spec):
+    spec['steps'].append({'op': 'missing_values', 'strategy': 'Drop rows'})
+    plan = compile_spec(spec)
+    assert plan['usecols'] is None
+    assert plan['dtype'] == spec['dtypes']
+
+
+def test_read_planned_projects_and_applies_hints(spec, sales):
+    _, path = sales
+    loaded = read_planned(path, compile_spec(spec))
+    assert sorted(loaded.columns) == ['amount', 'id']
+    assert loaded['id'].dtype == 'int64'
+
+
+def test_read_planned_drops_hints_the_file_does_not_fit(tmp_path, spec):
+    path = tmp_path / "nulls.csv"
+    pd.DataFrame({'id': [1, None], 'amount': [1.0, 2.0]}).to_csv(path, index=False)
+    loaded = read_planned(str(path), compile_spec(spec))
+    assert loaded['id'].isna().sum() == 1
+
+
+def test_output_path_follows_format_and_compression(tmp_path):
+    out = str(tmp_path / "out")
+    assert output_path("in/sales.csv", out, validate_spec({})) == os.path.join(out, "cleaned_sales.csv")
+    gzip_spec = validate_spec({'compression': 'gzip'})
+    assert output_path("in/sales.xlsx", out, gzip_spec) == os.path.join(out, "cleaned_sales.csv.gz")
+
+
+def test_output_paths_mirror_directories_and_split_shared_names(tmp_path, spec):
+    paths = [
+        str(tmp_path / "north" / "data.csv"),
+        str(tmp_path / "south" / "data.csv"),
+        str(tmp_path / "south" / "data.xlsx"),
+    ]
+    out = str(tmp_path / "out")
+    assert output_paths(paths, out, spec) == [
+        os.path.join(out, "north", "cleaned_data.csv"),
+        os.path.join(out, "south", "cleaned_data_csv.csv"),
+        os.path.join(out, "south", "cleaned_data_xlsx.csv"),
+    ]
+
+
+def test_output_paths_reject_remaining_collisions(tmp_path, spec, monkeypatch):
+    monkeypatch.setattr(batch, 'unique_output_names', lambda names, extensions: ["same.csv"] * len(names))
+    with pytest.raises(ValueError, match="would both be written"):
+        output_paths([str(tmp_path / "a.csv"), str(tmp_path / "b.csv")], str(tmp_path / "out"), spec)
+
+
+def test_process_file_matches_pandas(tmp_path, spec, sales):
+    df, path = sales
+    summary = process_file(path, spec, str(tmp_path / "out"))
+
+    expected = df.drop_duplicates(subset=['id'])[['amount']].reset_index(drop=True)
+    pd.testing.assert_frame_equal(pd.read_csv(summary['output']), expected)
+    assert (summary['rows_in'], summary['rows_out'], summary['columns']) == (4, 3, 1)
+    assert not os.path.exists(summary['output'] + ".partial")
+
+
+def test_run_batch_reports_errors_per_file(tmp_path, spec, sales):
+    _, path = sales
+    broken = tmp_path / "broken.csv"
+    broken.write_text("note\nx\n")
+    results = run_batch([path, str(broken)], spec, str(tmp_path / "out"), max_workers=1, use_processes=False)
+
+    assert [result[0] for result in results] == [path, str(broken)]
+    assert results[0][1]['rows_out'] == 3 and results[0][2] is None
+    assert results[1][1] is None and isinstance(results[1][2], Exception)
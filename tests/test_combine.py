@@ -0,0 +1,137 @@
+"""Concatenation and key joins, checked against pandas concat and merge."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils import settings
+from utils.combine import (
+    JOIN_STRATEGIES,
+    concat_frames,
+    estimate_concat,
+    estimate_join,
+    iter_join_chunks,
+    join_frames,
+    schema_groups,
+)
+
+
+@pytest.fixture
+def orders():
+    return pd.DataFrame({
+        'customer': [3, 1, 2, 3, 5, 1, np.nan],
+        'region': ["N", "S", "S", "N", "E", "S", None],
+        'amount': [10.0, 20.0, 30.0, 40.0, 50.0, 60.0, 70.0],
+    })
+
+
+@pytest.fixture
+def customers():
+    return pd.DataFrame({
+        'customer': [1, 2, 3, 3, 4, np.nan],
+        'region': ["S", "S", "N", "W", "N", None],
+        'name': ["Ali", "Sara", "Bilal", "Bilal W", "Hina", "Unknown"],
+    })
+
+
+@pytest.fixture
+def sorted_pair():
+    left = pd.DataFrame({'id': [1, 2, 2, 4, 6, 7], 'x': list("abcdef")})
+    right = pd.DataFrame({'id': [2, 3, 4, 4, 7], 'y': [20, 30, 40, 41, 70]})
+    return left, right
+
+
+@pytest.mark.parametrize('strategy', JOIN_STRATEGIES)
+@pytest.mark.parametrize('how', ['inner', 'left', 'right', 'outer'])
+@pytest.mark.parametrize('on', [['customer'], ['customer', 'region']])
+def test_join_matches_pandas_merge(orders, customers, strategy, how, on):
+    result, _ = join_frames(orders, customers, on, how=how, strategy=strategy, chunk_rows=2)
+    expected = pd.merge(orders, customers, on=on, how=how, sort=False)
+    pd.testing.assert_frame_equal(result.reset_index(drop=True), expected.reset_index(drop=True))
+
+
+@pytest.mark.parametrize('how', ['inner', 'left'])
+def test_sort_merge_on_sorted_keys_matches_pandas_merge(sorted_pair, how):
+    left, right = sorted_pair
+    result, strategy = join_frames(left, right, ['id'], how=how)
+
+    assert strategy == 'sort_merge'
+    pd.testing.assert_frame_equal(result, pd.merge(left, right, on='id', how=how, sort=False))
+
+
+def test_string_keys_use_categorical_codes(orders, customers):
+    left, right = orders.dropna(), customers.dropna()
+    result, strategy = join_frames(left, right, ['region'], how='left')
+
+    assert strategy == 'categorical'
+    expected = pd.merge(left, right, on='region', how='left', sort=False)
+    pd.testing.assert_frame_equal(result.reset_index(drop=True), expected)
+
+
+def test_large_right_side_is_joined_in_chunks(orders, customers, monkeypatch):
+    monkeypatch.setattr(settings, 'JOIN_CHUNK_MIN_BYTES', 0)
+    result, strategy = join_frames(orders, customers, ['customer'], how='inner', chunk_rows=3)
+
+    assert strategy == 'chunked'
+    pd.testing.assert_frame_equal(result, pd.merge(orders, customers, on='customer', sort=False))
+
+
+def test_iter_join_chunks_concatenate_to_the_join(orders, customers):
+    chunks = list(iter_join_chunks(orders, customers, ['customer'], how='left', chunk_rows=2))
+    result = pd.concat(chunks, ignore_index=True)
+    pd.testing.assert_frame_equal(result, pd.merge(orders, customers, on='customer', how='left', sort=False))
+
+
+@pytest.mark.parametrize('how', ['inner', 'left', 'right', 'outer'])
+def test_estimate_join_predicts_exact_rows(orders, customers, how):
+    estimate = estimate_join(orders, customers, ['customer'], how=how)
+    expected = pd.merge(orders, customers, on='customer', how=how)
+
+    assert estimate['rows'] == len(expected)
+    assert estimate['strategy'] in JOIN_STRATEGIES
+    assert estimate['peak_bytes'] >= estimate['memory_bytes']
+
+
+def test_invalid_joins_are_rejected(orders, customers):
+    with pytest.raises(ValueError, match="join type"):
+        join_frames(orders, customers, ['customer'], how='cross')
+    with pytest.raises(ValueError, match="strategy"):
+        join_frames(orders, customers, ['customer'], strategy='nested_loop')
+    with pytest.raises(ValueError, match="missing"):
+        join_frames(orders, customers, ['name'])
+    with pytest.raises(ValueError, match="at least one"):
+        join_frames(orders, customers, [])
+
+
+def test_concat_matches_pandas_and_records_sources():
+    first = pd.DataFrame({'a': [1, 2], 'b': ["x", "y"]})
+    second = pd.DataFrame({'b': ["z"], 'a': [3]})
+    result = concat_frames({'first.csv': first, 'second.csv': second}, source_column='source')
+
+    expected = pd.concat([first, second[['a', 'b']]], ignore_index=True)
+    pd.testing.assert_frame_equal(result.drop(columns='source'), expected)
+    assert result['source'].tolist() == ["first.csv", "first.csv", "second.csv"]
+    assert list(result['source'].cat.categories) == ["first.csv", "second.csv"]
+    assert estimate_concat({'first.csv': first, 'second.csv': second})['rows'] == 3
+
+
+def test_concat_keeps_categoricals_with_different_categories():
+    first = pd.DataFrame({'c': pd.Categorical(["a", "b"])})
+    second = pd.DataFrame({'c': pd.Categorical(["c"])})
+    result = concat_frames({'first': first, 'second': second})
+
+    assert isinstance(result['c'].dtype, pd.CategoricalDtype)
+    assert result['c'].tolist() == ["a", "b", "c"]
+
+
+def test_concat_rejects_different_columns():
+    with pytest.raises(ValueError, match="same columns"):
+        concat_frames({'a': pd.DataFrame({'x': [1]}), 'b': pd.DataFrame({'y': [1]})})
+
+
+def test_schema_groups_put_the_largest_group_first():
+    frames = {
+        'a': pd.DataFrame(columns=['x', 'y']),
+        'b': pd.DataFrame(columns=['z']),
+        'c': pd.DataFrame(columns=['y', 'x']),
+    }
+    assert schema_groups(frames) == [['a', 'c'], ['b']]
@@ -0,0 +1,66 @@
+"""Chunked CSV reading with progress reporting and the memory ceiling."""
+import io
+
+import pandas as pd
+import pytest
+
+from utils.csv_stream import MemoryCeilingExceeded, iter_csv_chunks, read_csv_streaming
+
+
+def make_upload(text):
+    file = io.BytesIO(text.encode())
+    file.size = len(text)
+    return file
+
+
+CSV = "id,value,name\n" + "".join(f"{i},{i * 0.5},n{i % 3}\n" for i in range(25))
+
+
+def test_chunks_cover_every_row_in_order():
+    chunks = list(iter_csv_chunks(make_upload(CSV), chunksize=10))
+    assert [len(chunk) for chunk in chunks] == [10, 10, 5]
+    assert pd.concat(chunks)['id'].tolist() == list(range(25))
+
+
+def test_streamed_frame_matches_read_csv_with_compact_dtypes():
+    df, stats = read_csv_streaming(make_upload(CSV), chunksize=10)
+
+    expected = pd.read_csv(io.StringIO(CSV))
+    pd.testing.assert_frame_equal(df, expected, check_dtype=False)
+    assert df['id'].dtype.itemsize == 1
+    assert stats['rows'] == 25
+    assert stats['bytes_processed'] == len(CSV)
+    assert stats['memory_bytes'] > 0
+
+
+def test_progress_is_reported_per_chunk():
+    calls = []
+    read_csv_streaming(make_upload(CSV), chunksize=10, on_progress=lambda *args: calls.append(args))
+
+    assert [rows for _, _, rows in calls] == [10, 20, 25]
+    assert all(total == len(CSV) and 0 < done <= total for done, total, _ in calls)
+
+
+def test_reader_options_are_forwarded():
+    df, _ = read_csv_streaming(make_upload("a;b\n1;x\n2;y\n"), sep=";")
+    assert list(df.columns) == ['a', 'b']
+
+
+def test_header_only_file_keeps_its_columns():
+    df, stats = read_csv_streaming(make_upload("a,b\n"))
+    assert list(df.columns) == ['a', 'b']
+    assert len(df) == 0
+    assert stats['rows'] == 0
+
+
+def test_memory_ceiling_stops_the_read():
+    with pytest.raises(MemoryCeilingExceeded, match="stopped after 10 rows"):
+        read_csv_streaming(make_upload(CSV), chunksize=10, memory_ceiling=100)
+
+
+def test_memory_ceiling_counts_the_concatenated_copy():
+    _, stats = read_csv_streaming(make_upload(CSV), chunksize=10)
+    assert stats['peak_bytes'] == 2 * stats['memory_bytes']
+
+    with pytest.raises(MemoryCeilingExceeded):
+        read_csv_streaming(make_upload(CSV), chunksize=10, memory_ceiling=stats['memory_bytes'] + 1)
@@ -0,0 +1,57 @@
+"""Hash-based duplicate removal agrees with pandas for every keep mode."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils import dedup
+from utils.dedup import SortedHashSet, drop_duplicates, duplicate_mask
+
+
+@pytest.fixture
+def df():
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        'id': rng.integers(0, 30, 200),
+        'city': rng.choice(["Lahore", "Karachi", None], 200),
+        'score': rng.choice([1.5, 2.5, np.nan], 200),
+        'flag': rng.choice([True, False], 200),
+    })
+
+
+@pytest.mark.parametrize('keep', ['first', 'last', 'none'])
+@pytest.mark.parametrize('method', ['auto', 'hash', 'exact'])
+@pytest.mark.parametrize('subset', [None, ['id'], ['city', 'score', 'flag']])
+def test_matches_pandas(df, keep, method, subset):
+    expected = df.drop_duplicates(subset=subset, keep=False if keep == 'none' else keep)
+    pd.testing.assert_frame_equal(drop_duplicates(df, subset=subset, keep=keep, method=method), expected)
+
+
+def test_keep_modes_differ_as_documented():
+    df = pd.DataFrame({'k': [1, 2, 1, 3, 1]})
+    assert drop_duplicates(df, keep='first', method='hash').index.tolist() == [0, 1, 3]
+    assert drop_duplicates(df, keep='last', method='hash').index.tolist() == [1, 3, 4]
+    assert drop_duplicates(df, keep='none', method='hash').index.tolist() == [1, 3]
+
+
+@pytest.mark.parametrize('keep', ['first', 'last', 'none'])
+def test_hash_collisions_are_verified_against_values(df, keep, monkeypatch):
+    # Every row gets the same hash, so only the value check can tell them apart
+    monkeypatch.setattr(dedup, 'row_hashes', lambda frame, subset=None: np.zeros(len(frame), dtype=np.uint64))
+    expected = df.duplicated(keep=False if keep == 'none' else keep).to_numpy()
+    np.testing.assert_array_equal(duplicate_mask(df, keep=keep), expected)
+
+
+def test_invalid_options_are_rejected(df):
+    with pytest.raises(ValueError):
+        drop_duplicates(df, keep='middle')
+    with pytest.raises(ValueError):
+        drop_duplicates(df, method='fuzzy')
+
+
+def test_sorted_hash_set_membership():
+    seen = SortedHashSet()
+    assert not seen.contains(np.array([5], dtype=np.uint64)).any()
+    seen.add(np.array([9, 5, 5, 2 ** 63], dtype=np.uint64))
+    seen.add(np.array([5, 7], dtype=np.uint64))
+    assert seen.values.tolist() == [5, 7, 9, 2 ** 63]
+    assert seen.contains(np.array([7, 8, 2 ** 63], dtype=np.uint64)).tolist() == [True, False, True]
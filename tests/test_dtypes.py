@@ -0,0 +1,52 @@
+"""Numeric downcasting and dtype optimization keep every value intact."""
+import numpy as np
+import pandas as pd
+
+from utils.dtypes import downcast_numeric, memory_bytes, optimize_dtypes
+
+
+def test_integers_take_the_narrowest_exact_width():
+    df = downcast_numeric(pd.DataFrame({
+        'small': np.array([0, 200], dtype=np.int64),
+        'signed': np.array([-5, 100], dtype=np.int64),
+        'wide': np.array([0, 2 ** 40], dtype=np.int64),
+    }))
+    assert df.dtypes.to_dict() == {
+        'small': np.dtype('uint8'), 'signed': np.dtype('int8'), 'wide': np.dtype('uint64'),
+    }
+
+
+def test_floats_are_narrowed_only_when_exact():
+    df = downcast_numeric(pd.DataFrame({'exact': [0.5, np.nan, 2.25], 'lossy': [0.1, 0.2, 0.3]}))
+    assert df['exact'].dtype == np.float32
+    assert df['lossy'].dtype == np.float64
+    assert df['exact'].isna().tolist() == [False, True, False]
+
+
+def test_booleans_and_extension_types_are_left_alone():
+    source = pd.DataFrame({'flag': [True, False], 'nullable': pd.array([1, None], dtype='Int64')})
+    df = downcast_numeric(source.copy())
+    assert df.dtypes.equals(source.dtypes)
+
+
+def test_optimize_keeps_values_and_saves_memory():
+    source = pd.DataFrame({
+        'city': pd.Series(["Lahore", "Karachi", "Lahore", "Quetta"] * 250, dtype=object),
+        'id': np.arange(1000, dtype=np.int64),
+        'note': pd.Series([f"note {i}" for i in range(1000)], dtype=object),
+    })
+
+    optimized = optimize_dtypes(source)
+
+    assert isinstance(optimized['city'].dtype, pd.CategoricalDtype)
+    assert optimized['id'].dtype == np.uint16
+    assert memory_bytes(optimized) < memory_bytes(source)
+    for col in source.columns:
+        assert optimized[col].astype(object).tolist() == source[col].tolist()
+
+
+def test_optimize_does_not_modify_its_input():
+    source = pd.DataFrame({'id': np.arange(10, dtype=np.int64), 'city': ["a"] * 10})
+    optimize_dtypes(source)
+    assert source['id'].dtype == np.int64
+    assert not isinstance(source['city'].dtype, pd.CategoricalDtype)
@@ -0,0 +1,143 @@
+"""Explorer index queries, checked against the same filters and sorts in pandas."""
+import gc
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.explorer import FrameIndex
+
+
+@pytest.fixture
+def df():
+    rng = np.random.default_rng(7)
+    n_rows = 2000
+    amount = rng.normal(100, 30, n_rows).round(1)
+    amount[rng.choice(n_rows, 50, replace=False)] = np.nan
+    city = rng.choice(["Lahore", "Karachi", "Quetta", "Multan", "Sialkot"], n_rows, p=[.4, .3, .2, .08, .02])
+    city = pd.Series(city, dtype=object)
+    city[rng.choice(n_rows, 30, replace=False)] = None
+    return pd.DataFrame({
+        'amount': amount,
+        'count': rng.integers(0, 20, n_rows),
+        'city': city,
+        'segment': pd.Categorical(rng.choice(["retail", "Wholesale", "online"], n_rows)),
+        'joined': pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 365, n_rows), unit="D"),
+    })
+
+
+def rows(positions, df):
+    return np.arange(len(df)) if positions is None else np.asarray(positions)
+
+
+FILTER_CASES = [
+    ({'amount': ('range', 80, 120)}, lambda df: df['amount'].between(80, 120)),
+    ({'joined': ('range', "2024-03-01", "2024-06-30")}, lambda df: df['joined'].between("2024-03-01", "2024-06-30")),
+    ({'city': ('values', ["Sialkot"])}, lambda df: df['city'].isin(["Sialkot"])),
+    ({'city': ('values', ["Lahore", "Multan", "Nowhere"])}, lambda df: df['city'].isin(["Lahore", "Multan"])),
+    ({'segment': ('contains', "SALE")}, lambda df: df['segment'].astype(str).str.contains("sale", case=False)),
+    (
+        {'city': ('values', ["Sialkot", "Quetta"]), 'count': ('range', 5, 9)},
+        lambda df: df['city'].isin(["Sialkot", "Quetta"]) & df['count'].between(5, 9),
+    ),
+]
+
+
+@pytest.mark.parametrize('filters, reference', FILTER_CASES)
+def test_filters_match_pandas(df, filters, reference):
+    positions = FrameIndex(len(df)).query(df, filters)
+    np.testing.assert_array_equal(rows(positions, df), np.flatnonzero(reference(df).to_numpy()))
+
+
+def test_search_matches_pandas(df):
+    positions = FrameIndex(len(df)).query(df, search=" kot ")
+    expected = (
+        df['city'].str.contains("kot", case=False, na=False)
+        | df['segment'].astype(str).str.contains("kot", case=False)
+    )
+    np.testing.assert_array_equal(rows(positions, df), np.flatnonzero(expected.to_numpy()))
+
+
+@pytest.mark.parametrize('sort_by', ['amount', 'count', 'city', 'segment', 'joined'])
+@pytest.mark.parametrize('ascending', [True, False])
+@pytest.mark.parametrize('filtered', [False, True])
+def test_sort_matches_pandas_with_missing_last(df, sort_by, ascending, filtered):
+    filters = {'count': ('range', 3, 11)} if filtered else {}
+    positions = FrameIndex(len(df)).query(df, filters, sort_by=sort_by, ascending=ascending)
+
+    subset = df[df['count'].between(3, 11)] if filtered else df
+    expected = subset.sort_values(sort_by, ascending=ascending, na_position='last', kind='stable')
+    result = df.take(positions)
+    # Ties may come out in either order, so the sorted column and the set of rows are compared
+    pd.testing.assert_series_equal(result[sort_by].reset_index(drop=True), expected[sort_by].reset_index(drop=True))
+    assert sorted(result.index) == sorted(expected.index)
+
+
+def test_unfiltered_unsorted_query_shows_every_row(df):
+    index = FrameIndex(len(df))
+    positions = index.query(df)
+    assert positions is None
+    assert index.count(positions) == len(df)
+    pd.testing.assert_frame_equal(index.page(df, positions, 10, 20), df.iloc[10:20])
+
+
+def test_postings_group_rows_by_value(df):
+    index = FrameIndex(len(df))
+    order, offsets = index.postings(df, 'city')
+    _, uniques = index.codes(df, 'city')
+    for code, value in enumerate(uniques):
+        np.testing.assert_array_equal(
+            np.sort(order[offsets[code]:offsets[code + 1]]), np.flatnonzero((df['city'] == value).to_numpy())
+        )
+    assert offsets[-1] - offsets[-2] == df['city'].isna().sum()
+    assert index.postings(df, 'amount') is None
+
+
+def test_unknown_filter_kind_is_rejected(df):
+    with pytest.raises(ValueError, match="Unknown filter kind"):
+        FrameIndex(len(df)).query(df, {'city': ('like', "L%")})
+
+
+def test_cached_query_keeps_only_the_latest_result(df):
+    index = FrameIndex(len(df))
+    first = index.cached_query(df, {'count': ('range', 0, 4)}, sort_by='amount')
+    assert index.cached_query(df, {'count': ('range', 0, 4)}, sort_by='amount') is first
+
+    index.cached_query(df, search="lahore")
+    assert [key for key in index._entries if key[0] == 'query'] == [
+        ('query', repr(({}, "lahore", None, True)))
+    ]
+
+
+def test_clear_drops_structures(df):
+    index = FrameIndex(len(df))
+    index.query(df, sort_by='city')
+    assert index.current_bytes > 0
+
+    index.clear()
+    assert index.current_bytes == 0
+    np.testing.assert_array_equal(index.query(df, sort_by='count'), FrameIndex(len(df)).query(df, sort_by='count'))
+
+
+def test_budget_evicts_least_recently_used_structures(df):
+    index = FrameIndex(len(df), budget_bytes=len(df) * 4 * 2)
+    for col in df.columns:
+        index.sort_order(df, col)
+    assert index.current_bytes <= index.budget_bytes
+
+
+def test_precompute_builds_ranks_within_budget(df):
+    index = FrameIndex(len(df))
+    index.precompute(df, ['amount', 'city']).join(timeout=10)
+    assert {('ranks', 'amount'), ('ranks', 'city')} <= set(index._entries)
+
+
+def test_precompute_stops_once_the_frame_is_gone(df):
+    index = FrameIndex(len(df))
+    frame = df.copy()
+    thread = index.precompute(frame)
+    index.clear()
+    del frame
+    gc.collect()
+    thread.join(timeout=10)
+    assert not thread.is_alive()
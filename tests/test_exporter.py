@@ -0,0 +1,22 @@
+"""Zip archives of several exports."""
+import gzip
+import io
+import zipfile
+
+import pandas as pd
+
+from utils.exporter import write_zip
+
+
+def test_zip_members_keep_their_own_csv_compression():
+    df = pd.DataFrame({'a': range(100), 'b': ["x"] * 100})
+
+    stream = io.BytesIO()
+    write_zip([("plain.csv", df, "CSV"), ("packed.csv.gz", df, "CSV", "gzip")], stream)
+    archive = zipfile.ZipFile(stream)
+
+    assert archive.getinfo("plain.csv").compress_type == zipfile.ZIP_DEFLATED
+    assert archive.getinfo("packed.csv.gz").compress_type == zipfile.ZIP_STORED
+    plain = archive.read("plain.csv")
+    assert gzip.decompress(archive.read("packed.csv.gz")) == plain
+    pd.testing.assert_frame_equal(pd.read_csv(io.BytesIO(plain)), df)
@@ -0,0 +1,94 @@
+"""Per-column imputation strategies, plans and null reports."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.imputation import impute, resolve_plan, zero_value
+
+
+@pytest.fixture
+def df():
+    return pd.DataFrame({
+        'num': [1.0, np.nan, 3.0, np.nan, 6.0],
+        'count': pd.array([1, None, 2, None, 2], dtype='Int64'),
+        'text': ["a", None, "b", "b", None],
+        'group': ["x", "y", "x", "y", "x"],
+        'time': [5, 1, 4, 2, 3],
+    })
+
+
+@pytest.mark.parametrize('strategy, expected', [
+    ('mean', [1.0, 10 / 3, 3.0, 10 / 3, 6.0]),
+    ('median', [1.0, 3.0, 3.0, 3.0, 6.0]),
+    ('mode', [1.0, 1.0, 3.0, 1.0, 6.0]),
+    ('zero', [1.0, 0.0, 3.0, 0.0, 6.0]),
+    ('constant', [1.0, -1.0, 3.0, -1.0, 6.0]),
+    ('ffill', [1.0, 1.0, 3.0, 3.0, 6.0]),
+    ('bfill', [1.0, 3.0, 3.0, 6.0, 6.0]),
+    ('interpolate', [1.0, 2.0, 3.0, 4.5, 6.0]),
+])
+def test_numeric_strategies(df, strategy, expected):
+    result, report = impute(df, {'num': {'strategy': strategy, 'value': -1.0}})
+
+    np.testing.assert_allclose(result['num'].to_numpy(), expected)
+    assert report['num']['nulls_before'] == 2
+    assert report['num']['nulls_after'] == 0
+
+
+def test_integer_columns_get_rounded_fills(df):
+    result, report = impute(df, {'count': {'strategy': 'mean'}})
+    assert result['count'].tolist() == [1, 2, 2, 2, 2]
+    assert result['count'].dtype == df['count'].dtype
+    assert report['count']['fill_value'] == 2
+
+
+def test_drop_removes_rows_with_nulls_in_that_column(df):
+    result, report = impute(df, {'text': {'strategy': 'drop'}})
+    assert result.index.tolist() == [0, 2, 3]
+    assert report['text']['nulls_after'] == 0
+
+
+def test_grouped_and_ordered_fills(df):
+    result, _ = impute(df, {'text': {'strategy': 'ffill', 'group_by': ['group']}})
+    assert result['text'].isna().tolist() == [False, True, False, False, False]
+    assert result['text'].dropna().tolist() == ["a", "b", "b", "b"]
+
+    # In 'time' order the rows run 1, 3, 4, 2, 0, so both gaps take row 4's value
+    result, _ = impute(df, {'num': {'strategy': 'bfill', 'order_by': 'time'}})
+    assert result['num'].tolist() == [1.0, 6.0, 3.0, 6.0, 6.0]
+
+
+def test_default_applies_where_it_fits(df):
+    result, report = impute(df, default={'strategy': 'mean'})
+    # Text columns cannot take a mean, so the frame-wide default skips them
+    assert set(report) == {'num', 'count'}
+    assert result['text'].isna().sum() == 2
+
+
+def test_report_counts_nulls_left_by_propagation(df):
+    _, report = impute(df, {'text': {'strategy': 'bfill'}})
+    assert report['text'] == {'strategy': 'bfill', 'nulls_before': 2, 'nulls_after': 1, 'fill_value': None}
+
+
+def test_columns_without_nulls_are_untouched(df):
+    result, report = impute(df, {'group': {'strategy': 'zero'}})
+    assert result is df
+    assert report == {}
+
+
+def test_plan_validation(df):
+    with pytest.raises(ValueError, match="Unknown columns"):
+        resolve_plan(df, {'missing': {'strategy': 'zero'}})
+    with pytest.raises(ValueError, match="not numeric"):
+        resolve_plan(df, {'text': {'strategy': 'mean'}})
+    with pytest.raises(ValueError, match="needs a 'value'"):
+        resolve_plan(df, {'num': {'strategy': 'constant'}})
+    with pytest.raises(ValueError, match="Unknown imputation strategy"):
+        resolve_plan(df, {'num': {'strategy': 'guess'}})
+    assert resolve_plan(df, {'num': {'strategy': 'none'}}) == {}
+
+
+def test_zero_value_per_dtype():
+    assert zero_value(np.dtype('float64')) == 0
+    assert zero_value(pd.StringDtype()) == 'N/A'
+    assert zero_value(np.dtype('bool')) is None
@@ -0,0 +1,105 @@
+"""Content hashing, cache keys and the LRU spill cache of parsed uploads."""
+import io
+
+import pandas as pd
+
+from utils.parse_cache import ParseCache, hash_file_content, make_cache_key
+
+
+def test_hash_depends_on_content_and_keeps_position():
+    file = io.BytesIO(b"a,b\n1,2\n")
+    file.seek(3)
+
+    digest = hash_file_content(file, chunk_size=2)
+
+    assert file.tell() == 3
+    assert digest == hash_file_content(io.BytesIO(b"a,b\n1,2\n"))
+    assert digest != hash_file_content(io.BytesIO(b"a,b\n1,3\n"))
+
+
+def test_key_ignores_option_order_but_not_values():
+    key = make_cache_key("abc", "csv", {'sep': ';', 'header': 0})
+    assert key == make_cache_key("abc", "csv", {'header': 0, 'sep': ';'})
+    assert key != make_cache_key("abc", "csv", {'header': 0, 'sep': ','})
+    assert key != make_cache_key("abc", "excel", {'header': 0, 'sep': ';'})
+    assert make_cache_key("abc", "csv") == make_cache_key("abc", "csv", {})
+
+
+def test_round_trip_counts_hits_and_misses(tmp_path):
+    cache = ParseCache(str(tmp_path), max_bytes=10 ** 8)
+    df = pd.DataFrame({'a': [1, 2, 3], 'b': ["x", None, "z"]})
+
+    assert cache.get("key") is None
+    cache.put("key", df)
+
+    pd.testing.assert_frame_equal(cache.get("key"), df)
+    assert cache.stats()['hits'] == 1
+    assert cache.stats()['misses'] == 1
+    assert cache.stats()['entries'] == 1
+
+
+def test_frames_arrow_cannot_store_are_not_cached(tmp_path):
+    cache = ParseCache(str(tmp_path), max_bytes=10 ** 8)
+
+    cache.put("mixed", pd.DataFrame({'mixed': [1, "two", 3.0]}))
+
+    assert cache.get("mixed") is None
+    assert not list(tmp_path.iterdir())
+
+
+def test_only_parquet_spill_files_are_adopted(tmp_path):
+    (tmp_path / "planted.pkl").write_bytes(b"not a frame")
+    cache = ParseCache(str(tmp_path), max_bytes=10 ** 8)
+    assert cache.stats()['entries'] == 0
+    assert cache.get("planted") is None
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    df = pd.DataFrame({'a': range(100)})
+    probe = ParseCache(str(tmp_path / "probe"), max_bytes=10 ** 8)
+    probe.put("probe", df)
+    size = probe.current_bytes
+
+    cache = ParseCache(str(tmp_path / "cache"), max_bytes=2 * size)
+    cache.put("first", df)
+    cache.put("second", df)
+    cache.get("first")
+    cache.put("third", df)
+
+    assert cache.get("second") is None
+    assert cache.get("first") is not None
+    assert cache.get("third") is not None
+    assert cache.current_bytes <= 2 * size
+
+
+def test_entries_larger_than_the_budget_are_not_kept(tmp_path):
+    cache = ParseCache(str(tmp_path), max_bytes=1)
+    cache.put("big", pd.DataFrame({'a': range(1000)}))
+    assert cache.get("big") is None
+    assert not list(tmp_path.iterdir())
+
+
+def test_spill_files_are_adopted_by_a_new_process(tmp_path):
+    ParseCache(str(tmp_path), max_bytes=10 ** 8).put("kept", pd.DataFrame({'a': [1]}))
+    assert ParseCache(str(tmp_path), max_bytes=10 ** 8).get("kept") is not None
+
+
+def test_missing_spill_file_is_a_miss(tmp_path):
+    cache = ParseCache(str(tmp_path), max_bytes=10 ** 8)
+    cache.put("gone", pd.DataFrame({'a': [1]}))
+    for path in tmp_path.iterdir():
+        path.unlink()
+
+    assert cache.get("gone") is None
+    assert cache.stats()['entries'] == 0
+
+
+def test_clear_removes_files_and_counters(tmp_path):
+    cache = ParseCache(str(tmp_path), max_bytes=10 ** 8)
+    cache.put("key", pd.DataFrame({'a': [1]}))
+    cache.get("key")
+
+    cache.clear()
+
+    assert cache.stats() == {'hits': 0, 'misses': 0, 'entries': 0, 'bytes': 0, 'max_bytes': 10 ** 8}
+    assert not list(tmp_path.iterdir())
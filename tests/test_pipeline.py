@@ -0,0 +1,119 @@
+"""Pipeline steps, prefix memoization and per-column version tokens."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils import pipeline
+from utils.pipeline import PipelineCache, column_versions, run_pipeline, step_key
+
+DEDUPE = {'op': 'drop_duplicates', 'subset': None, 'keep': 'first', 'method': 'auto'}
+FILL_ZERO = {'op': 'missing_values', 'strategy': "Fill with 0"}
+FILL_MEAN = {'op': 'missing_values', 'strategy': "Fill with mean"}
+
+
+@pytest.fixture
+def df():
+    return pd.DataFrame({'a': [1.0, 1.0, np.nan, 4.0], 'b': ["x", "x", "y", None]})
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    """Record every step the pipeline actually runs."""
+    ran = []
+    for op, step_func in list(pipeline.STEP_FUNCTIONS.items()):
+        def recorded(df, _op=op, _func=step_func, **params):
+            ran.append(_op)
+            return _func(df, **params)
+        monkeypatch.setitem(pipeline.STEP_FUNCTIONS, op, recorded)
+    return ran
+
+
+def test_steps_run_in_order(df):
+    result, stats = run_pipeline(df, [DEDUPE, FILL_ZERO])
+
+    assert result['a'].tolist() == [1.0, 0.0, 4.0]
+    assert result['b'].tolist() == ["x", "y", "N/A"]
+    assert stats[0]['rows_removed'] == 1
+    assert stats[1]['null_counts']['a']['nulls_before'] == 1
+
+
+def test_rerun_is_served_from_the_cache(df, calls):
+    cache = PipelineCache()
+    first, first_stats = run_pipeline(df, [DEDUPE, FILL_ZERO], "v1", cache)
+    calls.clear()
+
+    second, second_stats = run_pipeline(df, [DEDUPE, FILL_ZERO], "v1", cache)
+
+    assert calls == []
+    assert second is first
+    assert second_stats == first_stats
+
+
+def test_changing_a_step_resumes_from_the_cached_prefix(df, calls):
+    cache = PipelineCache()
+    run_pipeline(df, [DEDUPE, FILL_ZERO], "v1", cache)
+    calls.clear()
+
+    result, _ = run_pipeline(df, [DEDUPE, FILL_MEAN], "v1", cache)
+
+    assert calls == ['missing_values']
+    assert result['a'].tolist() == [1.0, 2.5, 4.0]
+
+
+def test_cache_is_keyed_by_data_version(df, calls):
+    cache = PipelineCache()
+    run_pipeline(df, [DEDUPE], "v1", cache)
+    run_pipeline(df, [DEDUPE], "v2", cache)
+    run_pipeline(df, [DEDUPE], None, cache)
+    assert calls == ['drop_duplicates'] * 3
+
+
+def test_unchanged_prefix_does_not_pin_the_input(df):
+    cache = PipelineCache()
+    clean = df.dropna()
+
+    result, _ = run_pipeline(clean, [FILL_ZERO], "v1", cache)
+
+    assert result is clean
+    assert cache.get(("v1", step_key([FILL_ZERO])))[0] is None
+    assert cache.current_bytes == 0
+    assert run_pipeline(clean, [FILL_ZERO], "v1", cache)[0] is clean
+
+
+def test_discard_and_lru_bound(df):
+    cache = PipelineCache(max_entries=2)
+    run_pipeline(df, [DEDUPE], "v1", cache)
+    run_pipeline(df, [DEDUPE], "v2", cache)
+    run_pipeline(df, [DEDUPE], "v3", cache)
+    assert cache.get(("v1", step_key([DEDUPE]))) is None
+    assert cache.current_bytes > 0
+
+    cache.discard("v2")
+    assert cache.get(("v2", step_key([DEDUPE]))) is None
+    assert cache.get(("v3", step_key([DEDUPE]))) is not None
+
+    cache.clear()
+    assert cache.current_bytes == 0
+
+
+def test_unknown_steps_are_rejected(df):
+    with pytest.raises(ValueError, match="Unknown pipeline step"):
+        run_pipeline(df, [{'op': 'shuffle'}])
+    with pytest.raises(ValueError, match="Unknown missing value strategy"):
+        run_pipeline(df, [{'op': 'missing_values', 'strategy': "Guess"}])
+
+
+def test_step_key_ignores_parameter_order():
+    assert step_key([{'op': 'x', 'a': 1, 'b': 2}]) == step_key([{'b': 2, 'op': 'x', 'a': 1}])
+    assert step_key([DEDUPE, FILL_ZERO]) != step_key([FILL_ZERO, DEDUPE])
+
+
+def test_column_versions_follow_the_steps_that_touched_them(df):
+    steps = [{'op': 'impute', 'columns': {'a': {'strategy': 'zero'}}, 'default': None}]
+    _, stats = run_pipeline(df, steps)
+    versions = column_versions("v1", df.columns, steps, stats)
+    assert versions == {'a': f"v1:{step_key(steps)}", 'b': "v1"}
+
+    _, stats = run_pipeline(df, [DEDUPE])
+    versions = column_versions("v1", df.columns, [DEDUPE], stats)
+    assert set(versions.values()) == {f"v1:{step_key([DEDUPE])}"}
@@ -0,0 +1,45 @@
+"""Frame accounting, Parquet spilling and reloading in the session store."""
+import numpy as np
+import pandas as pd
+
+from utils.dtypes import memory_bytes
+from utils.session_store import SessionStore
+
+
+def frame(n_rows=1000):
+    return pd.DataFrame({'a': np.arange(n_rows), 'b': np.linspace(0, 1, n_rows)})
+
+
+def test_frames_over_budget_are_spilled_to_parquet_and_reloaded(tmp_path):
+    store = SessionStore(str(tmp_path), budget_bytes=int(memory_bytes(frame()) * 1.5))
+    store.put("s1", "dataframes", "first", frame())
+    store.put("s1", "dataframes", "second", frame())
+
+    assert store.spills == 1
+    assert [path.suffix for path in tmp_path.rglob("*") if path.is_file()] == [".parquet"]
+
+    pd.testing.assert_frame_equal(store.get("s1", "dataframes", "first"), frame())
+    assert store.reloads == 1
+    assert store.resident_bytes <= store.budget_bytes
+
+
+def test_frames_arrow_cannot_store_stay_in_memory(tmp_path):
+    mixed = pd.DataFrame({'mixed': [1, "two", 3.0] * 100})
+    store = SessionStore(str(tmp_path), budget_bytes=1)
+    store.put("s1", "dataframes", "mixed", mixed)
+    store.put("s1", "dataframes", "plain", frame())
+
+    assert store.get("s1", "dataframes", "mixed") is mixed
+    assert store.spills == 0
+    assert not [path for path in tmp_path.rglob("*") if path.is_file()]
+
+
+def test_drop_session_removes_its_spill_files(tmp_path):
+    store = SessionStore(str(tmp_path), budget_bytes=1)
+    store.put("s1", "dataframes", "first", frame())
+    store.put("s1", "dataframes", "second", frame())
+    assert store.spills == 1
+
+    store.drop_session("s1")
+    assert not list(tmp_path.iterdir())
+    assert list(store.keys("s1", "dataframes")) == []
@@ -0,0 +1,121 @@
+"""CSV sniffing and vectorized column rules, whole and in chunks."""
+import io
+
+import pandas as pd
+import pytest
+
+from utils.validation import check_rules, csv_read_options, sniff_csv, validate_chunks, validate_csv, validate_frame
+
+
+def violations(report):
+    return {(entry['column'], entry['rule']): entry['violations'] for entry in report['violations']}
+
+
+@pytest.fixture
+def df():
+    return pd.DataFrame({
+        'id': [1, 2, 2, 4, 5, 6],
+        'age': ["31", "x", "45", "200", None, "7.5"],
+        'email': ["a@b.pk", "bad", None, "c@d.pk", "e@f.pk", "g@h.pk"],
+        'city': ["Lahore", "Karachi", "Lahore", "Multan", "Quetta", None],
+        'joined': ["2024-01-05", "2024-02-10", "soon", "2024-03-01", None, "2024-04-01"],
+    })
+
+
+RULES = {
+    'id': {'type': 'integer', 'unique': True},
+    'age': {'type': 'integer', 'min': 0, 'max': 120, 'not_null': True},
+    'email': {'regex': r"[^@]+@[^@]+\.\w+"},
+    'city': {'allowed': ["Lahore", "Karachi", "Quetta"], 'not_null': True},
+    'joined': {'type': 'datetime', 'min': "2024-01-01", 'max': "2024-03-31"},
+}
+
+
+def test_every_rule_counts_its_violations(df):
+    report = validate_frame(df, RULES)
+
+    assert not report['passed']
+    assert report['rows'] == 6
+    assert violations(report) == {
+        ('id', 'unique'): 1,
+        ('age', 'type'): 2,
+        ('age', 'range'): 1,
+        ('age', 'not_null'): 1,
+        ('email', 'regex'): 1,
+        ('city', 'allowed'): 1,
+        ('city', 'not_null'): 1,
+        ('joined', 'type'): 1,
+        ('joined', 'range'): 1,
+    }
+
+
+def test_samples_point_at_the_offending_rows(df):
+    report = validate_frame(df, {'id': {'unique': True}, 'age': {'type': 'integer'}}, sample_size=1)
+    samples = {entry['column']: entry['sample'] for entry in report['violations']}
+    assert samples['id'] == [{'row': 2, **df.iloc[2].to_dict()}]
+    assert [sample['row'] for sample in samples['age']] == [1]
+
+
+@pytest.mark.parametrize('chunk_rows', [1, 2, 4])
+def test_chunked_validation_matches_whole_frame(df, chunk_rows):
+    chunks = [df.iloc[start:start + chunk_rows] for start in range(0, len(df), chunk_rows)]
+    assert violations(validate_chunks(chunks, RULES)) == violations(validate_frame(df, RULES))
+
+
+def test_missing_columns_fail_the_report(df):
+    report = validate_frame(df, {'salary': {'not_null': True}})
+    assert report['missing_columns'] == ['salary']
+    assert not report['passed']
+
+
+def test_clean_data_passes(df):
+    assert validate_frame(df, {'id': {'type': 'number', 'min': 1}})['passed']
+
+
+def test_invalid_rules_are_rejected():
+    with pytest.raises(ValueError, match="Unknown rules"):
+        check_rules({'a': {'shape': 'round'}})
+    with pytest.raises(ValueError, match="Unknown type"):
+        check_rules({'a': {'type': 'complex'}})
+    with pytest.raises(ValueError, match="Invalid pattern"):
+        check_rules({'a': {'regex': "("}})
+
+
+def test_sniff_detects_layout_and_ragged_lines():
+    text = "name;age\nAli;31\nSara;28;extra\nBilal;40\n"
+    sniffed = sniff_csv(io.BytesIO(text.encode("cp1252")))
+
+    assert sniffed['delimiter'] == ";"
+    assert sniffed['has_header']
+    assert sniffed['columns'] == ["name", "age"]
+    assert sniffed['field_count'] == 2
+    assert sniffed['ragged_lines'] == [3]
+    assert csv_read_options(sniffed) == {'sep': ";"}
+
+
+def test_sniff_detects_headerless_files_and_encodings():
+    sniffed = sniff_csv(io.BytesIO("1,2.5\n3,4.5\n".encode("utf-16")))
+    assert not sniffed['has_header']
+    assert sniffed['encoding'].startswith("utf-16")
+    assert csv_read_options(sniffed)['header'] is None
+
+
+def test_validate_csv_streams_with_sniffed_options(df):
+    source = io.BytesIO(df.to_csv(index=False, sep="|").encode())
+    report = validate_csv(source, RULES, chunksize=2)
+
+    assert report['sniffed']['delimiter'] == "|"
+    assert violations(report) == violations(validate_frame(df, RULES))
+
+
+def test_zstd_files_without_zstandard_fail_with_install_hint(monkeypatch):
+    import utils.readers
+
+    monkeypatch.setattr(utils.readers, 'zstd_available', lambda: False)
+    source = io.BytesIO(b"not read")
+    source.name = "data.csv.zst"
+
+    with pytest.raises(ValueError, match="pip install zstandard"):
+        sniff_csv(source, 'zstd')
+    with pytest.raises(ValueError, match="pip install zstandard"):
+        utils.readers.read_file(source)
@@ -0,0 +1,657 @@
+"""
+Out-of-core execution backend built on DuckDB.
+
+A DuckDBFrame stands in for a pandas DataFrame whose data stays in a file on
+disk. It implements the small part of the DataFrame API the app relies on
+(columns, dtypes, shape, head, column projection) plus hooks that the
+pipeline, profiler, chart engine and exporter delegate to, so deduplication,
+missing-value handling, chart aggregates and exports run as streaming
+queries. Only previews and aggregates are materialized in memory.
+
+DuckDB is optional; check duckdb_available() before opening files.
+"""
+import os
+import shutil
+import tempfile
+import threading
+
+import numpy as np
+import pandas as pd
+
+from utils import settings
+from utils.imputation import MISSING_VALUE_STRATEGIES, SCALAR_STRATEGIES, resolve_plan, zero_value
+from utils.readers import detect_format
+
+ROW_ID = "__row_id"
+OUT_OF_CORE_FORMATS = ('csv', 'parquet')
+
+
+def duckdb_available():
+    """Return True if the duckdb package can be imported."""
+    try:
+        import duckdb  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _quote(name):
+    """Quote an identifier for SQL."""
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _literal(value):
+    """Quote a string literal for SQL."""
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def _numpy_dtype(sql_type):
+    """Map a DuckDB column type to the numpy dtype pandas would use."""
+    sql_type = sql_type.upper()
+    if sql_type in ('TINYINT', 'SMALLINT', 'INTEGER', 'BIGINT', 'HUGEINT',
+                    'UTINYINT', 'USMALLINT', 'UINTEGER', 'UBIGINT'):
+        return np.dtype('int64')
+    if sql_type in ('FLOAT', 'DOUBLE', 'REAL') or sql_type.startswith('DECIMAL'):
+        return np.dtype('float64')
+    if sql_type == 'BOOLEAN':
+        return np.dtype('bool')
+    if sql_type.startswith(('DATE', 'TIMESTAMP')):
+        return np.dtype('datetime64[ns]')
+    return np.dtype('object')
+
+
+def _nullable_integer_columns(path):
+    """
+    Find the columns a Parquet file's pandas metadata records as nullable integers.
+
+    pandas reads those back as e.g. Int64; other integer columns with nulls
+    come back as float64.
+
+    Args:
+        path (str): Parquet file path
+
+    Returns:
+        dict: Column name -> pandas dtype name, e.g. {"a": "Int64"}
+    """
+    try:
+        import pyarrow.parquet as pq
+        metadata = pq.read_schema(path).pandas_metadata or {}
+    except (ImportError, OSError, ValueError):
+        return {}
+    columns = {}
+    for column in metadata.get('columns', []):
+        numpy_type = column.get('numpy_type') or ""
+        if numpy_type.startswith(('Int', 'UInt')):
+            columns[column['name']] = numpy_type
+    return columns
+
+
+class DuckDBColumn:
+    """
+    A single column of a DuckDBFrame, handed to the chart engine in place of a Series.
+    """
+
+    out_of_core = True
+
+    def __init__(self, frame, name):
+        self.frame = frame
+        self.name = name
+
+
+class DuckDBFrame:
+    """
+    Lazy, query-backed stand-in for a DataFrame stored in a CSV or Parquet file.
+    """
+
+    out_of_core = True
+
+    def __init__(self, connection, sql, schema, has_row_id=False, nullable_integers=None):
+        self._connection = connection
+        self.sql = sql
+        self._schema = schema  # list of (column name, SQL type)
+        self.has_row_id = has_row_id
+        # Column -> pandas nullable integer dtype recorded in Parquet metadata
+        self.nullable_integers = dict(nullable_integers or {})
+        self._row_count = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_path(cls, path):
+        """
+        Open a CSV or Parquet file without loading it.
+
+        Args:
+            path (str): File path
+
+        Returns:
+            DuckDBFrame: Frame reading from the file
+
+        Raises:
+            ValueError: If the file format cannot be queried out of core
+        """
+        import duckdb
+
+        file_format, _ = detect_format(path)
+        if file_format not in OUT_OF_CORE_FORMATS:
+            raise ValueError(f"Out-of-core processing supports CSV and Parquet, not {file_format}")
+
+        connection = duckdb.connect()
+        connection.execute(f"SET memory_limit = {_literal(settings.DUCKDB_MEMORY_LIMIT)}")
+        spill_dir = os.path.join(settings.CACHE_DIR, "duckdb")
+        os.makedirs(spill_dir, exist_ok=True)
+        connection.execute(f"SET temp_directory = {_literal(spill_dir)}")
+        connection.execute("SET preserve_insertion_order = true")
+
+        reader = "read_parquet" if file_format == 'parquet' else "read_csv"
+        source = f"SELECT * FROM {reader}({_literal(path)})"
+        schema = [(row[0], row[1]) for row in connection.execute(f"DESCRIBE {source}").fetchall()]
+        nullable_integers = _nullable_integer_columns(path) if file_format == 'parquet' else {}
+
+        # pandas reads integer columns holding nulls as float64, unless the file records a
+        # nullable integer type, so they are cast to DOUBLE before any step sees them
+        integer_cols = [
+            col for col, sql_type in schema if _numpy_dtype(sql_type).kind == 'i' and col not in nullable_integers
+        ]
+        counts = [f"count({_quote(col)})" for col in integer_cols]
+        row_count, *non_null = connection.execute(
+            f"SELECT {', '.join(['count(*)'] + counts)} FROM ({source})"
+        ).fetchone()
+        widened = {col for col, count in zip(integer_cols, non_null) if count < row_count}
+        if widened:
+            casts = ", ".join(f"CAST({_quote(col)} AS DOUBLE) AS {_quote(col)}" for col in widened)
+            source = f"SELECT * REPLACE ({casts}) FROM {reader}({_literal(path)})"
+            schema = [(col, 'DOUBLE' if col in widened else sql_type) for col, sql_type in schema]
+
+        # Number rows once in file order so order-sensitive steps stay deterministic
+        sql = f"SELECT row_number() OVER () - 1 AS {ROW_ID}, * FROM ({source})"
+        frame = cls(connection, sql, schema, has_row_id=True, nullable_integers=nullable_integers)
+        frame._row_count = row_count
+        return frame
+
+    # DataFrame-like surface used by the app
+
+    @property
+    def columns(self):
+        """pd.Index: Column names."""
+        return pd.Index([name for name, _ in self._schema])
+
+    @property
+    def dtypes(self):
+        """pd.Series: Column dtypes as pandas would report them."""
+        return pd.Series({
+            name: pd.api.types.pandas_dtype(self.nullable_integers[name]) if name in self.nullable_integers
+            else _numpy_dtype(sql_type)
+            for name, sql_type in self._schema
+        }, dtype=object)
+
+    @property
+    def shape(self):
+        """tuple: (rows, columns); the row count is computed once."""
+        return (len(self), len(self._schema))
+
+    def __len__(self):
+        if self._row_count is None:
+            self._row_count = self._scalar(f"SELECT count(*) FROM ({self.sql})")
+        return self._row_count
+
+    def __getitem__(self, columns):
+        if isinstance(columns, str):
+            return DuckDBColumn(self, columns)
+        return self.project(list(columns))
+
+    def head(self, n=5):
+        """
+        Materialize the first rows.
+
+        Args:
+            n (int): Number of rows
+
+        Returns:
+            pd.DataFrame: First rows in file order
+        """
+        return self.fetch(limit=n)
+
+    def project(self, columns):
+        """
+        Select a subset of columns lazily.
+
+        Args:
+            columns (list): Column names
+
+        Returns:
+            DuckDBFrame: Projected frame
+        """
+        types = dict(self._schema)
+        select = ", ".join(_quote(col) for col in columns)
+        if self.has_row_id:
+            select = f"{ROW_ID}, {select}" if select else ROW_ID
+        return self._derive(f"SELECT {select} FROM ({self.sql})", [(col, types[col]) for col in columns])
+
+    def fetch(self, limit=None):
+        """
+        Materialize the frame (or its first rows) as a pandas DataFrame.
+
+        Args:
+            limit (int): Optional row limit
+
+        Returns:
+            pd.DataFrame: Materialized rows in file order
+        """
+        query = f"SELECT {self._select_list()} FROM ({self.sql})"
+        if self.has_row_id:
+            query += f" ORDER BY {ROW_ID}"
+        if limit is not None:
+            query += f" LIMIT {int(limit)}"
+        return self._restore_nullable_integers(self._query(query).df())
+
+    def iter_chunks(self, chunk_rows=None):
+        """
+        Stream the frame as pandas DataFrames of at most chunk_rows rows, in file order.
+
+        Args:
+            chunk_rows (int): Rows per chunk, defaults to settings.EXPORT_CHUNK_ROWS
+
+        Yields:
+            pd.DataFrame: Consecutive chunks of rows
+        """
+        query = f"SELECT {self._select_list()} FROM ({self.sql})"
+        if self.has_row_id:
+            query += f" ORDER BY {ROW_ID}"
+        for batch in self._query(query).to_arrow_reader(chunk_rows or settings.EXPORT_CHUNK_ROWS):
+            yield self._restore_nullable_integers(batch.to_pandas())
+
+    # Pipeline hook
+
+    def apply_steps(self, steps):
+        """
+        Apply cleaning steps as lazy SQL, mirroring utils.pipeline semantics.
+
+        Args:
+            steps (list): Pipeline steps
+
+        Returns:
+            tuple: (DuckDBFrame, list) with the cleaned frame and per-step statistics
+        """
+        frame, step_stats = self, []
+        for step in steps:
+            params = {name: value for name, value in step.items() if name != 'op'}
+            if step['op'] == 'drop_duplicates':
+                result = frame._drop_duplicates(**params)
+                changed = []
+            elif step['op'] in ('missing_values', 'impute'):
+                if step['op'] == 'missing_values':
+                    if params['strategy'] not in MISSING_VALUE_STRATEGIES:
+                        raise ValueError(f"Unknown missing value strategy: {params['strategy']}")
+                    params = {'default': MISSING_VALUE_STRATEGIES[params['strategy']]}
+                result, report = frame._impute(**params)
+                changed = [col for col, entry in report.items() if entry['strategy'] != 'drop']
+                step_stats.append({
+                    'rows_removed': len(frame) - len(result), 'columns_changed': changed, 'null_counts': report
+                })
+                frame = result
+                continue
+            else:
+                raise ValueError(f"Step {step['op']} is not supported out of core")
+            step_stats.append({'rows_removed': len(frame) - len(result), 'columns_changed': changed})
+            frame = result
+        return frame, step_stats
+
+    def _drop_duplicates(self, subset=None, keep='first', method='auto'):
+        # The method only selects a pandas strategy; SQL always partitions on the keys
+        if keep not in ('first', 'last', 'none'):
+            raise ValueError(f"Unknown keep option: {keep}")
+        partition = ", ".join(_quote(col) for col in (subset or self.columns))
+        if keep == 'none':
+            condition = f"count(*) OVER (PARTITION BY {partition}) = 1"
+        else:
+            order = ""
+            if self.has_row_id:
+                order = f" ORDER BY {ROW_ID}" + (" DESC" if keep == 'last' else "")
+            condition = f"row_number() OVER (PARTITION BY {partition}{order}) = 1"
+        return self._derive(f"SELECT * FROM ({self.sql}) QUALIFY {condition}", self._schema)
+
+    def _impute(self, columns=None, default=None):
+        plan = resolve_plan(self, columns, default)
+        nulls_before = self._null_counts()
+        plan = {col: spec for col, spec in plan.items() if nulls_before[col] > 0}
+        report = {
+            col: {'strategy': spec['strategy'], 'nulls_before': int(nulls_before[col]),
+                  'nulls_after': 0, 'fill_value': None}
+            for col, spec in plan.items()
+        }
+        if not plan:
+            return self, report
+
+        frame = self
+        drop_cols = [col for col, spec in plan.items() if spec['strategy'] == 'drop']
+        if drop_cols:
+            condition = " AND ".join(f"{_quote(col)} IS NOT NULL" for col in drop_cols)
+            frame = self._derive(f"SELECT * FROM ({self.sql}) WHERE {condition}", self._schema)
+
+        # Every mean and median in one aggregate scan
+        aggregates = {'mean': "avg", 'median': "median"}
+        stat_cols = [col for col, spec in plan.items() if spec['strategy'] in aggregates]
+        stats = {}
+        if stat_cols:
+            expressions = ", ".join(f"{aggregates[plan[col]['strategy']]}({_quote(col)})" for col in stat_cols)
+            stats = dict(zip(stat_cols, frame._query(f"SELECT {expressions} FROM ({frame.sql})").fetchone()))
+        for col in [col for col, spec in plan.items() if spec['strategy'] == 'mode']:
+            # Ties go to the smallest value, as with pandas' mode
+            quoted = _quote(col)
+            row = frame._query(
+                f"SELECT {quoted} FROM ({frame.sql}) WHERE {quoted} IS NOT NULL "
+                f"GROUP BY {quoted} ORDER BY count(*) DESC, {quoted} LIMIT 1"
+            ).fetchone()
+            stats[col] = row[0] if row else None
+
+        expressions = []
+        for col, sql_type in self._schema:
+            quoted = _quote(col)
+            spec = plan.get(col)
+            strategy = spec['strategy'] if spec else None
+            if strategy in SCALAR_STRATEGIES:
+                if strategy == 'constant':
+                    value = spec['value']
+                elif strategy == 'zero':
+                    value = zero_value(_numpy_dtype(sql_type))
+                else:
+                    value = stats.get(col)
+                    if value is not None and strategy in ('mean', 'median') and _numpy_dtype(sql_type).kind == 'i':
+                        value = int(round(value))
+                report[col]['fill_value'] = value
+                if value is None:
+                    expressions.append(quoted)
+                    report[col]['nulls_after'] = report[col]['nulls_before']
+                else:
+                    literal = _literal(value) if isinstance(value, str) else repr(value)
+                    expressions.append(f"COALESCE({quoted}, CAST({literal} AS {sql_type})) AS {quoted}")
+            elif strategy in ('ffill', 'bfill'):
+                direction = "" if strategy == 'ffill' else " DESC"
+                order = [_quote(spec['order_by']) + direction] if spec.get('order_by') else []
+                if self.has_row_id:
+                    order.append(ROW_ID + direction)
+                partition = ", ".join(_quote(key) for key in spec.get('group_by') or ())
+                window = (f"PARTITION BY {partition} " if partition else "") + f"ORDER BY {', '.join(order)}"
+                expressions.append(
+                    f"last_value({quoted} IGNORE NULLS) OVER ({window} "
+                    f"ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW) AS {quoted}"
+                )
+            elif strategy == 'interpolate':
+                raise ValueError("Interpolation is not supported out of core")
+            else:
+                expressions.append(quoted)
+
+        if self.has_row_id:
+            expressions.insert(0, ROW_ID)
+        result = self._derive(f"SELECT {', '.join(expressions)} FROM ({frame.sql})", self._schema)
+
+        propagated = [col for col, spec in plan.items() if spec['strategy'] in ('ffill', 'bfill')]
+        if propagated:
+            nulls_after = result._null_counts()
+            for col in propagated:
+                report[col]['nulls_after'] = int(nulls_after[col])
+        return result, report
+
+    def _null_counts(self):
+        expressions = ", ".join(f"count(*) - count({_quote(col)})" for col in self.columns)
+        row = self._query(f"SELECT {expressions} FROM ({self.sql})").fetchone()
+        return dict(zip(self.columns, row))
+
+    # Profiler hook
+
+    def profile(self, columns=None, top_k=5):
+        """
+        Profile columns with one aggregate scan plus a top-k query per column.
+
+        Args:
+            columns (list): Columns to profile, defaults to all
+            top_k (int): Number of most frequent values to keep
+
+        Returns:
+            dict: Mapping of column name to a profile shaped like profiler.profile_column
+        """
+        types = dict(self._schema)
+        columns = list(columns if columns is not None else self.columns)
+        if not columns:
+            return {}
+
+        expressions = []
+        for col in columns:
+            quoted = _quote(col)
+            expressions += [f"count({quoted})", f"count(*) - count({quoted})", f"approx_count_distinct({quoted})"]
+            if _numpy_dtype(types[col]).kind in 'iuf':
+                expressions += [
+                    f"min({quoted})::DOUBLE", f"max({quoted})::DOUBLE", f"avg({quoted})",
+                    f"stddev_samp({quoted})", f"approx_quantile({quoted}, [0.25, 0.5, 0.75])",
+                ]
+        row = list(self._query(f"SELECT {', '.join(expressions)} FROM ({self.sql})").fetchone())
+
+        profiles = {}
+        for col in columns:
+            dtype = _numpy_dtype(types[col])
+            numeric = dtype.kind in 'iuf'
+            count, nulls, distinct = row[:3]
+            del row[:3]
+            top = self._query(
+                f"SELECT {_quote(col)}, count(*) AS n FROM ({self.sql}) WHERE {_quote(col)} IS NOT NULL "
+                f"GROUP BY 1 ORDER BY n DESC LIMIT {int(top_k)}"
+            ).fetchall()
+            profile = {
+                'dtype': str(dtype),
+                'count': int(count),
+                'nulls': int(nulls),
+                'numeric': numeric,
+                'distinct_approx': int(distinct),
+                'top_values': [(value, int(n)) for value, n in top],
+            }
+            if numeric:
+                minimum, maximum, mean, std, quantiles = row[:5]
+                del row[:5]
+                if count:
+                    profile.update({
+                        'min': minimum,
+                        'max': maximum,
+                        'mean': mean,
+                        'std': std if std is not None else np.nan,
+                        'quantiles': dict(zip((0.25, 0.5, 0.75), quantiles)),
+                    })
+            profiles[col] = profile
+        return profiles
+
+    # Chart engine hooks
+
+    def histogram_bins(self, column, bins=50):
+        """Equal-width histogram of a numeric column, computed in one grouped scan."""
+        quoted = _quote(column)
+        low, high = self._query(
+            f"SELECT min({quoted})::DOUBLE, max({quoted})::DOUBLE FROM ({self.sql}) WHERE isfinite({quoted})"
+        ).fetchone()
+        if low is None:
+            return np.array([], dtype=np.int64), np.array([0.0, 1.0])
+        if high <= low:
+            high = low + 1.0
+        edges = np.linspace(low, high, bins + 1)
+        rows = self._query(
+            f"SELECT least(floor(({quoted} - {low}) / {(high - low) / bins})::BIGINT, {bins - 1}) AS b, count(*) "
+            f"FROM ({self.sql}) WHERE isfinite({quoted}) GROUP BY b"
+        ).fetchall()
+        counts = np.zeros(bins, dtype=np.int64)
+        for bucket, count in rows:
+            counts[int(bucket)] = count
+        return counts, edges
+
+    def box_stats(self, column, max_outliers=1_000):
+        """Approximate Tukey box statistics plus a reservoir sample of outliers."""
+        quoted = _quote(column)
+        q1, median, q3, mean = self._query(
+            f"SELECT approx_quantile({quoted}, 0.25)::DOUBLE, approx_quantile({quoted}, 0.5)::DOUBLE, "
+            f"approx_quantile({quoted}, 0.75)::DOUBLE, avg({quoted}) FROM ({self.sql}) WHERE isfinite({quoted})"
+        ).fetchone()
+        if q1 is None:
+            return None
+        iqr = q3 - q1
+        low_limit, high_limit = q1 - 1.5 * iqr, q3 + 1.5 * iqr
+        lower, upper, outlier_count = self._query(
+            f"SELECT min({quoted}) FILTER (WHERE {quoted} >= {low_limit}), "
+            f"max({quoted}) FILTER (WHERE {quoted} <= {high_limit}), "
+            f"count(*) FILTER (WHERE {quoted} < {low_limit} OR {quoted} > {high_limit}) "
+            f"FROM ({self.sql}) WHERE isfinite({quoted})"
+        ).fetchone()
+        outliers = self._query(
+            f"SELECT v::DOUBLE FROM (SELECT {quoted} AS v FROM ({self.sql}) "
+            f"WHERE {quoted} < {low_limit} OR {quoted} > {high_limit}) "
+            f"USING SAMPLE reservoir({int(max_outliers)} ROWS)"
+        ).fetchnumpy()['v'] if outlier_count else np.array([])
+        return {
+            'q1': q1,
+            'median': median,
+            'q3': q3,
+            'mean': mean,
+            'lowerfence': lower if lower is not None else q1,
+            'upperfence': upper if upper is not None else q3,
+            'outliers': np.asarray(outliers, dtype=np.float64),
+            'outlier_count': int(outlier_count),
+        }
+
+    def line_points(self, column, threshold):
+        """Min/max decimation over row order, one grouped scan."""
+        quoted = _quote(column)
+        buckets = max(threshold // 2, 1)
+        # Filtered rows keep their original ids, so buckets split the span of
+        # ids holding finite values rather than the number of rows left
+        rows = self._query(
+            f"WITH points AS (SELECT {ROW_ID}, {quoted} FROM ({self._with_row_id()}) WHERE isfinite({quoted})), "
+            f"span AS (SELECT min({ROW_ID}) AS low, max({ROW_ID}) - min({ROW_ID}) + 1 AS width FROM points) "
+            f"SELECT arg_min({ROW_ID}, {quoted}), min({quoted})::DOUBLE, arg_max({ROW_ID}, {quoted}), "
+            f"max({quoted})::DOUBLE FROM points, span "
+            f"GROUP BY ({ROW_ID} - low) * {buckets} // width ORDER BY 1"
+        ).fetchall()
+        points = sorted({(x, y) for x_min, y_min, x_max, y_max in rows for x, y in ((x_min, y_min), (x_max, y_max))})
+        x = np.array([point[0] for point in points], dtype=np.float64)
+        y = np.array([point[1] for point in points], dtype=np.float64)
+        return x, y
+
+    def scatter_density(self, x_column, y_column, bins=100):
+        """2D equal-width density grid computed with one grouped scan."""
+        x, y = _quote(x_column), _quote(y_column)
+        x_low, x_high, y_low, y_high = self._query(
+            f"SELECT min({x})::DOUBLE, max({x})::DOUBLE, min({y})::DOUBLE, max({y})::DOUBLE "
+            f"FROM ({self.sql}) WHERE isfinite({x}) AND isfinite({y})"
+        ).fetchone()
+        if x_low is None:
+            return np.zeros((0, 0)), np.array([0.0, 1.0]), np.array([0.0, 1.0])
+        x_high = x_high if x_high > x_low else x_low + 1.0
+        y_high = y_high if y_high > y_low else y_low + 1.0
+        rows = self._query(
+            f"SELECT least(floor(({x} - {x_low}) / {(x_high - x_low) / bins})::BIGINT, {bins - 1}) AS xb, "
+            f"least(floor(({y} - {y_low}) / {(y_high - y_low) / bins})::BIGINT, {bins - 1}) AS yb, count(*) "
+            f"FROM ({self.sql}) WHERE isfinite({x}) AND isfinite({y}) GROUP BY xb, yb"
+        ).fetchall()
+        counts = np.zeros((bins, bins), dtype=np.int64)
+        for x_bin, y_bin, count in rows:
+            counts[int(x_bin), int(y_bin)] = count
+        return counts, np.linspace(x_low, x_high, bins + 1), np.linspace(y_low, y_high, bins + 1)
+
+    def sample(self, x_column, y_column, size):
+        """Reservoir sample of two columns."""
+        x, y = _quote(x_column), _quote(y_column)
+        arrays = self._query(
+            f"SELECT {x}::DOUBLE AS x, {y}::DOUBLE AS y FROM ({self.sql}) "
+            f"WHERE isfinite({x}) AND isfinite({y}) USING SAMPLE reservoir({int(size)} ROWS)"
+        ).fetchnumpy()
+        return np.asarray(arrays['x'], dtype=np.float64), np.asarray(arrays['y'], dtype=np.float64)
+
+    # Exporter hook
+
+    def write_export(self, stream, output_format, compression="None", chunk_rows=None):
+        """
+        Stream the frame to a binary file object without materializing it.
+
+        CSV and Parquet use DuckDB's COPY into a temporary file; Feather is
+        written one Arrow record batch at a time; Excel is only allowed when
+        the rows fit in a worksheet.
+        """
+        from utils import exporter
+
+        ordered = f"SELECT {self._select_list()} FROM ({self.sql})"
+        if self.has_row_id:
+            ordered += f" ORDER BY {ROW_ID}"
+
+        if output_format in ("CSV", "Parquet"):
+            options = ["FORMAT csv, HEADER true"] if output_format == "CSV" else ["FORMAT parquet, COMPRESSION zstd"]
+            if output_format == "CSV" and compression in ("gzip", "zstd"):
+                options.append(f"COMPRESSION {compression}")
+            with tempfile.TemporaryDirectory(dir=settings.CACHE_DIR) as tmp_dir:
+                path = os.path.join(tmp_dir, "export")
+                self._query(f"COPY ({ordered}) TO {_literal(path)} ({', '.join(options)})")
+                with open(path, 'rb') as exported:
+                    shutil.copyfileobj(exported, stream, 1024 * 1024)
+        elif output_format == "Feather":
+            import pyarrow as pa
+
+            reader = self._query(ordered).to_arrow_reader(chunk_rows or settings.EXPORT_CHUNK_ROWS)
+            with pa.ipc.new_file(stream, reader.schema) as writer:
+                for batch in reader:
+                    writer.write_batch(batch)
+        elif output_format == "Excel":
+            if len(self) + 1 > exporter.EXCEL_MAX_ROWS:
+                raise ValueError(f"Excel supports at most {exporter.EXCEL_MAX_ROWS - 1:,} data rows")
+            exporter.write_excel(self.fetch(), stream, chunk_rows)
+        else:
+            raise ValueError(f"Unknown output format: {output_format}")
+
+    # Internals
+
+    def _restore_nullable_integers(self, df):
+        """Give nullable integer columns their pandas dtype; DuckDB returns them as int64 or float64."""
+        for col in self.nullable_integers:
+            if col in df.columns:
+                df[col] = df[col].astype(self.nullable_integers[col])
+        return df
+
+    def _derive(self, sql, schema):
+        return DuckDBFrame(self._connection, sql, schema, self.has_row_id, self.nullable_integers)
+
+    def _select_list(self):
+        return ", ".join(_quote(col) for col in self.columns) or "*"
+
+    def _with_row_id(self):
+        if self.has_row_id:
+            return self.sql
+        return f"SELECT row_number() OVER () - 1 AS {ROW_ID}, * FROM ({self.sql})"
+
+    def _query(self, query):
+        # Cursors give each caller (and worker thread) its own connection handle
+        with self._lock:
+            cursor = self._connection.cursor()
+        return cursor.execute(query)
+
+    def _scalar(self, query):
+        return self._query(query).fetchone()[0]
+
+
+def open_upload_out_of_core(file, content_hash):
+    """
+    Spill an uploaded file to local disk and open it out of core.
+
+    The spill file is named after the content hash, so re-uploads reuse it.
+
+    Args:
+        file: Uploaded file object
+        content_hash (str): Hash of the file contents
+
+    Returns:
+        DuckDBFrame: Frame reading from the spilled file
+    """
+    from utils.file_utils import sanitize_filename
+
+    upload_dir = os.path.join(settings.CACHE_DIR, "uploads")
+    os.makedirs(upload_dir, exist_ok=True)
+    path = os.path.join(upload_dir, f"{content_hash}_{sanitize_filename(file.name)}")
+    if not os.path.exists(path):
+        file.seek(0)
+        with open(path + ".partial", 'wb') as spill:
+            shutil.copyfileobj(file, spill, 1024 * 1024)
+        os.replace(path + ".partial", path)
+    return DuckDBFrame.from_path(path)
+
@@ -0,0 +1,473 @@
+"""
+Streamlit-free batch processing of files with a cleaning pipeline spec.
+
+A spec is a plain dict, loaded from JSON or YAML and also saved from the
+app as a recipe::
+
+    {
+        "load": {"sep": ";", "encoding": "cp1252"},
+        "dtypes": {"id": "int64", "region": "category"},
+        "steps": [{"op": "drop_duplicates"},
+                  {"op": "missing_values", "strategy": "Drop rows"}],
+        "columns": ["id", "amount"],
+        "output_format": "Parquet",
+        "compression": "None"
+    }
+
+"columns" may be null to keep every column. "load" holds reader options and
+"dtypes" parser dtype hints; both may be empty.
+
+Before a spec runs it is compiled into a read plan: only the kept columns
+and the columns the steps read are loaded (usecols), and the dtype hints of
+those columns are passed to CSV and Excel parsers.
+"""
+import glob
+import json
+import os
+import time
+import warnings
+from functools import partial
+
+import pandas as pd
+
+from utils.exporter import EXPORT_FORMATS, compression_suffix, write_export
+from utils.file_utils import unique_output_names
+from utils.frame_view import FrameView
+from utils.parallel import run_parallel
+from utils.imputation import MISSING_VALUE_STRATEGIES
+from utils.pipeline import STEP_FUNCTIONS, run_pipeline
+from utils.readers import detect_format, read_file
+
+DEFAULT_SPEC = {
+    'load': {},
+    'dtypes': {},
+    'steps': [],
+    'columns': None,
+    'output_format': 'CSV',
+    'compression': 'None',
+}
+
+# Reader options a spec may carry in "load", per format they apply to
+LOAD_OPTIONS = {
+    'csv': ('sep', 'encoding', 'header'),
+    'excel': ('header', 'sheet_name'),
+}
+
+# Formats whose parsers accept dtype hints
+DTYPE_HINT_FORMATS = ('csv', 'excel')
+
+
+def yaml_available():
+    """Return True if PyYAML is installed."""
+    try:
+        import yaml  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def parse_spec(text, spec_format="json"):
+    """
+    Parse and validate a pipeline spec.
+
+    Args:
+        text (str): Spec contents
+        spec_format (str): "json" or "yaml"
+
+    Returns:
+        dict: Validated spec
+
+    Raises:
+        ValueError: If the text is not a valid spec
+    """
+    if spec_format == "yaml":
+        import yaml
+        try:
+            spec = yaml.safe_load(text)
+        except yaml.YAMLError as error:
+            raise ValueError(f"Invalid YAML spec: {error}")
+    else:
+        try:
+            spec = json.loads(text)
+        except json.JSONDecodeError as error:
+            raise ValueError(f"Invalid JSON spec: {error}")
+    if spec is not None and not isinstance(spec, dict):
+        raise ValueError("A spec must be a mapping of settings")
+    return validate_spec(spec)
+
+
+def dump_spec(spec, spec_format="json"):
+    """
+    Serialize a pipeline spec.
+
+    Args:
+        spec (dict): Validated spec
+        spec_format (str): "json" or "yaml"
+
+    Returns:
+        str: Spec contents
+    """
+    if spec_format == "yaml":
+        import yaml
+        return yaml.safe_dump(spec, sort_keys=False, allow_unicode=True)
+    return json.dumps(spec, indent=2, default=str)
+
+
+def spec_format_for(path):
+    """Tell the spec format of a file from its extension."""
+    return "yaml" if str(path).lower().endswith(('.yaml', '.yml')) else "json"
+
+
+def load_spec(path):
+    """
+    Load a pipeline spec from a JSON or YAML file.
+
+    Args:
+        path (str): Path to the spec; .yaml and .yml files are read as YAML
+
+    Returns:
+        dict: Validated spec
+    """
+    with open(path, encoding='utf-8') as spec_file:
+        return parse_spec(spec_file.read(), spec_format_for(path))
+
+
+def validate_spec(spec):
+    """
+    Fill in defaults and check a pipeline spec.
+
+    Args:
+        spec (dict): Raw spec
+
+    Returns:
+        dict: Spec with every key present
+
+    Raises:
+        ValueError: If the spec names an unknown step, format or compression
+    """
+    validated = dict(DEFAULT_SPEC)
+    validated.update(spec or {})
+
+    for step in validated['steps']:
+        if step.get('op') not in STEP_FUNCTIONS:
+            raise ValueError(f"Unknown pipeline step: {step.get('op')}")
+    known = {name for names in LOAD_OPTIONS.values() for name in names}
+    unknown = [name for name in validated['load'] if name not in known]
+    if unknown:
+        raise ValueError(f"Unknown load options: {unknown}")
+    for col, dtype in validated['dtypes'].items():
+        try:
+            pd.api.types.pandas_dtype(dtype)
+        except TypeError:
+            raise ValueError(f"Unknown dtype for {col!r}: {dtype}")
+    if validated['output_format'] not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown output format: {validated['output_format']}")
+    if validated['compression'] not in ("None", "gzip", "zstd"):
+        raise ValueError(f"Unknown compression: {validated['compression']}")
+    return validated
+
+
+def dtype_hints(df):
+    """
+    Record parser dtype hints for a loaded frame.
+
+    Integers and floats are widened to 64 bits, since a parser silently wraps
+    values that overflow a narrow hint. Only text categories are kept as
+    categories; other dtypes are left to the parser's inference.
+
+    Args:
+        df (pd.DataFrame): Frame as loaded
+
+    Returns:
+        dict: Column name (as text) -> dtype name
+    """
+    hints = {}
+    for col, dtype in df.dtypes.items():
+        if pd.api.types.is_bool_dtype(dtype) and not isinstance(dtype, pd.api.extensions.ExtensionDtype):
+            hints[str(col)] = 'bool'
+        elif isinstance(dtype, pd.CategoricalDtype):
+            if pd.api.types.is_string_dtype(dtype.categories.dtype):
+                hints[str(col)] = 'category'
+        elif isinstance(dtype, pd.api.extensions.ExtensionDtype):
+            continue
+        elif pd.api.types.is_unsigned_integer_dtype(dtype):
+            hints[str(col)] = 'uint64' if dtype.itemsize == 8 else 'int64'
+        elif pd.api.types.is_integer_dtype(dtype):
+            hints[str(col)] = 'int64'
+        elif pd.api.types.is_float_dtype(dtype):
+            hints[str(col)] = 'float64'
+    return hints
+
+
+def step_columns(step):
+    """
+    List the columns a step reads besides the ones it rewrites.
+
+    Args:
+        step (dict): Pipeline step
+
+    Returns:
+        set: Column names, or None if the step depends on every column
+            (e.g. dropping rows with a null anywhere)
+    """
+    if step['op'] == 'drop_duplicates':
+        return set(step['subset']) if step.get('subset') else None
+    if step['op'] == 'missing_values':
+        return None if MISSING_VALUE_STRATEGIES.get(step['strategy'], {}).get('strategy') == 'drop' else set()
+
+    columns = set()
+    specs = list((step.get('columns') or {}).values())
+    # Every overridden column must exist for the imputation plan to resolve
+    columns.update((step.get('columns') or {}).keys())
+    if step.get('default'):
+        if step['default'].get('strategy') == 'drop':
+            return None
+        specs.append(step['default'])
+    for spec in specs:
+        columns.update(spec.get('group_by') or ())
+        if spec.get('order_by'):
+            columns.add(spec['order_by'])
+    return columns
+
+
+def compile_spec(spec):
+    """
+    Compile a validated spec into a read plan.
+
+    Args:
+        spec (dict): Validated spec
+
+    Returns:
+        dict: Plan with 'usecols' (columns to load, None for all), 'dtype'
+            (hints for the loaded columns), 'read_options', 'steps' and 'columns'
+    """
+    usecols = None
+    if spec['columns'] is not None:
+        needed = list(spec['columns'])
+        for step in spec['steps']:
+            columns = step_columns(step)
+            if columns is None:
+                needed = None
+                break
+            needed.extend(col for col in sorted(columns, key=str) if col not in needed)
+        usecols = needed
+
+    hints = spec['dtypes']
+    if usecols is not None:
+        hints = {str(col): hints[str(col)] for col in usecols if str(col) in hints}
+    return {
+        'usecols': usecols,
+        'dtype': hints,
+        'read_options': dict(spec['load']),
+        'steps': spec['steps'],
+        'columns': spec['columns'],
+    }
+
+
+def read_planned(source, plan, filename=None, **options):
+    """
+    Read a file with a compiled plan's projection, dtype hints and reader options.
+
+    Hints that the new file does not fit (e.g. a null in an integer column)
+    are dropped and the file is read again without them.
+
+    Args:
+        source: Uploaded file object or path
+        plan (dict): Result of compile_spec
+        filename (str): Name used for format detection
+        **options: Reader options used unless the plan sets them (e.g. sniffed CSV options)
+
+    Returns:
+        pd.DataFrame: Loaded frame with only the planned columns
+    """
+    filename = filename or getattr(source, 'name', source)
+    file_format, _ = detect_format(filename)
+    # A spec saved from a CSV file can run on Parquet files and vice versa
+    options = {
+        name: value for name, value in {**options, **plan['read_options']}.items()
+        if name in LOAD_OPTIONS.get(file_format, ())
+    }
+
+    # Hints are keyed by column name as text, which is how JSON stores them
+    dtype = plan['dtype'] if file_format in DTYPE_HINT_FORMATS else {}
+    if dtype and options.get('header', 0) is None:
+        dtype = {int(col) if col.isdigit() else col: value for col, value in dtype.items()}
+    if dtype:
+        try:
+            # A failed cast is retried below, so its warning is not the user's concern
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore', RuntimeWarning)
+                return read_file(source, filename, columns=plan['usecols'], dtype=dtype, **options)
+        except (ValueError, TypeError):
+            if hasattr(source, 'seek'):
+                source.seek(0)
+    return read_file(source, filename, columns=plan['usecols'], **options)
+
+
+def expand_inputs(patterns):
+    """
+    Expand files, directories and glob patterns into supported input paths.
+
+    Args:
+        patterns (list): Paths, directories or glob patterns
+
+    Returns:
+        list: Sorted, de-duplicated paths of supported files
+    """
+    paths = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            candidates = [os.path.join(pattern, name) for name in os.listdir(pattern)]
+        else:
+            candidates = glob.glob(pattern, recursive=True) or [pattern]
+        paths.extend(
+            path for path in candidates
+            if os.path.isfile(path) and detect_format(path)[0] is not None
+        )
+    return sorted(set(paths))
+
+
+def output_path(path, output_dir, spec):
+    """
+    Build the output path for an input file.
+
+    Args:
+        path (str): Input path
+        output_dir (str): Output directory
+        spec (dict): Validated spec
+
+    Returns:
+        str: Path of the cleaned output file
+    """
+    return output_paths([path], output_dir, spec)[0]
+
+
+def output_paths(paths, output_dir, spec):
+    """
+    Build distinct output paths for a batch of input files.
+
+    Inputs from different directories keep their directory layout, relative
+    to the directory they share, under the output directory; inputs of one
+    directory that share a base name are told apart by unique_output_names.
+
+    Args:
+        paths (list): Input paths
+        output_dir (str): Output directory
+        spec (dict): Validated spec
+
+    Returns:
+        list: Output path of each input, in input order
+
+    Raises:
+        ValueError: If two inputs would still be written to the same path
+    """
+    extension = EXPORT_FORMATS[spec['output_format']]['extension']
+    if spec['output_format'] == "CSV":
+        extension += compression_suffix(spec['compression'])
+    if not paths:
+        return []
+    directories = [os.path.dirname(os.path.abspath(path)) for path in paths]
+    root = os.path.commonpath(directories)
+
+    groups = {}
+    for index, directory in enumerate(directories):
+        groups.setdefault(directory, []).append(index)
+    destinations = [None] * len(paths)
+    for directory, indexes in groups.items():
+        names = unique_output_names([os.path.basename(paths[i]) for i in indexes], [extension] * len(indexes))
+        subdirectory = os.path.relpath(directory, root)
+        for index, name in zip(indexes, names):
+            destinations[index] = os.path.normpath(os.path.join(output_dir, subdirectory, name))
+
+    seen = {}
+    for path, destination in zip(paths, destinations):
+        key = os.path.normcase(destination)
+        if key in seen:
+            raise ValueError(f"{seen[key]} and {path} would both be written to {destination}")
+        seen[key] = path
+    return destinations
+
+
+def process_file(path, spec, output_dir, engine="pandas", destination=None):
+    """
+    Load, clean, project and export a single file.
+
+    Only the columns the spec keeps or its steps read are loaded. The
+    export is streamed to a temporary file next to the destination and
+    renamed into place once complete.
+
+    Args:
+        path (str): Input path
+        spec (dict): Validated spec
+        output_dir (str): Output directory
+        engine (str): "pandas" to load the file into memory, or "duckdb" to
+            process it out of core
+        destination (str): Output path, defaults to output_path() of the input
+
+    Returns:
+        dict: Summary with input/output paths, row counts and elapsed seconds
+    """
+    start = time.perf_counter()
+    if engine == "duckdb":
+        from utils.backends import DuckDBFrame
+        df = DuckDBFrame.from_path(path)
+    else:
+        df = read_planned(path, compile_spec(spec))
+    cleaned, _ = run_pipeline(df, spec['steps'])
+    result = FrameView(cleaned, spec['columns']).materialize()
+
+    if destination is None:
+        destination = output_path(path, output_dir, spec)
+    os.makedirs(os.path.dirname(destination) or ".", exist_ok=True)
+    partial_path = destination + ".partial"
+    try:
+        with open(partial_path, 'wb') as stream:
+            write_export(result, stream, spec['output_format'], spec['compression'])
+        os.replace(partial_path, destination)
+    except BaseException:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+        raise
+
+    return {
+        'input': path,
+        'output': destination,
+        'rows_in': len(df),
+        'rows_out': len(result),
+        'columns': result.shape[1],
+        'seconds': time.perf_counter() - start,
+    }
+
+
+def _process_pair(pair, spec, output_dir, engine):
+    path, destination = pair
+    return process_file(path, spec, output_dir, engine, destination)
+
+
+def run_batch(paths, spec, output_dir, max_workers=None, use_processes=True, on_done=None, engine="pandas"):
+    """
+    Process many files in parallel.
+
+    Output paths are worked out for the whole batch before any file is
+    processed, so two inputs never write to the same output file.
+
+    Args:
+        paths (list): Input paths
+        spec (dict): Validated spec
+        output_dir (str): Output directory, created if missing
+        max_workers (int): Pool size, defaults to settings.WORKER_COUNT
+        use_processes (bool): Use a process pool to sidestep the GIL
+        on_done (callable): Progress callback, see run_parallel
+        engine (str): Execution engine passed to process_file
+
+    Returns:
+        list: (path, summary, error) tuples in input order
+
+    Raises:
+        ValueError: If two inputs would be written to the same output path
+    """
+    destinations = output_paths(paths, output_dir, spec)
+    os.makedirs(output_dir, exist_ok=True)
+    worker = partial(_process_pair, spec=spec, output_dir=output_dir, engine=engine)
+    outcomes = run_parallel(worker, list(zip(paths, destinations)), max_workers, on_done, use_processes)
+    return [(path, summary, error) for path, (summary, error) in zip(paths, outcomes)]
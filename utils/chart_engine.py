@@ -0,0 +1,249 @@
+"""
+Server-side reduction of large columns before they are handed to Plotly.
+
+Each helper turns a full column (or pair of columns) into a small summary:
+histogram bins, box plot statistics, decimated line points, or a 2D density
+grid / stratified sample for scatter plots. Columns of out-of-core frames
+delegate to the frame's own query-based implementation.
+"""
+import numpy as np
+import pandas as pd
+
+
+def _finite_values(series):
+    """Return the finite values of a numeric series as a float64 array."""
+    values = pd.to_numeric(series, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    return values[np.isfinite(values)]
+
+
+def histogram_bins(series, bins='auto', max_bins=200):
+    """
+    Compute histogram bins with numpy.
+
+    Args:
+        series (pd.Series): Numeric column
+        bins (int or str): Bin count or numpy binning strategy
+        max_bins (int): Upper bound on the number of bins
+
+    Returns:
+        tuple: (counts, edges) as numpy arrays
+    """
+    if getattr(series, 'out_of_core', False):
+        return series.frame.histogram_bins(series.name, bins if isinstance(bins, int) else 50)
+
+    values = _finite_values(series)
+    if values.size == 0:
+        return np.array([], dtype=np.int64), np.array([0.0, 1.0])
+
+    if isinstance(bins, str):
+        edges = np.histogram_bin_edges(values, bins=bins)
+        if len(edges) - 1 > max_bins:
+            edges = np.histogram_bin_edges(values, bins=max_bins)
+    else:
+        edges = np.histogram_bin_edges(values, bins=min(bins, max_bins))
+
+    counts, edges = np.histogram(values, bins=edges)
+    return counts, edges
+
+
+def box_stats(series, max_outliers=1_000, seed=0):
+    """
+    Compute box plot statistics using Tukey fences.
+
+    Args:
+        series (pd.Series): Numeric column
+        max_outliers (int): Maximum number of outliers returned; extras are sampled
+        seed (int): Seed for the outlier sample
+
+    Returns:
+        dict: q1, median, q3, mean, lowerfence, upperfence, outliers and total outlier count
+    """
+    if getattr(series, 'out_of_core', False):
+        return series.frame.box_stats(series.name, max_outliers)
+
+    values = _finite_values(series)
+    if values.size == 0:
+        return None
+
+    q1, median, q3 = np.percentile(values, [25, 50, 75])
+    iqr = q3 - q1
+    low_limit, high_limit = q1 - 1.5 * iqr, q3 + 1.5 * iqr
+    inside = values[(values >= low_limit) & (values <= high_limit)]
+    outliers = values[(values < low_limit) | (values > high_limit)]
+    outlier_count = int(outliers.size)
+    if outlier_count > max_outliers:
+        outliers = np.random.default_rng(seed).choice(outliers, max_outliers, replace=False)
+
+    return {
+        'q1': float(q1),
+        'median': float(median),
+        'q3': float(q3),
+        'mean': float(values.mean()),
+        'lowerfence': float(inside.min()) if inside.size else float(q1),
+        'upperfence': float(inside.max()) if inside.size else float(q3),
+        'outliers': outliers,
+        'outlier_count': outlier_count,
+    }
+
+
+def lttb(x, y, threshold):
+    """
+    Downsample a line with the Largest-Triangle-Three-Buckets algorithm.
+
+    Args:
+        x (np.ndarray): Monotonic x values
+        y (np.ndarray): y values
+        threshold (int): Number of points to keep
+
+    Returns:
+        tuple: (x, y) arrays with at most `threshold` points
+    """
+    length = len(x)
+    if threshold >= length or threshold < 3:
+        return x, y
+
+    bucket_size = (length - 2) / (threshold - 2)
+    keep = np.empty(threshold, dtype=np.int64)
+    keep[0], keep[-1] = 0, length - 1
+
+    previous = 0
+    for bucket in range(threshold - 2):
+        start = int(bucket * bucket_size) + 1
+        end = int((bucket + 1) * bucket_size) + 1
+        next_start = end
+        next_end = min(int((bucket + 2) * bucket_size) + 1, length)
+
+        # Average of the following bucket forms the third triangle vertex
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        areas = np.abs(
+            (x[previous] - avg_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (avg_y - y[previous])
+        )
+        previous = start + int(areas.argmax())
+        keep[bucket + 1] = previous
+
+    return x[keep], y[keep]
+
+
+def minmax_decimate(x, y, threshold):
+    """
+    Downsample a line by keeping the minimum and maximum of each bucket.
+
+    Args:
+        x (np.ndarray): Monotonic x values
+        y (np.ndarray): y values
+        threshold (int): Approximate number of points to keep
+
+    Returns:
+        tuple: (x, y) arrays with at most `threshold` points
+    """
+    length = len(x)
+    buckets = (threshold - 1) // 2
+    if buckets < 1 or length <= threshold:
+        return x, y
+
+    usable = length - length % buckets
+    shaped = y[:usable].reshape(buckets, -1)
+    offsets = np.arange(buckets) * shaped.shape[1]
+    keep = np.concatenate([offsets + shaped.argmin(axis=1), offsets + shaped.argmax(axis=1)])
+    keep = np.unique(np.append(keep, length - 1))
+    return x[keep], y[keep]
+
+
+def line_points(series, threshold, method='lttb'):
+    """
+    Reduce a column to the points of a line chart.
+
+    Args:
+        series (pd.Series): Numeric column; the index provides x values when numeric
+        threshold (int): Maximum number of points
+        method (str): 'lttb' or 'minmax'
+
+    Returns:
+        tuple: (x, y) arrays
+    """
+    if getattr(series, 'out_of_core', False):
+        # Out-of-core frames always use min/max buckets, computed in one grouped scan
+        return series.frame.line_points(series.name, threshold)
+
+    y = pd.to_numeric(series, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    if pd.api.types.is_numeric_dtype(series.index.dtype):
+        x = series.index.to_numpy(dtype=np.float64)
+    else:
+        x = np.arange(len(series), dtype=np.float64)
+
+    mask = np.isfinite(y)
+    x, y = x[mask], y[mask]
+    if method == 'minmax':
+        return minmax_decimate(x, y, threshold)
+    return lttb(x, y, threshold)
+
+
+def scatter_density(x_series, y_series, bins=100):
+    """
+    Bin two columns into a 2D density grid.
+
+    Args:
+        x_series (pd.Series): Numeric x column
+        y_series (pd.Series): Numeric y column
+        bins (int): Number of bins per axis
+
+    Returns:
+        tuple: (counts, x_edges, y_edges); counts is indexed [x_bin, y_bin]
+    """
+    if getattr(x_series, 'out_of_core', False):
+        return x_series.frame.scatter_density(x_series.name, y_series.name, bins)
+
+    x = pd.to_numeric(x_series, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    y = pd.to_numeric(y_series, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    mask = np.isfinite(x) & np.isfinite(y)
+    if not mask.any():
+        return np.zeros((0, 0)), np.array([0.0, 1.0]), np.array([0.0, 1.0])
+    x, y = x[mask], y[mask]
+
+    # Equal-width binning via a single bincount, much cheaper than np.histogram2d
+    x_edges = np.linspace(x.min(), x.max() if x.max() > x.min() else x.min() + 1, bins + 1)
+    y_edges = np.linspace(y.min(), y.max() if y.max() > y.min() else y.min() + 1, bins + 1)
+    x_bin = np.minimum(((x - x_edges[0]) * (bins / (x_edges[-1] - x_edges[0]))).astype(np.int64), bins - 1)
+    y_bin = np.minimum(((y - y_edges[0]) * (bins / (y_edges[-1] - y_edges[0]))).astype(np.int64), bins - 1)
+    counts = np.bincount(x_bin * bins + y_bin, minlength=bins * bins).reshape(bins, bins)
+    return counts, x_edges, y_edges
+
+
+def stratified_sample(x_series, y_series, size, strata=20, seed=0):
+    """
+    Sample points evenly across x-value strata so sparse regions stay visible.
+
+    Args:
+        x_series (pd.Series): Numeric x column
+        y_series (pd.Series): Numeric y column
+        size (int): Target number of points
+        strata (int): Number of equal-width x strata
+        seed (int): Random seed
+
+    Returns:
+        tuple: (x, y) arrays with approximately `size` points or fewer
+    """
+    if getattr(x_series, 'out_of_core', False):
+        return x_series.frame.sample(x_series.name, y_series.name, size)
+
+    x = pd.to_numeric(x_series, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    y = pd.to_numeric(y_series, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    mask = np.isfinite(x) & np.isfinite(y)
+    x, y = x[mask], y[mask]
+    if x.size <= size:
+        return x, y
+
+    edges = np.histogram_bin_edges(x, bins=strata)
+    stratum = np.clip(np.searchsorted(edges, x, side='right') - 1, 0, strata - 1)
+    counts = np.bincount(stratum, minlength=strata)
+
+    # Give every non-empty stratum an equal share, capped by its size, and
+    # keep each point with its stratum's share probability in one vectorized pass
+    quota = np.minimum(counts, max(size // max(np.count_nonzero(counts), 1), 1))
+    keep_probability = np.divide(quota, counts, out=np.zeros(strata), where=counts > 0)
+    rng = np.random.default_rng(seed)
+    chosen = rng.random(x.size) < keep_probability[stratum]
+    return x[chosen], y[chosen]
@@ -0,0 +1,402 @@
+"""
+Concatenation and key joins of several dataframes.
+
+Join keys of both sides are first encoded into one shared set of integer
+codes (categorical key encoding), so matching compares small integers
+instead of strings or tuples of columns. On top of the codes:
+
+- hash: pandas merge, used for outer joins and unsorted numeric keys
+- categorical: right rows are grouped by code once with a counting sort
+  and each left row finds its run of matches by direct lookup
+- sort_merge: when both keys are already sorted, a linear merge join over
+  the two key columns, without hashing or sorting either side
+- chunked: like categorical, but the left side is joined in chunks and the
+  result is assembled column by column, so indexers stay chunk-sized for
+  large right-hand sides
+
+estimate_join predicts the exact output row count and the approximate
+memory of a join from the key codes before anything is materialized.
+"""
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from utils import settings
+from utils.dtypes import memory_bytes
+
+JOIN_TYPES = ('inner', 'left', 'right', 'outer')
+
+JOIN_STRATEGIES = ('auto', 'hash', 'categorical', 'sort_merge', 'chunked')
+
+# Bytes of the two int64 row indexers held per output row
+INDEXER_BYTES_PER_ROW = 16
+
+
+def schema_groups(dataframes):
+    """
+    Group dataframes whose column sets match, so they can be concatenated.
+
+    Args:
+        dataframes (dict): Name -> dataframe
+
+    Returns:
+        list: Lists of names, largest group first
+    """
+    groups = {}
+    for name, df in dataframes.items():
+        groups.setdefault(frozenset(df.columns), []).append(name)
+    return sorted(groups.values(), key=len, reverse=True)
+
+
+def estimate_concat(frames):
+    """
+    Estimate the result of concatenating frames.
+
+    Args:
+        frames (dict): Name -> dataframe
+
+    Returns:
+        dict: 'rows' and 'memory_bytes' of the result
+    """
+    return {
+        'rows': sum(len(df) for df in frames.values()),
+        'memory_bytes': sum(memory_bytes(df) for df in frames.values()),
+    }
+
+
+def concat_frames(frames, source_column=None):
+    """
+    Stack frames with the same columns, in the column order of the first one.
+
+    Categorical columns with different categories are given the union of
+    their categories first, so they stay categorical instead of falling back
+    to object dtype.
+
+    Args:
+        frames (dict): Name -> dataframe, in output order
+        source_column (str): Optional name of a categorical column recording each row's source
+
+    Returns:
+        pd.DataFrame: Concatenated frame with a fresh RangeIndex
+
+    Raises:
+        ValueError: If the frames do not share the same columns
+    """
+    names = list(frames)
+    columns = list(frames[names[0]].columns)
+    for name in names[1:]:
+        if set(frames[name].columns) != set(columns):
+            raise ValueError(f"{name} does not have the same columns as {names[0]}")
+
+    parts = [frames[name][columns] for name in names]
+    for col in columns:
+        dtypes = [part[col].dtype for part in parts]
+        if all(isinstance(dtype, pd.CategoricalDtype) for dtype in dtypes) and len(set(dtypes)) > 1:
+            categories = union_categoricals([part[col] for part in parts], ignore_order=True).categories
+            parts = [part.assign(**{col: part[col].cat.set_categories(categories)}) for part in parts]
+
+    result = pd.concat(parts, ignore_index=True)
+    if source_column:
+        lengths = [len(part) for part in parts]
+        result[source_column] = pd.Categorical.from_codes(np.repeat(np.arange(len(names)), lengths), categories=names)
+    return result
+
+
+def key_codes(left, right, on):
+    """
+    Encode the join keys of both sides into shared integer codes.
+
+    Equal keys get equal codes on both sides and missing keys match each
+    other, as in pandas merge.
+
+    Args:
+        left (pd.DataFrame): Left frame
+        right (pd.DataFrame): Right frame
+        on (list): Key columns present in both frames
+
+    Returns:
+        tuple: (left codes, right codes, number of distinct keys)
+    """
+    codes = None
+    cardinality = 0
+    for col in on:
+        values = pd.concat([left[col], right[col]], ignore_index=True)
+        col_codes, uniques = pd.factorize(values, use_na_sentinel=False)
+        if codes is None:
+            codes = col_codes.astype(np.int64)
+        else:
+            # Combine with the previous columns and re-number to keep codes small
+            codes, _ = pd.factorize(codes * len(uniques) + col_codes)
+            codes = codes.astype(np.int64)
+        cardinality = int(codes.max()) + 1 if len(codes) else 0
+    return codes[:len(left)], codes[len(left):], cardinality
+
+
+def estimate_join(left, right, on, how='inner', strategy='auto'):
+    """
+    Predict the size of a join without running it.
+
+    Args:
+        left (pd.DataFrame): Left frame
+        right (pd.DataFrame): Right frame
+        on (list): Key columns
+        how (str): One of JOIN_TYPES
+        strategy (str): One of JOIN_STRATEGIES
+
+    Returns:
+        dict: 'rows' (exact), 'memory_bytes' and 'peak_bytes' (approximate),
+            'key_cardinality', 'left_matched' and 'right_matched' row counts,
+            and the 'strategy' that would run
+    """
+    left_codes, right_codes, cardinality = key_codes(left, right, on)
+    left_counts = np.bincount(left_codes, minlength=cardinality)
+    right_counts = np.bincount(right_codes, minlength=cardinality)
+    matches = int(np.dot(left_counts, right_counts))
+    left_only = int(left_counts[right_counts == 0].sum())
+    right_only = int(right_counts[left_counts == 0].sum())
+    rows = matches + {'inner': 0, 'left': left_only, 'right': right_only, 'outer': left_only + right_only}[how]
+
+    left_bytes = memory_bytes(left)
+    right_bytes = memory_bytes(right.drop(columns=on))
+    row_bytes = (left_bytes / len(left) if len(left) else 0) + (right_bytes / len(right) if len(right) else 0)
+    output_bytes = int(rows * row_bytes)
+
+    strategy = choose_strategy(left, right, on, how) if strategy == 'auto' else strategy
+    if strategy == 'chunked':
+        indexer_bytes = min(rows, settings.JOIN_CHUNK_ROWS) * INDEXER_BYTES_PER_ROW
+    elif strategy == 'hash':
+        # pandas keeps its own key factorization and indexers next to the result
+        indexer_bytes = rows * INDEXER_BYTES_PER_ROW + (len(left) + len(right)) * INDEXER_BYTES_PER_ROW
+    else:
+        indexer_bytes = rows * INDEXER_BYTES_PER_ROW
+    return {
+        'rows': rows,
+        'memory_bytes': output_bytes,
+        'peak_bytes': left_bytes + memory_bytes(right) + output_bytes + indexer_bytes,
+        'key_cardinality': cardinality,
+        'left_matched': len(left) - left_only,
+        'right_matched': len(right) - right_only,
+        'strategy': strategy,
+    }
+
+
+def _comparable_key(frame, on):
+    """Tell whether a frame has a single numeric or datetime key with a numpy dtype."""
+    if len(on) != 1:
+        return False
+    dtype = frame[on[0]].dtype
+    if isinstance(dtype, pd.api.extensions.ExtensionDtype):
+        return False
+    return (
+        (pd.api.types.is_numeric_dtype(dtype) or pd.api.types.is_datetime64_any_dtype(dtype))
+        and not pd.api.types.is_bool_dtype(dtype)
+    )
+
+
+def _sorted_key(frame, on):
+    """Tell whether a frame has a single, null-free, ascending numeric or datetime key."""
+    if not _comparable_key(frame, on):
+        return False
+    key = frame[on[0]]
+    return not key.hasnans and key.is_monotonic_increasing
+
+
+def choose_strategy(left, right, on, how='inner'):
+    """
+    Pick a join strategy from the join type, key layout and input sizes.
+
+    Args:
+        left (pd.DataFrame): Left frame
+        right (pd.DataFrame): Right frame
+        on (list): Key columns
+        how (str): One of JOIN_TYPES
+
+    Returns:
+        str: Strategy name from JOIN_STRATEGIES
+    """
+    if how == 'outer':
+        return 'hash'
+    if how in ('inner', 'left') and memory_bytes(right) >= settings.JOIN_CHUNK_MIN_BYTES:
+        return 'chunked'
+    if how in ('inner', 'left') and _sorted_key(right, on) and _sorted_key(left, on):
+        return 'sort_merge'
+    if _comparable_key(left, on) and _comparable_key(right, on):
+        # pandas hashes plain numeric keys directly, faster than encoding them first
+        return 'hash'
+    return 'categorical'
+
+
+def _match_indexers(starts, counts, right_order, how):
+    """
+    Expand per-left-row match runs into row indexers.
+
+    Args:
+        starts (np.ndarray): Start of each left row's run of matches in right_order
+        counts (np.ndarray): Length of each left row's run
+        right_order (np.ndarray): Right row position of each run entry, or None if
+            runs already point at right rows
+        how (str): "inner" or "left"
+
+    Returns:
+        tuple: (left row positions, right row positions with -1 for no match)
+    """
+    out_counts = np.maximum(counts, 1) if how == 'left' else counts
+    total = int(out_counts.sum())
+
+    left_index = np.repeat(np.arange(len(starts)), out_counts)
+    # Offset of every output row within its left row's run of matches
+    run_starts = np.cumsum(out_counts) - out_counts
+    positions = np.repeat(starts - run_starts, out_counts) + np.arange(total)
+    if right_order is not None:
+        positions = right_order[np.minimum(positions, len(right_order) - 1)] if len(right_order) else positions
+    if how == 'left':
+        positions[np.repeat(counts == 0, out_counts)] = -1
+    return left_index, positions
+
+
+def _code_index(right_codes, cardinality):
+    """
+    Group right rows by key code with a counting sort.
+
+    Returns:
+        tuple: (run start per code, run length per code, right row positions ordered by code)
+    """
+    run_lengths = np.bincount(right_codes, minlength=cardinality)
+    run_starts = np.cumsum(run_lengths) - run_lengths
+    return run_starts, run_lengths, np.argsort(right_codes, kind='stable')
+
+
+def _code_indexers(left_codes, code_index, how):
+    """Row indexers for left key codes, looked up directly in a right-side code index."""
+    run_starts, run_lengths, right_order = code_index
+    return _match_indexers(run_starts[left_codes], run_lengths[left_codes], right_order, how)
+
+
+def _take(series, indexer, allow_fill):
+    """Gather rows of a column by position; -1 gives a missing value when allow_fill is set."""
+    if isinstance(series.dtype, pd.api.extensions.ExtensionDtype):
+        return series.array.take(indexer, allow_fill=allow_fill)
+    return pd.api.extensions.take(series.to_numpy(), indexer, allow_fill=allow_fill)
+
+
+def _join_columns(left, right, on, left_index, right_index, suffixes):
+    """Gather the columns of a join result from row indexers, in pandas' column order and naming."""
+    right_columns = [col for col in right.columns if col not in on]
+    overlap = set(left.columns) & set(right_columns)
+    data = {}
+    for col in left.columns:
+        data[f"{col}{suffixes[0]}" if col in overlap else col] = _take(left[col], left_index, False)
+    for col in right_columns:
+        data[f"{col}{suffixes[1]}" if col in overlap else col] = _take(right[col], right_index, True)
+    return data
+
+
+def _chunk_columns(left, right, on, how, chunk_rows, suffixes):
+    """Yield the result columns of consecutive chunks of left rows."""
+    left_codes, right_codes, cardinality = key_codes(left, right, on)
+    code_index = _code_index(right_codes, cardinality)
+    for start in range(0, max(len(left), 1), chunk_rows):
+        left_index, right_index = _code_indexers(left_codes[start:start + chunk_rows], code_index, how)
+        yield _join_columns(left.iloc[start:start + chunk_rows], right, on, left_index, right_index, suffixes)
+
+
+def iter_join_chunks(left, right, on, how='inner', chunk_rows=None, suffixes=('_x', '_y')):
+    """
+    Join in chunks of left rows against a right-side index built once.
+
+    Args:
+        left (pd.DataFrame): Left frame
+        right (pd.DataFrame): Right frame
+        on (list): Key columns
+        how (str): "inner" or "left"
+        chunk_rows (int): Left rows per chunk, defaults to settings.JOIN_CHUNK_ROWS
+        suffixes (tuple): Suffixes for overlapping non-key columns
+
+    Yields:
+        pd.DataFrame: Consecutive chunks of the result, in left row order
+    """
+    for data in _chunk_columns(left, right, on, how, chunk_rows or settings.JOIN_CHUNK_ROWS, suffixes):
+        yield pd.DataFrame(data, copy=False)
+
+
+def _concat_arrays(arrays):
+    """Concatenate the pieces of one column; mixed int/float pieces become float like in pandas."""
+    if len(arrays) == 1:
+        return arrays[0]
+    return pd.concat([pd.Series(values, copy=False) for values in arrays], ignore_index=True)
+
+
+def join_frames(left, right, on, how='inner', strategy='auto', suffixes=('_x', '_y'), chunk_rows=None):
+    """
+    Join two frames on key columns.
+
+    Every strategy returns the same rows as pandas merge with sort=False.
+    The codes-based strategies support inner and left joins (right joins by
+    swapping sides); outer joins always use pandas merge.
+
+    Args:
+        left (pd.DataFrame): Left frame
+        right (pd.DataFrame): Right frame
+        on (list): Key columns present in both frames
+        how (str): One of JOIN_TYPES
+        strategy (str): One of JOIN_STRATEGIES
+        suffixes (tuple): Suffixes for overlapping non-key columns
+        chunk_rows (int): Left rows per chunk for the chunked strategy
+
+    Returns:
+        tuple: (pd.DataFrame, str) with the result and the strategy that ran
+
+    Raises:
+        ValueError: If the join type, strategy or key columns are invalid
+    """
+    on = list(on)
+    if how not in JOIN_TYPES:
+        raise ValueError(f"Unknown join type: {how}")
+    if strategy not in JOIN_STRATEGIES:
+        raise ValueError(f"Unknown join strategy: {strategy}")
+    if not on:
+        raise ValueError("Choose at least one key column")
+    missing = [col for col in on if col not in left.columns or col not in right.columns]
+    if missing:
+        raise ValueError(f"Key columns missing from one side: {missing}")
+
+    if strategy == 'auto':
+        strategy = choose_strategy(left, right, on, how)
+    if how == 'outer' or (how == 'right' and strategy in ('sort_merge', 'chunked')):
+        strategy = 'hash'
+
+    if strategy == 'hash':
+        return pd.merge(left, right, on=on, how=how, sort=False, suffixes=suffixes), strategy
+
+    if how == 'right':
+        # A right join is a left join from the other side, with the columns put back in order
+        swapped = join_frames(right, left, on, 'left', strategy, suffixes[::-1], chunk_rows)[0]
+        right_columns = [col for col in swapped.columns if col not in _left_output_columns(left, right, on, suffixes)]
+        return swapped[_left_output_columns(left, right, on, suffixes) + right_columns], strategy
+
+    if strategy == 'chunked':
+        # Chunk results are kept per column and stitched together one column at a time
+        parts = {}
+        for data in _chunk_columns(left, right, on, how, chunk_rows or settings.JOIN_CHUNK_ROWS, suffixes):
+            for col, values in data.items():
+                parts.setdefault(col, []).append(values)
+        return pd.DataFrame({col: _concat_arrays(parts.pop(col)) for col in list(parts)}, copy=False), strategy
+
+    if strategy == 'sort_merge' and _sorted_key(right, on) and _sorted_key(left, on):
+        # Index.join on two ascending indexes runs pandas' linear merge-join kernel
+        _, left_index, right_index = pd.Index(left[on[0]].to_numpy(), copy=False).join(
+            pd.Index(right[on[0]].to_numpy(), copy=False), how=how, return_indexers=True
+        )
+        left_index = np.arange(len(left)) if left_index is None else left_index
+        right_index = np.arange(len(right)) if right_index is None else right_index
+        return pd.DataFrame(_join_columns(left, right, on, left_index, right_index, suffixes), copy=False), strategy
+
+    left_codes, right_codes, cardinality = key_codes(left, right, on)
+    left_index, right_index = _code_indexers(left_codes, _code_index(right_codes, cardinality), how)
+    return pd.DataFrame(_join_columns(left, right, on, left_index, right_index, suffixes), copy=False), 'categorical'
+
+
+def _left_output_columns(left, right, on, suffixes):
+    """Names the left frame's columns get in a join result."""
+    right_columns = set(right.columns) - set(on)
+    return [f"{col}{suffixes[0]}" if col in right_columns else col for col in left.columns]
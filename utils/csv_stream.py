@@ -0,0 +1,100 @@
+"""
+Chunked CSV ingestion with progress reporting and a memory ceiling.
+"""
+import time
+
+import pandas as pd
+
+from utils import settings
+from utils.dtypes import downcast_numeric
+
+
+class MemoryCeilingExceeded(Exception):
+    """Raised when a streamed file grows past the configured memory ceiling."""
+
+
+def iter_csv_chunks(file, chunksize=None, **read_options):
+    """
+    Yield a CSV upload as a sequence of dataframes.
+
+    Args:
+        file: Uploaded file object or path positioned at the start of the data
+        chunksize (int): Rows per chunk, defaults to settings.CSV_CHUNK_ROWS
+        **read_options: Extra keyword arguments forwarded to pd.read_csv
+
+    Yields:
+        pd.DataFrame: Consecutive chunks of rows
+    """
+    with pd.read_csv(file, chunksize=chunksize or settings.CSV_CHUNK_ROWS, **read_options) as reader:
+        yield from reader
+
+
+def read_csv_streaming(file, chunksize=None, memory_ceiling=None, on_progress=None, **read_options):
+    """
+    Read a CSV upload in chunks, downcasting each chunk before it is kept.
+
+    The chunks are joined with one pd.concat, which copies them while they are
+    still held, so the load peaks at twice the size of the kept chunks. That
+    peak is what the memory ceiling is checked against.
+
+    Args:
+        file: Uploaded file object positioned at the start of the data
+        chunksize (int): Rows per chunk, defaults to settings.CSV_CHUNK_ROWS
+        memory_ceiling (int): Maximum peak in-memory bytes, defaults to settings.MEMORY_CEILING_BYTES
+        on_progress (callable): Called as on_progress(bytes_read, total_bytes, rows_read)
+        **read_options: Extra keyword arguments forwarded to pd.read_csv
+
+    Returns:
+        tuple: (pd.DataFrame, dict) with the loaded frame and load statistics
+
+    Raises:
+        MemoryCeilingExceeded: If the chunks and their concatenated copy would exceed the memory ceiling
+    """
+    memory_ceiling = memory_ceiling or settings.MEMORY_CEILING_BYTES
+    total_bytes = getattr(file, 'size', None) or 0
+
+    start = time.perf_counter()
+    chunks = []
+    rows_read = 0
+    memory_used = 0
+
+    for chunk in iter_csv_chunks(file, chunksize, **read_options):
+        chunk = downcast_numeric(chunk)
+        memory_used += int(chunk.memory_usage(deep=True).sum())
+        if 2 * memory_used > memory_ceiling:
+            raise MemoryCeilingExceeded(
+                f"Loading the file needs more than {memory_ceiling / 1024 ** 2:,.0f} MB in memory "
+                f"(stopped after {rows_read + len(chunk):,} rows)"
+            )
+
+        chunks.append(chunk)
+        rows_read += len(chunk)
+        if on_progress is not None:
+            on_progress(_tell(file, total_bytes), total_bytes, rows_read)
+
+    if chunks:
+        df = pd.concat(chunks, ignore_index=True)
+    else:
+        # Header-only file: let pandas build the empty frame with its columns
+        file.seek(0)
+        df = pd.read_csv(file, **read_options)
+
+    elapsed = time.perf_counter() - start
+    stats = {
+        'bytes_processed': total_bytes,
+        'rows': rows_read,
+        'seconds': elapsed,
+        'rows_per_second': rows_read / elapsed if elapsed > 0 else float(rows_read),
+        'memory_bytes': memory_used,
+        'peak_bytes': 2 * memory_used,
+    }
+    return df, stats
+
+
+def _tell(file, total_bytes):
+    """Return the current read position, clamped to the file size."""
+    try:
+        position = file.tell()
+    except (AttributeError, OSError):
+        return total_bytes
+    return min(position, total_bytes) if total_bytes else position
@@ -0,0 +1,173 @@
+"""
+Hash-based duplicate detection for wide and large frames.
+
+Rows are reduced to 64-bit hashes with pd.util.hash_pandas_object, so the
+duplicate search works on one integer column instead of comparing every
+value. Rows that share a hash are then verified against their actual values,
+which makes the result exact even if two different rows collide.
+SortedHashSet keeps seen hashes compactly for checks that stream over chunks.
+"""
+import numpy as np
+import pandas as pd
+
+KEEP_OPTIONS = ('first', 'last', 'none')
+DEDUP_METHODS = ('auto', 'hash', 'exact')
+
+# Below this many key columns pandas' own factorization is faster than hashing
+HASH_MIN_COLUMNS = 3
+
+
+def row_hashes(df, subset=None):
+    """
+    Hash each row of a dataframe (or of a subset of its columns).
+
+    Args:
+        df (pd.DataFrame): Dataframe to hash
+        subset (list): Key columns, defaults to all columns
+
+    Returns:
+        np.ndarray: One uint64 hash per row
+    """
+    frame = df[list(subset)] if subset else df
+    return pd.util.hash_pandas_object(frame, index=False).to_numpy()
+
+
+def _pandas_keep(keep):
+    """Translate a KEEP_OPTIONS value into pandas' keep argument."""
+    if keep not in KEEP_OPTIONS:
+        raise ValueError(f"keep must be one of {KEEP_OPTIONS}, got {keep!r}")
+    return False if keep == 'none' else keep
+
+
+def duplicate_mask(df, subset=None, keep='first', verify=True):
+    """
+    Flag the rows that deduplication would remove.
+
+    Args:
+        df (pd.DataFrame): Dataframe to check
+        subset (list): Key columns, defaults to all columns
+        keep (str): 'first', 'last' or 'none' (drop every duplicated row)
+        verify (bool): Confirm hash matches against the real values
+
+    Returns:
+        np.ndarray: Boolean mask, True for rows to drop
+    """
+    pandas_keep = _pandas_keep(keep)
+    codes, uniques = pd.factorize(row_hashes(df, subset))
+    positions = np.arange(len(codes))
+
+    # Position of the first and last row carrying each hash
+    first = np.empty(len(uniques), dtype=np.intp)
+    first[codes[::-1]] = positions[::-1]
+    last = np.empty(len(uniques), dtype=np.intp)
+    last[codes] = positions
+
+    if keep == 'first':
+        mask = positions != first[codes]
+    elif keep == 'last':
+        mask = positions != last[codes]
+    else:
+        mask = np.bincount(codes)[codes] > 1
+
+    if verify:
+        candidates = np.flatnonzero(first[codes] != last[codes])
+        if len(candidates) and _has_collision(df, subset, candidates, first[codes[candidates]]):
+            # Fall back to comparing real values for every row that shares a hash
+            frame = df.iloc[candidates]
+            mask[candidates] = frame.duplicated(subset=list(subset) if subset else None, keep=pandas_keep).to_numpy()
+    return mask
+
+
+def _has_collision(df, subset, candidates, reference):
+    """
+    Check whether rows sharing a hash differ in any key column.
+
+    Each candidate row is compared with the first row carrying the same hash,
+    one column at a time.
+
+    Args:
+        df (pd.DataFrame): Dataframe being deduplicated
+        subset (list): Key columns, defaults to all columns
+        candidates (np.ndarray): Positions of rows whose hash occurs more than once
+        reference (np.ndarray): Position of the first row with the same hash
+
+    Returns:
+        bool: True if at least two different rows share a hash
+    """
+    for name in (subset or df.columns):
+        values = df[name].array
+        left, right = values.take(candidates), values.take(reference)
+        same = pd.Series(left == right).fillna(False).to_numpy(dtype=bool)
+        if not same.all():
+            nulls = pd.isna(left)
+            if not (same | (nulls & pd.isna(right))).all():
+                return True
+    return False
+
+
+class SortedHashSet:
+    """
+    Compact set of uint64 hashes kept as a sorted numpy array.
+    """
+
+    def __init__(self):
+        self.values = np.array([], dtype=np.uint64)
+
+    def __len__(self):
+        return len(self.values)
+
+    def contains(self, hashes):
+        """
+        Test membership of many hashes at once.
+
+        Args:
+            hashes (np.ndarray): Hashes to look up
+
+        Returns:
+            np.ndarray: Boolean array, True where the hash was already seen
+        """
+        if not len(self.values):
+            return np.zeros(len(hashes), dtype=bool)
+        positions = np.searchsorted(self.values, hashes)
+        found = np.zeros(len(hashes), dtype=bool)
+        in_range = positions < len(self.values)
+        found[in_range] = self.values[positions[in_range]] == hashes[in_range]
+        return found
+
+    def add(self, hashes):
+        """
+        Insert hashes not already present.
+
+        Args:
+            hashes (np.ndarray): Hashes to insert
+        """
+        # Sort and drop adjacent repeats; much faster than np.unique on large uint64 arrays
+        new = np.sort(hashes)
+        if len(new):
+            new = new[np.concatenate(([True], new[1:] != new[:-1]))]
+        new = new[~self.contains(new)]
+        if len(new):
+            self.values = np.sort(np.concatenate((self.values, new)))
+
+
+def drop_duplicates(df, subset=None, keep='first', method='auto'):
+    """
+    Remove duplicate rows.
+
+    Args:
+        df (pd.DataFrame): Dataframe to deduplicate
+        subset (list): Key columns, defaults to all columns
+        keep (str): 'first', 'last' or 'none'
+        method (str): 'hash' (hashed and verified), 'exact' (pandas drop_duplicates)
+            or 'auto' (hash for HASH_MIN_COLUMNS or more key columns, exact otherwise)
+
+    Returns:
+        pd.DataFrame: Deduplicated dataframe
+    """
+    if method not in DEDUP_METHODS:
+        raise ValueError(f"method must be one of {DEDUP_METHODS}, got {method!r}")
+    if method == 'auto':
+        method = 'hash' if len(subset or df.columns) >= HASH_MIN_COLUMNS else 'exact'
+    if method == 'exact':
+        return df.drop_duplicates(subset=list(subset) if subset else None, keep=_pandas_keep(keep))
+    return df[~duplicate_mask(df, subset, keep)]
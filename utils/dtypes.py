@@ -0,0 +1,102 @@
+"""
+Dtype helpers for keeping loaded dataframes compact in memory.
+"""
+import numpy as np
+import pandas as pd
+
+
+def downcast_numeric(df):
+    """
+    Downcast numeric columns to the smallest dtype that holds their values exactly.
+
+    Integers are narrowed to the smallest signed/unsigned width that fits, and
+    floats are narrowed to float32 only when every value survives the round trip.
+
+    Args:
+        df (pd.DataFrame): Dataframe to downcast in place
+
+    Returns:
+        pd.DataFrame: The same dataframe with narrowed numeric columns
+    """
+    for col in df.columns:
+        series = df[col]
+        dtype = series.dtype
+        if pd.api.types.is_bool_dtype(dtype) or not isinstance(dtype, np.dtype):
+            continue
+
+        if pd.api.types.is_integer_dtype(dtype):
+            if len(series) and series.min() >= 0:
+                df[col] = pd.to_numeric(series, downcast='unsigned')
+            else:
+                df[col] = pd.to_numeric(series, downcast='integer')
+
+        elif pd.api.types.is_float_dtype(dtype) and dtype.itemsize > 4:
+            values = series.to_numpy()
+            narrowed = values.astype(np.float32)
+            with np.errstate(over='ignore', invalid='ignore'):
+                exact = (narrowed.astype(values.dtype) == values) | np.isnan(values)
+            if exact.all():
+                df[col] = narrowed
+
+    return df
+
+
+def _arrow_strings_available():
+    """Return True if pandas can back string columns with pyarrow."""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def optimize_dtypes(df, category_ratio=0.5):
+    """
+    Shrink a dataframe's memory footprint without changing its values.
+
+    Low-cardinality text columns become categoricals, remaining text columns
+    use Arrow-backed strings when pyarrow is installed, and numeric columns are
+    downcast to the narrowest exact dtype.
+
+    Args:
+        df (pd.DataFrame): Dataframe to optimize
+        category_ratio (float): Maximum distinct/non-null ratio for a text column
+            to be converted to category
+
+    Returns:
+        pd.DataFrame: Optimized copy of the dataframe
+    """
+    optimized = df.copy(deep=False)
+    arrow_strings = _arrow_strings_available()
+
+    for col in optimized.columns:
+        series = optimized[col]
+        if not (pd.api.types.is_object_dtype(series.dtype) or pd.api.types.is_string_dtype(series.dtype)):
+            continue
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            continue
+
+        non_null = series.count()
+        if non_null == 0:
+            continue
+
+        if series.nunique(dropna=True) / non_null <= category_ratio:
+            optimized[col] = series.astype('category')
+        elif (arrow_strings and pd.api.types.is_object_dtype(series.dtype)
+              and pd.api.types.infer_dtype(series, skipna=True) == 'string'):
+            optimized[col] = series.astype('string[pyarrow]')
+
+    return downcast_numeric(optimized)
+
+
+def memory_bytes(df):
+    """
+    Measure the deep memory usage of a dataframe.
+
+    Args:
+        df (pd.DataFrame): Dataframe to measure
+
+    Returns:
+        int: Bytes used by the dataframe, including object contents
+    """
+    return int(df.memory_usage(deep=True).sum())
@@ -0,0 +1,126 @@
+"""
+Excel ingestion: sheet listing, engine selection and partial reads.
+
+Sheet names are read from the workbook index without parsing any cells.
+Reads use the Rust-based calamine engine when python-calamine is installed,
+and otherwise openpyxl in read-only streaming mode (xlrd for legacy .xls).
+Column and row limits are passed to the engine so previews and column
+subsets never parse the whole sheet.
+"""
+import pandas as pd
+
+
+def calamine_available():
+    """Return True if the python-calamine engine is installed."""
+    try:
+        import python_calamine  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _is_legacy(source):
+    """Tell whether a source is a legacy .xls workbook."""
+    name = source if isinstance(source, str) else getattr(source, 'name', '')
+    return str(name).lower().endswith('.xls')
+
+
+def excel_engine(source):
+    """
+    Choose the pandas engine for a workbook.
+
+    Args:
+        source: Uploaded file object or path
+
+    Returns:
+        str: "calamine", "openpyxl" or "xlrd"
+    """
+    if calamine_available():
+        return "calamine"
+    return "xlrd" if _is_legacy(source) else "openpyxl"
+
+
+def _rewind(source):
+    if hasattr(source, 'seek'):
+        source.seek(0)
+
+
+def list_sheets(source):
+    """
+    List the sheets of a workbook without parsing their cells.
+
+    Args:
+        source: Uploaded file object or path
+
+    Returns:
+        list: Sheet names in workbook order
+    """
+    engine = excel_engine(source)
+    _rewind(source)
+    try:
+        if engine == "calamine":
+            from python_calamine import CalamineWorkbook
+            workbook = (
+                CalamineWorkbook.from_path(source) if isinstance(source, str)
+                else CalamineWorkbook.from_filelike(source)
+            )
+            return list(workbook.sheet_names)
+        if engine == "xlrd":
+            import xlrd
+            if isinstance(source, str):
+                workbook = xlrd.open_workbook(source, on_demand=True)
+            else:
+                workbook = xlrd.open_workbook(file_contents=source.read(), on_demand=True)
+            try:
+                return workbook.sheet_names()
+            finally:
+                workbook.release_resources()
+
+        from openpyxl import load_workbook
+        workbook = load_workbook(source, read_only=True, data_only=True, keep_links=False)
+        try:
+            return list(workbook.sheetnames)
+        finally:
+            workbook.close()
+    finally:
+        _rewind(source)
+
+
+def read_sheet(source, sheet_name=0, columns=None, nrows=None, **options):
+    """
+    Read one sheet, parsing only the requested columns and rows.
+
+    Args:
+        source: Uploaded file object or path
+        sheet_name (str or int): Sheet name or position, defaults to the first sheet
+        columns (list): Column names to keep (usecols)
+        nrows (int): Maximum number of data rows to read
+        **options: Extra keyword arguments for pd.read_excel
+
+    Returns:
+        pd.DataFrame: Sheet contents
+    """
+    _rewind(source)
+    return pd.read_excel(
+        source,
+        sheet_name=sheet_name,
+        usecols=columns,
+        nrows=nrows,
+        engine=excel_engine(source),
+        **options
+    )
+
+
+def preview_sheet(source, sheet_name=0, nrows=5):
+    """
+    Read the header and first rows of a sheet.
+
+    Args:
+        source: Uploaded file object or path
+        sheet_name (str or int): Sheet name or position
+        nrows (int): Number of data rows to include
+
+    Returns:
+        pd.DataFrame: First rows of the sheet
+    """
+    return read_sheet(source, sheet_name, nrows=nrows)
@@ -0,0 +1,487 @@
+"""
+Indexed filtering, sorting and paging of in-memory dataframes.
+
+A FrameIndex answers explorer queries with row positions, so only the page
+on screen is ever copied out of the frame. Numeric and datetime columns get
+an argsort; every other column is factorized into value codes (categoricals
+reuse their own), and the stable argsort of those codes is both the sort
+order and, for low-cardinality columns, an inverted index: the rows holding
+each value sit next to each other, so an equality filter reads only the
+matching rows. Text search matches distinct values once and maps the hits
+back through the codes. Structures are built on first use, optionally ahead
+of time on a background thread, and kept within a memory budget per frame.
+"""
+import threading
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from utils import settings
+
+# Columns with at most this many distinct values get an inverted index; the
+# codes then fit 16 bits (with a slot for missing values), which numpy sorts by radix
+INDEX_MAX_CARDINALITY = 32_766
+
+# Equality filters matching at most this fraction of rows are read from the inverted index
+POSTINGS_MAX_FRACTION = 0.05
+
+
+def _positions_dtype(n_rows):
+    return np.int32 if n_rows < 2 ** 31 else np.int64
+
+
+def _narrow_codes(codes, n_values):
+    """Shrink value codes to the smallest signed integer type holding n_values + 1."""
+    for dtype in (np.int8, np.int16, np.int32):
+        if n_values < np.iinfo(dtype).max:
+            return codes.astype(dtype, copy=False)
+    return codes.astype(np.int64, copy=False)
+
+
+def is_range_column(series):
+    """
+    Check whether a column is filtered by value range rather than by distinct values.
+
+    Args:
+        series (pd.Series): Column to check
+
+    Returns:
+        bool: True for numeric (except boolean) and datetime columns
+    """
+    dtype = series.dtype
+    if pd.api.types.is_bool_dtype(dtype):
+        return False
+    return pd.api.types.is_numeric_dtype(dtype) or pd.api.types.is_datetime64_any_dtype(dtype)
+
+
+def is_text_column(series):
+    """
+    Check whether free-text search looks into a column.
+
+    Args:
+        series (pd.Series): Column to check
+
+    Returns:
+        bool: True for string, object and categorical columns
+    """
+    dtype = series.dtype
+    return (
+        pd.api.types.is_object_dtype(dtype)
+        or pd.api.types.is_string_dtype(dtype)
+        or isinstance(dtype, pd.CategoricalDtype)
+    )
+
+
+def _argsorted(series):
+    """Check whether a column is sorted by a direct argsort of its numpy values."""
+    dtype = series.dtype
+    return isinstance(dtype, np.dtype) and dtype.kind in 'iufM'
+
+
+class FrameIndex:
+    """
+    Lazily built sort orders, value codes and inverted indexes over one version of a frame.
+
+    The index holds no reference to the frame itself; every method takes the
+    frame, which must be the version the index was built for. It has the
+    current_bytes and clear() of a cache, so a SessionStore can account for it.
+    """
+
+    def __init__(self, n_rows, budget_bytes=None):
+        self.n_rows = n_rows
+        self.budget_bytes = settings.EXPLORER_INDEX_BUDGET_BYTES if budget_bytes is None else budget_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._build_locks = {}
+        self._precompute_thread = None
+        self._generation = 0  # bumped by clear() to stop a running precompute
+
+    @property
+    def nbytes(self):
+        """int: Bytes held by the cached structures."""
+        with self._lock:
+            return sum(size for _, size in self._entries.values())
+
+    @property
+    def current_bytes(self):
+        """int: Bytes held by the cached structures, as a SessionStore cache reports them."""
+        return self.nbytes
+
+    def clear(self):
+        """Drop every cached structure and stop a running precompute; structures are rebuilt on demand."""
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+
+    def _cached(self, key, build):
+        """
+        Return a cached structure, building it at most once at a time.
+
+        Args:
+            key (tuple): Structure key
+            build (callable): Returns (structure, size in bytes)
+
+        Returns:
+            object: The structure
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry[0]
+            build_lock = self._build_locks.setdefault(key, threading.Lock())
+
+        # A concurrent build of the same structure (e.g. by precompute) is waited for, not repeated
+        with build_lock:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    return entry[0]
+            value, size = build()
+            with self._lock:
+                self._entries[key] = (value, size)
+                total = sum(size for _, size in self._entries.values())
+                while total > self.budget_bytes and len(self._entries) > 1:
+                    _, (_, evicted) = self._entries.popitem(last=False)
+                    total -= evicted
+            return value
+
+    def codes(self, df, col):
+        """
+        Factorize a column into value codes.
+
+        Args:
+            df (pd.DataFrame): The indexed frame
+            col: Column name
+
+        Returns:
+            tuple: (np.ndarray, pd.Index) with each row's code and the distinct
+                values in sort order; missing values get the code len(values)
+        """
+        def build():
+            series = df[col]
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                codes = series.cat.codes.to_numpy()
+                uniques = series.cat.categories
+            else:
+                try:
+                    codes, uniques = pd.factorize(series, sort=True)
+                except TypeError:
+                    # Mixed types have no natural order, so distinct values are ordered by their text
+                    codes, uniques = pd.factorize(series)
+                    rank = np.empty(len(uniques), dtype=np.int64)
+                    rank[np.argsort(pd.Index(uniques).astype(str), kind='stable')] = np.arange(len(uniques))
+                    codes = np.where(codes >= 0, rank[codes], -1)
+                    uniques = pd.Index(uniques).take(np.argsort(rank))
+            uniques = pd.Index(uniques)
+            codes = _narrow_codes(codes, len(uniques))
+            codes = np.where(codes < 0, codes.dtype.type(len(uniques)), codes)
+            return (codes, uniques), codes.nbytes + uniques.memory_usage(deep=False)
+
+        return self._cached(('codes', col), build)
+
+    def sort_order(self, df, col):
+        """
+        Ascending row order of a column, missing values last.
+
+        Args:
+            df (pd.DataFrame): The indexed frame
+            col: Column name
+
+        Returns:
+            tuple: (np.ndarray, int) with the row positions and the number of
+                non-missing rows at its front
+        """
+        def build():
+            series = df[col]
+            dtype = _positions_dtype(len(series))
+            if _argsorted(series):
+                # numpy sorts NaN and NaT to the end
+                order = np.argsort(series.to_numpy()).astype(dtype, copy=False)
+                valid = len(series) - int(series.isna().sum())
+            else:
+                codes, uniques = self.codes(df, col)
+                # Stable, so rows with equal values stay in file order and each value's rows are contiguous
+                order = np.argsort(codes, kind='stable').astype(dtype, copy=False)
+                valid = len(series) - int(np.count_nonzero(codes == len(uniques)))
+            return (order, valid), order.nbytes
+
+        return self._cached(('order', col), build)
+
+    def ranks(self, df, col):
+        """
+        Place of every row in a column's ascending sort order.
+
+        Args:
+            df (pd.DataFrame): The indexed frame
+            col: Column name
+
+        Returns:
+            np.ndarray: Rank of each row; ranks of missing values follow all others
+        """
+        def build():
+            order, _ = self.sort_order(df, col)
+            ranks = np.empty_like(order)
+            ranks[order] = np.arange(len(order), dtype=order.dtype)
+            return ranks, ranks.nbytes
+
+        return self._cached(('ranks', col), build)
+
+    def postings(self, df, col):
+        """
+        Inverted index of a low-cardinality column.
+
+        Args:
+            df (pd.DataFrame): The indexed frame
+            col: Column name
+
+        Returns:
+            tuple: (np.ndarray, np.ndarray) with row positions grouped by value
+                code and the offset of each code's group, or None for columns
+                with too many distinct values
+        """
+        if _argsorted(df[col]):
+            return None
+        codes, uniques = self.codes(df, col)
+        if len(uniques) > INDEX_MAX_CARDINALITY:
+            return None
+        order, _ = self.sort_order(df, col)
+
+        def build():
+            counts = np.bincount(codes, minlength=len(uniques) + 1)
+            offsets = np.concatenate(([0], np.cumsum(counts)))
+            return offsets, offsets.nbytes
+
+        return order, self._cached(('offsets', col), build)
+
+    def bounds(self, df, col):
+        """
+        Smallest and largest value of a range column.
+
+        Args:
+            df (pd.DataFrame): The indexed frame
+            col: Column name
+
+        Returns:
+            tuple: (min, max), or (None, None) when every value is missing
+        """
+        def build():
+            series = df[col]
+            if series.notna().any():
+                return (series.min(), series.max()), 0
+            return (None, None), 0
+
+        return self._cached(('bounds', col), build)
+
+    def precompute(self, df, columns=None):
+        """
+        Build sort orders and ranks on a background thread while they fit the memory budget.
+
+        The thread only keeps a weak reference to the frame, so it stops once
+        the frame is dropped or spilled, and it stops when the index is cleared.
+
+        Args:
+            df (pd.DataFrame): The indexed frame
+            columns (list): Columns in order of priority, defaults to all of them
+
+        Returns:
+            threading.Thread: The precompute thread
+        """
+        columns = list(df.columns if columns is None else columns)
+        # Order, ranks and value codes at most
+        per_column = np.dtype(_positions_dtype(self.n_rows)).itemsize * self.n_rows * 3
+
+        frame_ref = weakref.ref(df)
+        generation = self._generation
+
+        def run():
+            planned = 0
+            for col in columns:
+                planned += per_column
+                frame = frame_ref()
+                if planned > self.budget_bytes or frame is None or self._generation != generation:
+                    break
+                try:
+                    self.ranks(frame, col)
+                except Exception:
+                    # Precomputing is only an optimization; the query builds what it needs
+                    continue
+                finally:
+                    del frame
+
+        with self._lock:
+            if self._precompute_thread is None:
+                self._precompute_thread = threading.Thread(target=run, name="data-sweeper-index", daemon=True)
+                self._precompute_thread.start()
+            return self._precompute_thread
+
+    def _filter(self, df, col, spec):
+        """
+        Rows matching one column filter.
+
+        Args:
+            df (pd.DataFrame): The indexed frame
+            col: Column name
+            spec (tuple): ('range', low, high), ('values', list) or ('contains', text)
+
+        Returns:
+            tuple: ('positions', sorted np.ndarray) or ('mask', boolean np.ndarray)
+        """
+        kind = spec[0]
+        if kind == 'range':
+            _, low, high = spec
+            series = df[col]
+            if not _argsorted(series):
+                return 'mask', series.between(low, high).to_numpy(dtype=bool, na_value=False)
+            values = series.to_numpy()
+            if values.dtype.kind == 'M':
+                low, high = (pd.Timestamp(bound).to_datetime64() for bound in (low, high))
+            # NaN and NaT compare False, so missing values never match
+            return 'mask', (values >= low) & (values <= high)
+
+        codes, uniques = self.codes(df, col)
+        flags = np.zeros(len(uniques) + 1, dtype=bool)
+        if kind == 'values':
+            matched = uniques.get_indexer(list(spec[1]))
+            matched = matched[matched >= 0]
+            postings = self.postings(df, col)
+            if postings is not None:
+                order, offsets = postings
+                hits = int((offsets[matched + 1] - offsets[matched]).sum())
+                if hits <= POSTINGS_MAX_FRACTION * self.n_rows:
+                    parts = [order[offsets[code]:offsets[code + 1]] for code in matched]
+                    positions = np.concatenate(parts) if parts else np.empty(0, dtype=order.dtype)
+                    positions.sort()
+                    return 'positions', positions
+            flags[matched] = True
+        elif kind == 'contains':
+            flags[:-1] = self.match_text(uniques, spec[1])
+        else:
+            raise ValueError(f"Unknown filter kind: {kind}")
+        return 'mask', flags[codes]
+
+    @staticmethod
+    def match_text(uniques, text):
+        """
+        Match distinct values against a case-insensitive substring.
+
+        Args:
+            uniques (pd.Index): Distinct values of a column
+            text (str): Substring to look for
+
+        Returns:
+            np.ndarray: Boolean flag per distinct value
+        """
+        values = pd.Series(uniques.astype(str), copy=False)
+        return values.str.contains(text, case=False, regex=False).to_numpy(dtype=bool, na_value=False)
+
+    def query(self, df, filters=None, search="", sort_by=None, ascending=True):
+        """
+        Find the rows to show, in display order.
+
+        Args:
+            df (pd.DataFrame): The indexed frame
+            filters (dict): Column name -> filter spec accepted by the column filters
+            search (str): Case-insensitive text looked for in every text column
+            sort_by: Column to sort by, or None for file order
+            ascending (bool): Sort direction; missing values always come last
+
+        Returns:
+            np.ndarray: Row positions, or None when every row is shown in file order
+        """
+        filters = filters or {}
+        search = (search or "").strip()
+        positions, mask = None, None
+        for col, spec in filters.items():
+            kind, rows = self._filter(df, col, spec)
+            if kind == 'positions':
+                positions = rows if positions is None else np.intersect1d(positions, rows, assume_unique=True)
+            else:
+                mask = rows if mask is None else mask & rows
+        if search:
+            found = np.zeros(self.n_rows, dtype=bool)
+            for col in df.columns:
+                if is_text_column(df[col]):
+                    codes, uniques = self.codes(df, col)
+                    flags = np.append(self.match_text(uniques, search), False)
+                    found |= flags[codes]
+            mask = found if mask is None else mask & found
+        if positions is not None and mask is not None:
+            positions = positions[mask[positions]]
+            mask = None
+
+        if sort_by is not None:
+            order, valid = self.sort_order(df, sort_by)
+            if positions is None and mask is None:
+                positions = order
+            else:
+                if positions is None:
+                    positions = np.flatnonzero(mask)
+                # Sorting the matches' ranks is cheaper than scanning the whole order for them
+                ranks = np.sort(self.ranks(df, sort_by)[positions])
+                valid = int(np.searchsorted(ranks, valid))
+                positions = order[ranks]
+            if not ascending:
+                positions = np.concatenate((positions[:valid][::-1], positions[valid:]))
+        elif mask is not None:
+            positions = np.flatnonzero(mask).astype(_positions_dtype(self.n_rows), copy=False)
+        return positions
+
+    def cached_query(self, df, filters=None, search="", sort_by=None, ascending=True):
+        """
+        Run query() and keep its result with the other structures, replacing the previous one.
+
+        Moving between pages of the same query then only slices the kept result.
+
+        Args:
+            df (pd.DataFrame): The indexed frame
+            filters (dict): Column name -> filter spec accepted by the column filters
+            search (str): Case-insensitive text looked for in every text column
+            sort_by: Column to sort by, or None for file order
+            ascending (bool): Sort direction; missing values always come last
+
+        Returns:
+            np.ndarray: Row positions, or None when every row is shown in file order
+        """
+        key = ('query', repr((filters or {}, (search or "").strip(), sort_by, ascending)))
+        with self._lock:
+            for stale in [entry_key for entry_key in self._entries if entry_key[0] == 'query' and entry_key != key]:
+                del self._entries[stale]
+
+        def build():
+            positions = self.query(df, filters, search, sort_by, ascending)
+            return positions, 0 if positions is None else positions.nbytes
+
+        return self._cached(key, build)
+
+    def count(self, positions):
+        """
+        Number of rows a query matched.
+
+        Args:
+            positions (np.ndarray): Result of query()
+
+        Returns:
+            int: Matching rows
+        """
+        return self.n_rows if positions is None else len(positions)
+
+    @staticmethod
+    def page(df, positions, start, stop):
+        """
+        Copy out one page of a query result.
+
+        Args:
+            df (pd.DataFrame): The indexed frame
+            positions (np.ndarray): Result of query()
+            start (int): First result row of the page
+            stop (int): End of the page (exclusive)
+
+        Returns:
+            pd.DataFrame: The page, keeping the frame's row labels
+        """
+        if positions is None:
+            return df.iloc[start:stop]
+        return df.take(positions[start:stop])
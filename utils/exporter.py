@@ -0,0 +1,268 @@
+"""
+Chunked export of dataframes to binary streams.
+
+Rows are serialized a chunk at a time, so serializing never builds a second
+full copy of the frame. The finished file is as large as the export itself
+wherever it is written; zip members are spooled to temporary files while they
+are serialized in parallel.
+"""
+import gzip
+import math
+import tempfile
+import time
+import zipfile
+
+import pandas as pd
+
+from utils import settings
+
+EXCEL_MAX_ROWS = 1_048_576
+
+
+def _zstd_module():
+    """Return the zstandard module, or None if it is not installed."""
+    try:
+        import zstandard
+    except ImportError:
+        return None
+    return zstandard
+
+
+def available_compressions():
+    """
+    List the compression codecs usable for CSV exports.
+
+    Returns:
+        list: Codec names, always including "None" and "gzip"
+    """
+    codecs = ["None", "gzip"]
+    if _zstd_module() is not None:
+        codecs.append("zstd")
+    return codecs
+
+
+def compression_suffix(compression):
+    """
+    Return the file suffix for a compression codec.
+
+    Args:
+        compression (str): Codec name from available_compressions
+
+    Returns:
+        str: Suffix such as ".gz", or an empty string
+    """
+    return {"gzip": ".gz", "zstd": ".zst"}.get(compression, "")
+
+
+def iter_chunks(df, chunk_rows=None):
+    """
+    Yield consecutive row slices of a dataframe.
+
+    Args:
+        df (pd.DataFrame): Dataframe to slice
+        chunk_rows (int): Rows per slice, defaults to settings.EXPORT_CHUNK_ROWS
+
+    Yields:
+        pd.DataFrame: Row slices in order
+    """
+    chunk_rows = chunk_rows or settings.EXPORT_CHUNK_ROWS
+    for start in range(0, max(len(df), 1), chunk_rows):
+        yield df.iloc[start:start + chunk_rows]
+
+
+def write_csv(df, stream, chunk_rows=None):
+    """
+    Write a dataframe as CSV to a binary stream, one chunk at a time.
+
+    Args:
+        df (pd.DataFrame): Dataframe to export
+        stream: Writable binary file object
+        chunk_rows (int): Rows serialized per chunk
+    """
+    for index, chunk in enumerate(iter_chunks(df, chunk_rows)):
+        stream.write(chunk.to_csv(index=False, header=index == 0).encode('utf-8'))
+
+
+def write_excel(df, stream, chunk_rows=None):
+    """
+    Write a dataframe as an xlsx workbook using xlsxwriter's constant-memory mode.
+
+    Rows are flushed to disk as they are written, so only one row of cells is
+    held by the writer at a time.
+
+    Args:
+        df (pd.DataFrame): Dataframe to export
+        stream: Writable, seekable binary file object
+        chunk_rows (int): Rows converted to Python values per chunk
+
+    Raises:
+        ValueError: If the dataframe exceeds Excel's row limit
+    """
+    import xlsxwriter
+
+    if len(df) + 1 > EXCEL_MAX_ROWS:
+        raise ValueError(f"Excel supports at most {EXCEL_MAX_ROWS - 1:,} data rows; this file has {len(df):,}")
+
+    workbook = xlsxwriter.Workbook(stream, {
+        'constant_memory': True,
+        'in_memory': False,
+        'tmpdir': tempfile.gettempdir(),
+        'default_date_format': 'yyyy-mm-dd hh:mm:ss',
+        'remove_timezone': True,
+        'nan_inf_to_errors': True,
+    })
+    worksheet = workbook.add_worksheet('Sheet1')
+    header_format = workbook.add_format({'bold': True})
+    worksheet.write_row(0, 0, [str(col) for col in df.columns], header_format)
+
+    row = 1
+    for chunk in iter_chunks(df, chunk_rows):
+        # Missing values become empty cells; everything else keeps its Python type
+        values = chunk.astype(object).where(chunk.notna(), None)
+        for record in values.itertuples(index=False, name=None):
+            worksheet.write_row(row, 0, [_excel_value(value) for value in record])
+            row += 1
+    workbook.close()
+
+
+def write_parquet(df, stream, chunk_rows=None):
+    """
+    Write a dataframe as Parquet, one row group per chunk.
+
+    Args:
+        df (pd.DataFrame): Dataframe to export
+        stream: Writable binary file object
+        chunk_rows (int): Rows per row group
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.Schema.from_pandas(df.iloc[:0], preserve_index=False)
+    with pq.ParquetWriter(stream, schema, compression='zstd') as writer:
+        for chunk in iter_chunks(df, chunk_rows):
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+
+
+def write_feather(df, stream, chunk_rows=None):
+    """
+    Write a dataframe as a Feather (Arrow IPC) file, one record batch per chunk.
+
+    Args:
+        df (pd.DataFrame): Dataframe to export
+        stream: Writable binary file object
+        chunk_rows (int): Rows per record batch
+    """
+    import pyarrow as pa
+
+    schema = pa.Schema.from_pandas(df.iloc[:0], preserve_index=False)
+    with pa.ipc.new_file(stream, schema) as writer:
+        for chunk in iter_chunks(df, chunk_rows):
+            writer.write_batch(pa.RecordBatch.from_pandas(chunk, schema=schema, preserve_index=False))
+
+
+EXPORT_FORMATS = {
+    "CSV": {'extension': 'csv', 'mime': 'text/csv'},
+    "Excel": {'extension': 'xlsx', 'mime': 'application/vnd.ms-excel'},
+    "Parquet": {'extension': 'parquet', 'mime': 'application/vnd.apache.parquet'},
+    "Feather": {'extension': 'feather', 'mime': 'application/vnd.apache.arrow.file'},
+}
+
+
+def _excel_value(value):
+    """Convert a cell value into something xlsxwriter can write."""
+    if value is None or isinstance(value, (str, bool, int)):
+        return value
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, pd.Timestamp):
+        return value.to_pydatetime()
+    if hasattr(value, 'item'):
+        # numpy scalars
+        return value.item()
+    return str(value)
+
+
+def write_export(df, stream, output_format, compression="None", chunk_rows=None):
+    """
+    Write a dataframe to a binary stream in the requested format.
+
+    Args:
+        df (pd.DataFrame): Dataframe to export
+        stream: Writable, seekable binary file object
+        output_format (str): A key of EXPORT_FORMATS
+        compression (str): CSV compression codec from available_compressions
+        chunk_rows (int): Rows serialized per chunk
+    """
+    if getattr(df, 'out_of_core', False):
+        df.write_export(stream, output_format, compression, chunk_rows)
+    elif output_format == "Excel":
+        write_excel(df, stream, chunk_rows)
+    elif output_format == "Parquet":
+        write_parquet(df, stream, chunk_rows)
+    elif output_format == "Feather":
+        write_feather(df, stream, chunk_rows)
+    elif compression == "gzip":
+        with gzip.GzipFile(fileobj=stream, mode='wb', compresslevel=6) as compressed:
+            write_csv(df, compressed, chunk_rows)
+    elif compression == "zstd":
+        zstandard = _zstd_module()
+        with zstandard.ZstdCompressor().stream_writer(stream, closefd=False) as compressed:
+            write_csv(df, compressed, chunk_rows)
+    else:
+        write_csv(df, stream, chunk_rows)
+
+
+def export_to_file(df, output_format, compression="None", chunk_rows=None):
+    """
+    Export a dataframe into a spooled temporary file.
+
+    Args:
+        df (pd.DataFrame): Dataframe to export
+        output_format (str): A key of EXPORT_FORMATS
+        compression (str): CSV compression codec from available_compressions
+        chunk_rows (int): Rows serialized per chunk
+
+    Returns:
+        tempfile.SpooledTemporaryFile: File positioned at the start of the export
+    """
+    spool = tempfile.SpooledTemporaryFile(max_size=settings.EXPORT_SPOOL_BYTES)
+    write_export(df, spool, output_format, compression, chunk_rows)
+    spool.seek(0)
+    return spool
+
+
+def write_zip(items, stream, chunk_rows=None):
+    """
+    Bundle several exports into one zip archive written to a binary stream.
+
+    Members are serialized in parallel on the worker pool into spooled files,
+    then copied into the archive in order.
+
+    Args:
+        items (list): (archive name, dataframe, output format) tuples, optionally
+            followed by the CSV compression codec of that member
+        stream: Writable, seekable binary file object
+        chunk_rows (int): Rows serialized per chunk
+
+    Raises:
+        Exception: The first error raised while serializing a member
+    """
+    from utils.parallel import run_parallel
+
+    exports = run_parallel(lambda item: export_to_file(*item[1:], chunk_rows=chunk_rows), items)
+    try:
+        with zipfile.ZipFile(stream, mode='w', compression=zipfile.ZIP_DEFLATED) as archive:
+            for (name, _, output_format, *compression), (exported, error) in zip(items, exports):
+                if error is not None:
+                    raise error
+                # Binary formats and compressed CSV are already compressed; store them as-is
+                plain_csv = output_format == "CSV" and compression in ([], ["None"])
+                info = zipfile.ZipInfo(name, date_time=time.localtime()[:6])
+                info.compress_type = zipfile.ZIP_DEFLATED if plain_csv else zipfile.ZIP_STORED
+                with exported, archive.open(info, mode='w', force_zip64=True) as entry:
+                    for block in iter(lambda: exported.read(1024 * 1024), b""):
+                        entry.write(block)
+    finally:
+        for exported, _ in exports:
+            if exported is not None:
+                exported.close()
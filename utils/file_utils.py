@@ -1,3 +1,8 @@
+from collections import Counter
+
+from utils.readers import detect_format, strip_suffix
+
+
 def validate_file_type(file):
     """
     Validate if the uploaded file is of a supported type.
@@ -8,17 +13,9 @@ def validate_file_type(file):
     Returns:
         bool: True if file type is supported, False otherwise
     """
-    # Get the file extension
-    file_name = file.name.lower()
-    
-    # Check if it's a supported file type
-    supported_extensions = ['.csv', '.xlsx', '.xls']
-    
-    for ext in supported_extensions:
-        if file_name.endswith(ext):
-            return True
-    
-    return False
+    # Check the name against the reader registry's suffixes
+    file_format, _ = detect_format(file.name)
+    return file_format is not None
 
 
 def get_file_extension(file):
@@ -47,4 +44,53 @@ def sanitize_filename(filename):
     """
     # Replace problematic characters with underscores
     sanitized = filename.replace(' ', '_').replace('/', '_').replace('\\', '_')
-    return sanitized
\ No newline at end of file
+    return sanitized
+
+
+def get_base_name(filename):
+    """
+    Strip supported data file extensions from a filename.
+    
+    Args:
+        filename (str): Original filename
+        
+    Returns:
+        str: Filename without its data file extension
+    """
+    return strip_suffix(filename)
+
+
+def unique_output_names(filenames, extensions, prefix="cleaned_"):
+    """
+    Name the output of each input file so that no two outputs share a name.
+    
+    Outputs are named prefix + base name + extension. Inputs that would
+    collide keep their source extension in the name (data.csv and data.xlsx
+    become cleaned_data_csv.csv and cleaned_data_xlsx.csv), and names that
+    are still shared get a counter (cleaned_data_csv_2.csv).
+    
+    Args:
+        filenames (list): Input file names
+        extensions (list): Output extension of each input, without the dot
+        prefix (str): Prefix of every output name
+        
+    Returns:
+        list: Output names in input order
+    """
+    names = [f"{prefix}{get_base_name(name)}.{ext}" for name, ext in zip(filenames, extensions)]
+    counts = Counter(name.lower() for name in names)
+    unique, taken = [], set()
+    for filename, extension, name in zip(filenames, extensions, names):
+        stem = name[:-len(extension) - 1]
+        if counts[name.lower()] > 1:
+            source_suffix = filename[len(get_base_name(filename)):].strip('.').replace('.', '_')
+            if source_suffix:
+                stem = f"{stem}_{source_suffix}"
+        candidate, counter = f"{stem}.{extension}", 2
+        # Names are compared case-insensitively, as zip extractors and many file systems do
+        while candidate.lower() in taken:
+            candidate = f"{stem}_{counter}.{extension}"
+            counter += 1
+        taken.add(candidate.lower())
+        unique.append(candidate)
+    return unique
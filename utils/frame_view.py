@@ -0,0 +1,107 @@
+"""
+Lightweight, lazy column projections over dataframes.
+"""
+import pandas as pd
+
+
+class FrameView:
+    """
+    A column selection over a dataframe that is only materialized on demand.
+
+    Metadata such as shape and dtypes is answered from the parent frame, and
+    consumers pull just the columns they touch instead of a full subset copy.
+    """
+
+    def __init__(self, df, columns=None):
+        self.df = df
+        if columns is None:
+            self.columns = df.columns.tolist()
+        else:
+            # Ignore stale selections that no longer exist in the frame
+            available = set(df.columns)
+            self.columns = [col for col in columns if col in available]
+
+    @property
+    def shape(self):
+        """tuple: (rows, selected columns) without building the subset."""
+        return (len(self.df), len(self.columns))
+
+    @property
+    def dtypes(self):
+        """pd.Series: Dtypes of the selected columns."""
+        return self.df.dtypes[self.columns]
+
+    @property
+    def is_full(self):
+        """bool: True if the view selects every column in the original order."""
+        return self.columns == self.df.columns.tolist()
+
+    def __len__(self):
+        return len(self.df)
+
+    def numeric_columns(self):
+        """
+        List the selected numeric columns.
+
+        Returns:
+            list: Names of selected columns with a numeric dtype
+        """
+        return [
+            col for col, dtype in self.dtypes.items()
+            if pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)
+        ]
+
+    def column(self, name):
+        """
+        Return a single selected column.
+
+        Args:
+            name (str): Column name
+
+        Returns:
+            pd.Series: The column from the parent frame
+        """
+        if name not in self.columns:
+            raise KeyError(name)
+        return self.df[name]
+
+    def materialize(self, columns=None):
+        """
+        Build a dataframe holding only the requested columns.
+
+        Args:
+            columns (list): Subset of the selected columns, defaults to all of them
+
+        Returns:
+            pd.DataFrame: The parent frame itself when every column is requested
+                in order, otherwise a projection of the requested columns
+        """
+        if columns is None:
+            if self.is_full:
+                return self.df
+            columns = self.columns
+        return self.df[list(columns)]
+
+
+def display_safe(df):
+    """
+    Make a dataframe safe to hand to st.dataframe.
+
+    Object columns can mix Python types that Arrow cannot serialize, so their
+    non-null values are converted to strings in one vectorized pass per column.
+
+    Args:
+        df (pd.DataFrame): Dataframe to display (typically a small preview)
+
+    Returns:
+        pd.DataFrame: Dataframe with object columns converted to strings
+    """
+    object_cols = [col for col, dtype in df.dtypes.items() if pd.api.types.is_object_dtype(dtype)]
+    if not object_cols:
+        return df
+
+    display_df = df.copy(deep=False)
+    for col in object_cols:
+        series = df[col]
+        display_df[col] = series.astype(str).where(series.notna(), series)
+    return display_df
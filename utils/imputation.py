@@ -0,0 +1,230 @@
+"""
+Column-aware missing value imputation.
+
+A plan maps column names to a strategy, e.g.
+``{'age': {'strategy': 'median'}, 'temp': {'strategy': 'ffill', 'group_by': ['station']}}``,
+with an optional default for every other column that has nulls. The null
+mask is computed once, statistics are computed in one batched call per
+strategy, scalar fills are applied in a single fillna, and only the columns
+that change are replaced on a shallow copy of the frame.
+"""
+import numpy as np
+import pandas as pd
+
+IMPUTE_STRATEGIES = ('none', 'drop', 'mean', 'median', 'mode', 'constant', 'zero', 'ffill', 'bfill', 'interpolate')
+
+# Strategies filled with one scalar per column
+SCALAR_STRATEGIES = ('mean', 'median', 'mode', 'constant', 'zero')
+
+# Frame-wide missing value strategies offered by the cleaner, as imputation defaults
+MISSING_VALUE_STRATEGIES = {
+    "Drop rows": {'strategy': 'drop'},
+    "Fill with 0": {'strategy': 'zero'},
+    "Fill with mean": {'strategy': 'mean'},
+    "Fill with median": {'strategy': 'median'},
+    "Fill with mode": {'strategy': 'mode'},
+    "Forward fill": {'strategy': 'ffill'},
+    "Backward fill": {'strategy': 'bfill'},
+    "Interpolate": {'strategy': 'interpolate'},
+}
+
+
+def _is_numeric(dtype):
+    return pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)
+
+
+def zero_value(dtype):
+    """
+    Neutral fill value for a dtype: 0 for numbers, 'N/A' for text.
+
+    Args:
+        dtype: Column dtype
+
+    Returns:
+        object: Fill value, or None if the dtype has no neutral value
+    """
+    if _is_numeric(dtype):
+        return 0
+    if pd.api.types.is_string_dtype(dtype):
+        return 'N/A'
+    return None
+
+
+def resolve_plan(df, columns=None, default=None):
+    """
+    Expand a plan into one validated spec per column that needs work.
+
+    Only df.columns and df.dtypes are used, so query-backed frames can be
+    planned the same way.
+
+    Args:
+        df (pd.DataFrame): Dataframe to impute
+        columns (dict): Column name -> spec with 'strategy' and optional 'value',
+            'group_by' and 'order_by'
+        default (dict): Spec applied to columns not listed in columns
+
+    Returns:
+        dict: Column name -> spec, in frame column order
+
+    Raises:
+        ValueError: If a strategy is unknown or does not fit the column
+    """
+    columns = columns or {}
+    unknown = [col for col in columns if col not in df.columns]
+    if unknown:
+        raise ValueError(f"Unknown columns in imputation plan: {unknown}")
+
+    resolved = {}
+    dtypes = df.dtypes
+    for col in df.columns:
+        spec = columns.get(col, default)
+        if not spec or spec.get('strategy', 'none') == 'none':
+            continue
+        strategy = spec['strategy']
+        if strategy not in IMPUTE_STRATEGIES:
+            raise ValueError(f"Unknown imputation strategy for {col!r}: {strategy}")
+        explicit = col in columns
+        if strategy in ('mean', 'median', 'interpolate') and not _is_numeric(dtypes[col]):
+            if explicit:
+                raise ValueError(f"Column {col!r} is not numeric, so it cannot use {strategy}")
+            continue  # a frame-wide default only applies where it makes sense
+        if strategy == 'zero' and zero_value(dtypes[col]) is None:
+            continue
+        if strategy == 'constant' and 'value' not in spec:
+            raise ValueError(f"Constant imputation for {col!r} needs a 'value'")
+        if strategy == 'interpolate' and spec.get('group_by'):
+            raise ValueError(f"Interpolation of {col!r} does not support group_by")
+        resolved[col] = spec
+    return resolved
+
+
+def _fill_value(series, strategy, spec, stats):
+    """Pick the scalar used to fill one column."""
+    if strategy == 'constant':
+        return spec['value']
+    if strategy == 'zero':
+        return zero_value(series.dtype)
+    value = stats[strategy].get(series.name)
+    if value is None or pd.isna(value):
+        return None
+    if strategy in ('mean', 'median') and pd.api.types.is_integer_dtype(series.dtype):
+        # Nullable integer columns cannot hold fractional fills
+        value = int(round(value))
+    return value
+
+
+def _ordered_fill(df, cols, method, group_by, order_by):
+    """Forward or backward fill several columns at once, optionally per group and in a given order."""
+    order = None
+    work = df
+    if order_by:
+        order = np.argsort(df[order_by].to_numpy(), kind='stable')
+        work = df.iloc[order]
+
+    if group_by:
+        grouped = work.groupby(list(group_by), sort=False, dropna=False)[cols]
+        filled = grouped.ffill() if method == 'ffill' else grouped.bfill()
+    else:
+        filled = work[cols].ffill() if method == 'ffill' else work[cols].bfill()
+
+    if order is not None:
+        inverse = np.empty_like(order)
+        inverse[order] = np.arange(len(order))
+        filled = filled.iloc[inverse]
+    return filled
+
+
+def impute(df, columns=None, default=None):
+    """
+    Fill or drop missing values column by column.
+
+    Strategies:
+        none: leave the column as is
+        drop: drop rows where the column is null
+        mean, median: numeric columns only, rounded for integer columns
+        mode: most frequent value
+        constant: the spec's 'value'
+        zero: 0 for numbers, 'N/A' for text
+        ffill, bfill: propagate values, optionally within 'group_by' groups
+            and in 'order_by' order instead of row order
+        interpolate: linear interpolation between numeric values
+
+    Args:
+        df (pd.DataFrame): Dataframe to impute
+        columns (dict): Column name -> spec, see resolve_plan
+        default (dict): Spec for every column not listed in columns
+
+    Returns:
+        tuple: (pd.DataFrame, dict) with the result and a per-column report of
+            'strategy', 'nulls_before', 'nulls_after' and 'fill_value'
+    """
+    plan = resolve_plan(df, columns, default)
+    # One pass for the null mask of every column
+    null_counts = df.isna().sum()
+    plan = {col: spec for col, spec in plan.items() if null_counts[col] > 0}
+    report = {
+        col: {'strategy': spec['strategy'], 'nulls_before': int(null_counts[col]), 'nulls_after': 0, 'fill_value': None}
+        for col, spec in plan.items()
+    }
+    if not plan:
+        return df, report
+
+    by_strategy = {}
+    for col, spec in plan.items():
+        by_strategy.setdefault(spec['strategy'], []).append(col)
+
+    result = df
+    drop_cols = by_strategy.pop('drop', [])
+    if drop_cols:
+        result = result.dropna(subset=drop_cols)
+
+    # Column statistics in one batched call per strategy
+    stats = {}
+    if by_strategy.get('mean'):
+        stats['mean'] = result[by_strategy['mean']].mean().to_dict()
+    if by_strategy.get('median'):
+        stats['median'] = result[by_strategy['median']].median().to_dict()
+    if by_strategy.get('mode'):
+        modes = result[by_strategy['mode']].mode(dropna=True)
+        stats['mode'] = modes.iloc[0].to_dict() if len(modes) else {}
+
+    fill_values = {}
+    for strategy in SCALAR_STRATEGIES:
+        for col in by_strategy.get(strategy, []):
+            value = _fill_value(result[col], strategy, plan[col], stats)
+            report[col]['fill_value'] = value
+            if value is not None:
+                fill_values[col] = value
+    if fill_values:
+        result = result.fillna(fill_values)
+
+    # Propagating fills, batched by method, grouping and ordering
+    replacements = {}
+    batches = {}
+    for method in ('ffill', 'bfill'):
+        for col in by_strategy.get(method, []):
+            spec = plan[col]
+            key = (method, tuple(spec.get('group_by') or ()), spec.get('order_by'))
+            batches.setdefault(key, []).append(col)
+    for (method, group_by, order_by), cols in batches.items():
+        filled = _ordered_fill(result, cols, method, group_by, order_by)
+        replacements.update({col: filled[col] for col in cols})
+    if by_strategy.get('interpolate'):
+        interpolated = result[by_strategy['interpolate']].interpolate(method='linear')
+        replacements.update({col: interpolated[col] for col in by_strategy['interpolate']})
+
+    if replacements:
+        if result is df:
+            result = df.copy(deep=False)
+        for col, values in replacements.items():
+            result[col] = values
+
+    # Scalar fills and drops leave no nulls; only propagated columns need a recount
+    if replacements:
+        nulls_after = result[list(replacements)].isna().sum()
+        for col in replacements:
+            report[col]['nulls_after'] = int(nulls_after[col])
+    for col in plan:
+        if col not in replacements and col not in drop_cols and col not in fill_values:
+            report[col]['nulls_after'] = report[col]['nulls_before']
+    return result, report
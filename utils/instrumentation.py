@@ -0,0 +1,273 @@
+"""
+Lightweight stage instrumentation for the app's hot paths.
+
+Wrap a stage in ``timed_stage`` to record its wall time, CPU time, peak
+memory growth and rows processed. Records go to an optional per-rerun
+RunRecorder (shown in the Performance panel) and always to the process-wide
+STAGE_METRICS aggregates, which can be rendered in Prometheus text format or
+served on a small HTTP endpoint for scraping. RunProfiler captures a cProfile
+or pyinstrument profile of a whole rerun on demand.
+"""
+import cProfile
+import io
+import marshal
+import pstats
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def peak_rss_bytes():
+    """
+    Read the peak resident set size of the process.
+
+    Returns:
+        int or None: Peak RSS in bytes, or None where it cannot be measured
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class StageMetrics:
+    """
+    Process-wide totals per stage, across every session and rerun.
+    """
+
+    def __init__(self):
+        self._stages = {}
+        self._lock = threading.Lock()
+
+    def observe(self, record):
+        """
+        Add one stage record to the totals.
+
+        Args:
+            record (dict): Record produced by timed_stage
+        """
+        with self._lock:
+            totals = self._stages.setdefault(record['stage'], {
+                'count': 0, 'wall_seconds': 0.0, 'cpu_seconds': 0.0, 'rows': 0, 'peak_memory_bytes': 0,
+            })
+            totals['count'] += 1
+            totals['wall_seconds'] += record['wall_seconds']
+            totals['cpu_seconds'] += record['cpu_seconds']
+            totals['rows'] += record['rows'] or 0
+            totals['peak_memory_bytes'] = max(totals['peak_memory_bytes'], record['peak_memory_delta'] or 0)
+
+    def snapshot(self):
+        """
+        Copy the current totals.
+
+        Returns:
+            dict: Stage name -> count, wall/CPU seconds, rows and largest peak memory growth
+        """
+        with self._lock:
+            return {stage: dict(totals) for stage, totals in self._stages.items()}
+
+    def prometheus_text(self):
+        """
+        Render the totals in the Prometheus text exposition format.
+
+        Returns:
+            str: Metrics document
+        """
+        snapshot = self.snapshot()
+        families = [
+            ('data_sweeper_stage_runs_total', 'counter', 'Times each stage has run', 'count'),
+            ('data_sweeper_stage_wall_seconds_total', 'counter', 'Wall time spent in each stage', 'wall_seconds'),
+            ('data_sweeper_stage_cpu_seconds_total', 'counter', 'Process CPU time spent in each stage', 'cpu_seconds'),
+            ('data_sweeper_stage_rows_total', 'counter', 'Rows processed by each stage', 'rows'),
+            ('data_sweeper_stage_peak_memory_bytes', 'gauge',
+             'Largest growth of peak resident memory seen in each stage', 'peak_memory_bytes'),
+        ]
+        lines = []
+        for name, metric_type, help_text, field in families:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for stage, totals in sorted(snapshot.items()):
+                label = stage.replace('\\', '\\\\').replace('"', '\\"')
+                lines.append(f'{name}{{stage="{label}"}} {totals[field]}')
+        peak = peak_rss_bytes()
+        if peak is not None:
+            lines.append("# HELP data_sweeper_process_peak_rss_bytes Peak resident memory of the process")
+            lines.append("# TYPE data_sweeper_process_peak_rss_bytes gauge")
+            lines.append(f"data_sweeper_process_peak_rss_bytes {peak}")
+        return "\n".join(lines) + "\n"
+
+
+STAGE_METRICS = StageMetrics()
+
+
+class RunRecorder:
+    """
+    Stage records of a single rerun, in the order the stages ran.
+    """
+
+    def __init__(self):
+        self.records = []
+        self.started = time.perf_counter()
+
+    def stage(self, name, rows=None):
+        """
+        Time a stage of this rerun; see timed_stage.
+
+        Returns:
+            contextmanager: Yields the stage record
+        """
+        return timed_stage(name, rows=rows, recorder=self)
+
+    @property
+    def wall_seconds(self):
+        """float: Time since the rerun started."""
+        return time.perf_counter() - self.started
+
+
+@contextmanager
+def timed_stage(name, rows=None, recorder=None):
+    """
+    Measure a stage of work.
+
+    The yielded record can be updated inside the block, e.g. to set 'rows'
+    once the number of processed rows is known. CPU time is process-wide, so
+    it includes worker threads and any concurrent sessions.
+
+    Args:
+        name (str): Stage name
+        rows (int): Rows processed, if known up front
+        recorder (RunRecorder): Per-rerun recorder to append the record to
+
+    Yields:
+        dict: Stage record with 'stage', 'rows', 'wall_seconds', 'cpu_seconds'
+            and 'peak_memory_delta' (bytes, None where unavailable)
+    """
+    record = {'stage': name, 'rows': rows, 'wall_seconds': 0.0, 'cpu_seconds': 0.0, 'peak_memory_delta': None}
+    peak_before = peak_rss_bytes()
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record['wall_seconds'] = time.perf_counter() - wall_start
+        record['cpu_seconds'] = time.process_time() - cpu_start
+        if peak_before is not None:
+            record['peak_memory_delta'] = peak_rss_bytes() - peak_before
+        if recorder is not None:
+            recorder.records.append(record)
+        STAGE_METRICS.observe(record)
+
+
+def pyinstrument_available():
+    """Return True if the pyinstrument sampling profiler is installed."""
+    try:
+        import pyinstrument  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class RunProfiler:
+    """
+    On-demand profiler for one rerun, using cProfile or pyinstrument.
+
+    Both profilers only see the thread that starts them, so work on the
+    worker pool shows up as time spent waiting on futures. Set
+    DATA_SWEEPER_WORKERS=1 to run that work inline and profile it too.
+    """
+
+    def __init__(self, engine="cProfile"):
+        if engine not in ("cProfile", "pyinstrument"):
+            raise ValueError(f"Unknown profiler: {engine}")
+        self.engine = engine
+        self._profiler = None
+
+    def start(self):
+        """Begin capturing."""
+        if self.engine == "pyinstrument":
+            from pyinstrument import Profiler
+            self._profiler = Profiler()
+            self._profiler.start()
+        else:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+
+    def stop(self, top=30):
+        """
+        Stop capturing and summarize the profile.
+
+        Args:
+            top (int): Number of functions listed in the text summary
+
+        Returns:
+            dict: 'engine', 'text' summary, downloadable 'data' bytes and its 'filename'
+        """
+        if self.engine == "pyinstrument":
+            self._profiler.stop()
+            return {
+                'engine': self.engine,
+                'text': self._profiler.output_text(unicode=True, color=False),
+                'data': self._profiler.output_html().encode('utf-8'),
+                'filename': "profile.html",
+            }
+
+        self._profiler.disable()
+        text = io.StringIO()
+        pstats.Stats(self._profiler, stream=text).sort_stats("cumulative").print_stats(top)
+        # Same layout as Profile.dump_stats, loadable with pstats or snakeviz
+        self._profiler.create_stats()
+        return {
+            'engine': self.engine,
+            'text': text.getvalue(),
+            'data': marshal.dumps(self._profiler.stats),
+            'filename': "profile.prof",
+        }
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = STAGE_METRICS.prometheus_text().encode('utf-8')
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_metrics_server = None
+_metrics_server_lock = threading.Lock()
+
+
+def start_metrics_server(port):
+    """
+    Serve the stage metrics at http://<host>:<port>/metrics, once per process.
+
+    Args:
+        port (int): TCP port to listen on
+
+    Returns:
+        ThreadingHTTPServer or None: The running server, or None if the port is unavailable
+    """
+    global _metrics_server
+    with _metrics_server_lock:
+        if _metrics_server is None:
+            try:
+                _metrics_server = ThreadingHTTPServer(("", port), _MetricsHandler)
+            except OSError:
+                return None
+            threading.Thread(target=_metrics_server.serve_forever, daemon=True).start()
+        return _metrics_server
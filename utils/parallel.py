@@ -0,0 +1,62 @@
+"""
+Bounded worker pool for per-file work.
+
+Tasks run on a thread pool by default (pandas, numpy and pyarrow release the
+GIL for their heavy lifting); batch jobs can opt into a process pool for
+GIL-bound work such as CSV serialization. Results come back in submission
+order, and a failing item is reported alongside the others instead of
+aborting the batch.
+"""
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+from utils import settings
+
+
+def run_parallel(func, items, max_workers=None, on_done=None, use_processes=False):
+    """
+    Apply a function to every item on a bounded thread pool.
+
+    Args:
+        func (callable): Function called as func(item)
+        items (iterable): Items to process
+        max_workers (int): Pool size, defaults to settings.WORKER_COUNT
+        on_done (callable): Called as on_done(completed, total) from the calling
+            thread each time an item finishes
+        use_processes (bool): Use a process pool; func and items must be picklable
+
+    Returns:
+        list: (result, error) tuples in the same order as `items`; error is the
+            raised exception or None
+    """
+    items = list(items)
+    if not items:
+        return []
+
+    workers = max(1, min(max_workers or settings.WORKER_COUNT, len(items)))
+    outcomes = [None] * len(items)
+
+    if workers == 1:
+        # Skip the pool entirely for a single worker
+        for index, item in enumerate(items):
+            outcomes[index] = _call(func, item)
+            if on_done is not None:
+                on_done(index + 1, len(items))
+        return outcomes
+
+    executor_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+    with executor_class(max_workers=workers) as pool:
+        futures = {pool.submit(_call, func, item): index for index, item in enumerate(items)}
+        for completed, future in enumerate(as_completed(futures), start=1):
+            outcomes[futures[future]] = future.result()
+            if on_done is not None:
+                on_done(completed, len(items))
+
+    return outcomes
+
+
+def _call(func, item):
+    """Run func(item), capturing any exception instead of raising it."""
+    try:
+        return func(item), None
+    except Exception as error:
+        return None, error
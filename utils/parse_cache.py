@@ -0,0 +1,217 @@
+"""
+Process-wide parse cache for uploaded files.
+
+Parsed dataframes are keyed by a hash of the file contents plus the reader
+options that produced them, and spilled to Parquet files on local disk.
+Entries are evicted least-recently-used first once the byte budget is hit.
+Spill files are only ever read back as Parquet, never unpickled, so a file
+planted in the cache directory cannot run code in the app.
+"""
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from utils import settings
+
+
+def hash_file_content(file, chunk_size=8 * 1024 * 1024):
+    """
+    Compute a content hash for an uploaded file without changing its position.
+
+    Args:
+        file: Uploaded file object (any readable, seekable binary buffer)
+        chunk_size (int): Number of bytes hashed per read
+
+    Returns:
+        str: Hex digest of the file contents
+    """
+    hasher = hashlib.blake2b(digest_size=20)
+    position = file.tell()
+    file.seek(0)
+    for block in iter(lambda: file.read(chunk_size), b""):
+        hasher.update(block)
+    file.seek(position)
+    return hasher.hexdigest()
+
+
+def make_cache_key(content_hash, reader, options=None):
+    """
+    Build a cache key from a content hash and the reader configuration.
+
+    Args:
+        content_hash (str): Hash of the raw file contents
+        reader (str): Name of the reader used to parse the file
+        options (dict): Keyword arguments passed to the reader
+
+    Returns:
+        str: Stable cache key
+    """
+    options_blob = json.dumps(options or {}, sort_keys=True, default=str)
+    options_hash = hashlib.blake2b(options_blob.encode("utf-8"), digest_size=8).hexdigest()
+    return f"{content_hash}-{reader}-{options_hash}"
+
+
+class ParseCache:
+    """
+    LRU cache of parsed dataframes backed by Parquet spill files.
+
+    Frames that cannot be written as Parquet (for example object columns
+    holding mixed Python types) are not cached; they are parsed again instead.
+    """
+
+    def __init__(self, cache_dir, max_bytes):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (path, size in bytes)
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+        self._adopt_existing_files()
+
+    @property
+    def current_bytes(self):
+        """int: Total size of the spill files currently tracked."""
+        return sum(size for _, size in self._entries.values())
+
+    def get(self, key):
+        """
+        Load a cached dataframe.
+
+        Args:
+            key (str): Cache key from make_cache_key
+
+        Returns:
+            pd.DataFrame or None: Cached dataframe, or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            path = entry[0]
+
+        try:
+            df = pd.read_parquet(path)
+        except (OSError, ValueError):
+            # Spill file vanished or is corrupt: treat it as a miss
+            with self._lock:
+                self._entries.pop(key, None)
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return df
+
+    def put(self, key, df):
+        """
+        Spill a parsed dataframe to disk and register it in the cache.
+
+        Args:
+            key (str): Cache key from make_cache_key
+            df (pd.DataFrame): Parsed dataframe
+        """
+        path = os.path.join(self.cache_dir, key + ".parquet")
+        try:
+            df.to_parquet(path)
+        except (ImportError, ValueError, TypeError, NotImplementedError):
+            # The frame has columns Arrow cannot represent
+            self._remove_file(path)
+            with self._lock:
+                self._entries.pop(key, None)
+            return
+
+        size = os.path.getsize(path)
+        if size > self.max_bytes:
+            # Never keep an entry larger than the whole budget
+            os.remove(path)
+            return
+
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (path, size)
+            self._evict()
+
+    def clear(self):
+        """Remove every spill file and reset the counters."""
+        with self._lock:
+            for path, _ in self._entries.values():
+                self._remove_file(path)
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """
+        Summarize the cache state.
+
+        Returns:
+            dict: Hit/miss counters, entry count and byte usage
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    def _adopt_existing_files(self):
+        """Register spill files left behind by a previous process of this user, oldest first."""
+        spill_files = []
+        uid = os.getuid() if hasattr(os, 'getuid') else None
+        for name in os.listdir(self.cache_dir):
+            key, ext = os.path.splitext(name)
+            if ext != ".parquet":
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if uid is not None and stat.st_uid != uid:
+                # Another user's file in a shared directory is never trusted
+                continue
+            spill_files.append((stat.st_mtime, key, path, stat.st_size))
+
+        for _, key, path, size in sorted(spill_files):
+            self._entries[key] = (path, size)
+        self._evict()
+
+    def _evict(self):
+        """Drop least-recently-used entries until the byte budget is met."""
+        while self._entries and self.current_bytes > self.max_bytes:
+            _, (path, _) = self._entries.popitem(last=False)
+            self._remove_file(path)
+
+    @staticmethod
+    def _remove_file(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+_parse_cache = None
+_parse_cache_lock = threading.Lock()
+
+
+def get_parse_cache():
+    """
+    Return the process-wide parse cache, creating it on first use.
+
+    Returns:
+        ParseCache: Shared cache instance
+    """
+    global _parse_cache
+    with _parse_cache_lock:
+        if _parse_cache is None:
+            _parse_cache = ParseCache(settings.CACHE_DIR, settings.CACHE_MAX_BYTES)
+        return _parse_cache
@@ -0,0 +1,234 @@
+"""
+Declarative cleaning pipeline with prefix-memoized results.
+
+A pipeline is an ordered list of steps, each a dict with an ``op`` name and
+its parameters, e.g. ``{'op': 'missing_values', 'strategy': 'Drop rows'}`` or
+``{'op': 'drop_duplicates', 'subset': ['id'], 'keep': 'last'}``.
+Steps are always applied to the original frame; the result of every step
+prefix is cached so changing one step only recomputes from that step onward.
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+from utils.dedup import drop_duplicates
+from utils.dtypes import memory_bytes
+from utils.imputation import MISSING_VALUE_STRATEGIES, impute
+
+
+def drop_duplicates_step(df, subset=None, keep='first', method='auto'):
+    """
+    Remove duplicate rows, optionally judged on a subset of key columns.
+
+    Args:
+        df (pd.DataFrame): Input dataframe
+        subset (list): Key columns, defaults to all columns
+        keep (str): 'first', 'last' or 'none' to drop every duplicated row
+        method (str): Deduplication method, see utils.dedup.drop_duplicates
+
+    Returns:
+        tuple: (pd.DataFrame, dict) with the result and step statistics
+    """
+    result = drop_duplicates(df, subset=subset, keep=keep, method=method)
+    return result, {'rows_removed': len(df) - len(result), 'columns_changed': []}
+
+
+def missing_values_step(df, strategy):
+    """
+    Handle missing values with a single frame-wide strategy.
+
+    Args:
+        df (pd.DataFrame): Input dataframe
+        strategy (str): One of the MISSING_VALUE_STRATEGIES names
+
+    Returns:
+        tuple: (pd.DataFrame, dict) with the result and step statistics
+    """
+    if strategy not in MISSING_VALUE_STRATEGIES:
+        raise ValueError(f"Unknown missing value strategy: {strategy}")
+    return impute_step(df, default=MISSING_VALUE_STRATEGIES[strategy])
+
+
+def impute_step(df, columns=None, default=None):
+    """
+    Impute missing values column by column.
+
+    Args:
+        df (pd.DataFrame): Input dataframe
+        columns (dict): Column name -> imputation spec, see utils.imputation
+        default (dict): Spec for every other column with missing values
+
+    Returns:
+        tuple: (pd.DataFrame, dict) with the result and step statistics,
+            including per-column 'null_counts' before and after
+    """
+    result, report = impute(df, columns, default)
+    # Only imputed columns are rewritten; dropped rows are reflected in rows_removed
+    columns_changed = [col for col, entry in report.items() if entry['strategy'] != 'drop']
+    return result, {
+        'rows_removed': len(df) - len(result),
+        'columns_changed': columns_changed,
+        'null_counts': report,
+    }
+
+
+STEP_FUNCTIONS = {
+    'drop_duplicates': drop_duplicates_step,
+    'missing_values': missing_values_step,
+    'impute': impute_step,
+}
+
+
+def step_key(steps):
+    """
+    Build a stable key for a sequence of steps.
+
+    Args:
+        steps (list): Pipeline steps
+
+    Returns:
+        str: Hex digest identifying the steps and their parameters
+    """
+    blob = json.dumps(list(steps), sort_keys=True, default=str)
+    return hashlib.blake2b(blob.encode('utf-8'), digest_size=12).hexdigest()
+
+
+def apply_step(df, step):
+    """
+    Apply a single pipeline step.
+
+    Args:
+        df (pd.DataFrame): Input dataframe
+        step (dict): Step with an 'op' name and its parameters
+
+    Returns:
+        tuple: (pd.DataFrame, dict) with the result and step statistics
+    """
+    if getattr(df, 'out_of_core', False):
+        # Query-backed frames translate the step into SQL themselves
+        result, step_stats = df.apply_steps([step])
+        return result, step_stats[0]
+
+    params = {name: value for name, value in step.items() if name != 'op'}
+    try:
+        step_func = STEP_FUNCTIONS[step['op']]
+    except KeyError:
+        raise ValueError(f"Unknown pipeline step: {step['op']}")
+    return step_func(df, **params)
+
+
+def column_versions(data_version, columns, steps, step_stats):
+    """
+    Derive a version token per output column from the steps that touched it.
+
+    A step that removes rows changes every column; otherwise only the columns
+    it reports in 'columns_changed' get a new token. Untouched columns keep the
+    token of the original data, so column-level caches stay valid.
+
+    Args:
+        data_version (str): Identifier of the input data
+        columns (iterable): Output column names
+        steps (list): Pipeline steps that were applied
+        step_stats (list): Statistics returned by each step
+
+    Returns:
+        dict: Mapping of column name to version token
+    """
+    versions = {col: data_version for col in columns}
+    for index, stats in enumerate(step_stats):
+        token = f"{data_version}:{step_key(steps[:index + 1])}"
+        if stats.get('rows_removed'):
+            changed = versions.keys()
+        else:
+            changed = [col for col in stats.get('columns_changed', []) if col in versions]
+        for col in list(changed):
+            versions[col] = token
+    return versions
+
+
+class PipelineCache:
+    """
+    LRU cache of pipeline prefix results keyed by (data version, step prefix).
+    """
+
+    def __init__(self, max_entries=32):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._sizes = {}
+        self._lock = threading.Lock()
+
+    @property
+    def current_bytes(self):
+        """int: Deep memory used by the cached frames, measured when they were stored."""
+        with self._lock:
+            return sum(self._sizes.values())
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, entry):
+        frame = entry[0]
+        size = 0 if frame is None or getattr(frame, 'out_of_core', False) else memory_bytes(frame)
+        with self._lock:
+            self._entries[key] = entry
+            self._sizes[key] = size
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                old_key, _ = self._entries.popitem(last=False)
+                self._sizes.pop(old_key, None)
+
+    def discard(self, data_version):
+        """Drop every cached result derived from the given data version."""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == data_version]:
+                del self._entries[key]
+                self._sizes.pop(key, None)
+
+    def clear(self):
+        """Drop every cached result."""
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+
+
+def run_pipeline(df, steps, data_version=None, cache=None):
+    """
+    Run a pipeline against the original frame, resuming from the longest cached prefix.
+
+    Args:
+        df (pd.DataFrame): Original, uncleaned dataframe
+        steps (list): Pipeline steps to apply in order
+        data_version (str): Identifier of the input data, e.g. its content hash
+        cache (PipelineCache): Cache for prefix results; nothing is cached if None
+
+    Returns:
+        tuple: (pd.DataFrame, list) with the cleaned frame and per-step statistics
+    """
+    use_cache = cache is not None and data_version is not None
+    result, step_stats = df, []
+    start = 0
+
+    if use_cache:
+        # Find the longest prefix that has already been computed
+        for end in range(len(steps), 0, -1):
+            entry = cache.get((data_version, step_key(steps[:end])))
+            if entry is not None:
+                result, step_stats = (df if entry[0] is None else entry[0]), list(entry[1])
+                start = end
+                break
+
+    for index in range(start, len(steps)):
+        result, stats = apply_step(result, steps[index])
+        step_stats.append(stats)
+        if use_cache:
+            # A prefix that left the frame unchanged is cached without it, so the
+            # cache never pins the original frame in memory after it is spilled
+            cached_frame = None if result is df else result
+            cache.put((data_version, step_key(steps[:index + 1])), (cached_frame, tuple(step_stats)))
+
+    return result, step_stats
@@ -0,0 +1,317 @@
+"""
+Cached, per-column profiling of dataframes.
+
+Each column is profiled once per column version: count, nulls, min/max,
+mean/std, approximate quantiles from a mergeable sketch, approximate distinct
+counts from HyperLogLog, and top-k values. Profiles are computed in parallel
+and cached process-wide, so a cleaning step that leaves a column untouched
+keeps its cached profile.
+"""
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+PROFILE_CHUNK_ROWS = 1_000_000
+DESCRIBE_QUANTILES = (0.25, 0.5, 0.75)
+
+
+class HyperLogLog:
+    """
+    Vectorized HyperLogLog distinct counter over 64-bit pandas hashes.
+    """
+
+    def __init__(self, precision=14):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def update(self, values):
+        """
+        Add values to the sketch.
+
+        Args:
+            values (pd.Series): Non-null values to count
+        """
+        if len(values) == 0:
+            return
+        hashes = pd.util.hash_pandas_object(values, index=False).to_numpy(dtype=np.uint64)
+        p = self.precision
+        index = (hashes >> np.uint64(64 - p)).astype(np.int64)
+        remainder = hashes << np.uint64(p)
+
+        # Keep the top 53 bits so the float log2 below is exact
+        top = remainder >> np.uint64(11)
+        max_rank = 64 - p + 1
+        with np.errstate(divide='ignore'):
+            highest_bit = np.floor(np.log2(top.astype(np.float64)))
+        rank = np.where(top > 0, 52 - highest_bit + 1, max_rank)
+        rank = np.minimum(rank, max_rank).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other):
+        """Combine another sketch of the same precision into this one."""
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self):
+        """
+        Estimate the number of distinct values added.
+
+        Returns:
+            int: Approximate distinct count
+        """
+        m = float(len(self.registers))
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.exp2(-self.registers.astype(np.float64)))
+        empty = np.count_nonzero(self.registers == 0)
+        if raw <= 2.5 * m and empty:
+            # Linear counting is more accurate for small cardinalities
+            return int(round(m * np.log(m / empty)))
+        return int(round(raw))
+
+
+class QuantileSketch:
+    """
+    Mergeable weighted-centroid quantile sketch.
+
+    Each chunk is summarized by `size` evenly spaced order statistics carrying
+    equal weight; summaries are merged by weighted compaction back to `size`
+    points, so memory stays fixed no matter how many chunks are added.
+    """
+
+    def __init__(self, size=1_000):
+        self.size = size
+        self.values = np.array([], dtype=np.float64)
+        self.weights = np.array([], dtype=np.float64)
+
+    def update(self, values):
+        """
+        Add a chunk of finite float values to the sketch.
+
+        Args:
+            values (np.ndarray): Finite values
+        """
+        if values.size == 0:
+            return
+        if values.size <= self.size:
+            points = np.sort(values)
+            weights = np.ones(points.size)
+        else:
+            ranks = np.linspace(0, values.size - 1, self.size).astype(np.int64)
+            points = np.partition(values, ranks)[ranks]
+            weights = np.full(self.size, values.size / self.size)
+        self._merge_points(points, weights)
+
+    def merge(self, other):
+        """Combine another sketch into this one."""
+        self._merge_points(other.values, other.weights)
+
+    def quantiles(self, qs):
+        """
+        Estimate quantiles.
+
+        Args:
+            qs (iterable): Quantiles in [0, 1]
+
+        Returns:
+            list: Estimated values, NaN if the sketch is empty
+        """
+        if self.values.size == 0:
+            return [np.nan for _ in qs]
+        cumulative = np.cumsum(self.weights) - self.weights / 2
+        cumulative /= self.weights.sum()
+        return [float(np.interp(q, cumulative, self.values)) for q in qs]
+
+    def _merge_points(self, points, weights):
+        values = np.concatenate([self.values, points])
+        weights = np.concatenate([self.weights, weights])
+        order = np.argsort(values, kind='stable')
+        values, weights = values[order], weights[order]
+
+        if values.size > self.size:
+            # Compact back to `size` points at evenly spaced weight targets
+            cumulative = np.cumsum(weights) - weights / 2
+            targets = np.linspace(cumulative[0], cumulative[-1], self.size)
+            values = np.interp(targets, cumulative, values)
+            weights = np.full(self.size, weights.sum() / self.size)
+
+        self.values, self.weights = values, weights
+
+
+def profile_column(series, top_k=5):
+    """
+    Compute the profile of a single column.
+
+    Args:
+        series (pd.Series): Column to profile
+        top_k (int): Number of most frequent values to keep
+
+    Returns:
+        dict: Column statistics
+    """
+    non_null = series.dropna()
+    dtype = series.dtype
+    profile = {
+        'dtype': str(dtype),
+        'count': int(len(non_null)),
+        'nulls': int(len(series) - len(non_null)),
+        'numeric': pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype),
+    }
+
+    distinct = HyperLogLog()
+    for start in range(0, len(non_null), PROFILE_CHUNK_ROWS):
+        distinct.update(non_null.iloc[start:start + PROFILE_CHUNK_ROWS])
+    profile['distinct_approx'] = distinct.estimate() if len(non_null) else 0
+
+    top_values = non_null.value_counts().head(top_k)
+    profile['top_values'] = list(zip(top_values.index.tolist(), top_values.tolist()))
+
+    if profile['numeric'] and len(non_null):
+        values = non_null.to_numpy(dtype=np.float64, na_value=np.nan)
+        values = values[np.isfinite(values)]
+        sketch = QuantileSketch()
+        for start in range(0, values.size, PROFILE_CHUNK_ROWS):
+            sketch.update(values[start:start + PROFILE_CHUNK_ROWS])
+        profile.update({
+            'min': float(non_null.min()),
+            'max': float(non_null.max()),
+            'mean': float(non_null.mean()),
+            'std': float(non_null.std()),
+            'quantiles': dict(zip(DESCRIBE_QUANTILES, sketch.quantiles(DESCRIBE_QUANTILES))),
+        })
+    elif len(non_null):
+        try:
+            profile['min'], profile['max'] = non_null.min(), non_null.max()
+        except TypeError:
+            # Mixed, unorderable object values
+            profile['min'] = profile['max'] = None
+
+    return profile
+
+
+class ProfileCache:
+    """
+    Process-wide LRU cache of column profiles keyed by (column, column version).
+    """
+
+    def __init__(self, max_entries=4_096):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            profile = self._entries.get(key)
+            if profile is not None:
+                self._entries.move_to_end(key)
+            return profile
+
+    def put(self, key, profile):
+        with self._lock:
+            self._entries[key] = profile
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+_profile_cache = ProfileCache()
+
+
+def profile_frame(df, column_versions=None, max_workers=None):
+    """
+    Profile every column of a dataframe, reusing cached column profiles.
+
+    Args:
+        df (pd.DataFrame): Dataframe to profile
+        column_versions (dict): Mapping of column name to version token; columns
+            without a token are profiled without caching
+        max_workers (int): Thread pool size, defaults to the CPU count (max 8)
+
+    Returns:
+        dict: Mapping of column name to its profile, in column order
+    """
+    column_versions = column_versions or {}
+    profiles = {}
+    missing = []
+
+    for col in df.columns:
+        version = column_versions.get(col)
+        cached = _profile_cache.get((col, version)) if version is not None else None
+        if cached is not None:
+            profiles[col] = cached
+        else:
+            missing.append(col)
+
+    computed = []
+    if missing and getattr(df, 'out_of_core', False):
+        # Query-backed frames profile every column in a single aggregate scan
+        computed = df.profile(missing)
+        computed = [computed[col] for col in missing]
+    elif missing:
+        workers = max_workers or min(8, os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=min(workers, len(missing))) as pool:
+            computed = list(pool.map(lambda col: profile_column(df[col]), missing))
+
+    for col, profile in zip(missing, computed):
+        profiles[col] = profile
+        if column_versions.get(col) is not None:
+            _profile_cache.put((col, column_versions[col]), profile)
+
+    return {col: profiles[col] for col in df.columns}
+
+
+def describe_table(profiles):
+    """
+    Build a df.describe()-style summary table from column profiles.
+
+    Numeric columns get count/mean/std/min/quartiles/max; when there are no
+    numeric columns, text columns get count/unique/top/freq instead.
+
+    Args:
+        profiles (dict): Output of profile_frame
+
+    Returns:
+        pd.DataFrame: Summary table with one column per profiled column
+    """
+    numeric = {col: p for col, p in profiles.items() if p['numeric']}
+    if numeric:
+        rows = {}
+        for col, p in numeric.items():
+            quantiles = p.get('quantiles', {})
+            rows[col] = {
+                'count': float(p['count']),
+                'mean': p.get('mean', np.nan),
+                'std': p.get('std', np.nan),
+                'min': p.get('min', np.nan),
+                '25%': quantiles.get(0.25, np.nan),
+                '50%': quantiles.get(0.5, np.nan),
+                '75%': quantiles.get(0.75, np.nan),
+                'max': p.get('max', np.nan),
+            }
+        return pd.DataFrame(rows)
+
+    rows = {}
+    for col, p in profiles.items():
+        top_value, top_count = p['top_values'][0] if p['top_values'] else (None, None)
+        rows[col] = {
+            'count': p['count'],
+            'unique': p['distinct_approx'],
+            'top': top_value,
+            'freq': top_count,
+        }
+    return pd.DataFrame(rows)
+
+
+def dtype_counts(profiles):
+    """
+    Count columns per dtype from profiles.
+
+    Args:
+        profiles (dict): Output of profile_frame
+
+    Returns:
+        pd.Series: Number of columns per dtype name
+    """
+    return pd.Series([p['dtype'] for p in profiles.values()], dtype=object).value_counts()
@@ -0,0 +1,146 @@
+"""
+Reader registry for supported input formats.
+
+Each format is registered under a name with a reader function taking the
+uploaded file (or a path) plus an optional list of columns to load. File
+suffixes map to a (format, compression) pair, so loading is dispatched by
+format instead of a chain of extension checks.
+"""
+import pandas as pd
+
+from utils.excel import read_sheet
+
+# Longest suffixes first so ".csv.gz" wins over ".gz"-less matches
+FILE_SUFFIXES = {
+    '.csv.gz': ('csv', 'gzip'),
+    '.csv.zst': ('csv', 'zstd'),
+    '.csv': ('csv', None),
+    '.xlsx': ('excel', None),
+    '.xls': ('excel', None),
+    '.parquet': ('parquet', None),
+    '.pq': ('parquet', None),
+    '.feather': ('feather', None),
+    '.arrow': ('feather', None),
+}
+
+
+def zstd_available():
+    """Return True if the zstandard package needed for .csv.zst files can be imported."""
+    try:
+        import zstandard  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def require_codec(compression):
+    """
+    Fail early with an actionable message when a compression codec is not installed.
+
+    Args:
+        compression (str): Compression from detect_format
+
+    Raises:
+        ValueError: If the codec's package is missing
+    """
+    if compression == 'zstd' and not zstd_available():
+        raise ValueError("Reading .csv.zst files requires the zstandard package: pip install zstandard")
+
+
+def detect_format(filename):
+    """
+    Work out the reader format and compression from a filename.
+
+    Args:
+        filename (str): File name or path
+
+    Returns:
+        tuple: (format name, compression) or (None, None) if unsupported
+    """
+    name = filename.lower()
+    for suffix in sorted(FILE_SUFFIXES, key=len, reverse=True):
+        if name.endswith(suffix):
+            return FILE_SUFFIXES[suffix]
+    return None, None
+
+
+def strip_suffix(filename):
+    """
+    Remove a supported data suffix (including compression) from a filename.
+
+    Args:
+        filename (str): File name
+
+    Returns:
+        str: File name without its data suffix
+    """
+    name = filename.lower()
+    for suffix in sorted(FILE_SUFFIXES, key=len, reverse=True):
+        if name.endswith(suffix):
+            return filename[:-len(suffix)]
+    return filename
+
+
+def read_csv(source, columns=None, compression=None, **options):
+    """Read a (possibly compressed) CSV file."""
+    return pd.read_csv(source, usecols=columns, compression=compression, **options)
+
+
+def read_excel(source, columns=None, compression=None, sheet_name=0, **options):
+    """Read one sheet of an Excel workbook (the first by default) with the fastest available engine."""
+    return read_sheet(source, sheet_name, columns=columns, **options)
+
+
+def read_parquet(source, columns=None, compression=None, **options):
+    """Read a Parquet file, loading only the requested columns."""
+    return pd.read_parquet(source, columns=columns, **options)
+
+
+def read_feather(source, columns=None, compression=None, **options):
+    """
+    Read a Feather / Arrow IPC file.
+
+    Paths are memory-mapped; uploaded buffers are read zero-copy from their
+    existing memory instead of being copied into a new bytes object.
+    """
+    import pyarrow as pa
+    from pyarrow import feather
+
+    if isinstance(source, str):
+        table = feather.read_table(source, columns=columns, memory_map=True)
+    else:
+        buffer = source.getbuffer() if hasattr(source, 'getbuffer') else source.read()
+        table = feather.read_table(pa.BufferReader(pa.py_buffer(buffer)), columns=columns)
+    return table.to_pandas(**options)
+
+
+READERS = {
+    'csv': read_csv,
+    'excel': read_excel,
+    'parquet': read_parquet,
+    'feather': read_feather,
+}
+
+
+def read_file(source, filename=None, columns=None, **options):
+    """
+    Read a supported file by dispatching on its format.
+
+    Args:
+        source: Uploaded file object or path
+        filename (str): Name used for format detection, defaults to source.name or the path
+        columns (list): Optional subset of columns to load
+        **options: Extra keyword arguments for the reader
+
+    Returns:
+        pd.DataFrame: Loaded dataframe
+
+    Raises:
+        ValueError: If the format is not supported or its compression codec is not installed
+    """
+    filename = filename or getattr(source, 'name', source)
+    file_format, compression = detect_format(filename)
+    if file_format is None:
+        raise ValueError(f"Unsupported file type: {filename}")
+    require_codec(compression)
+    return READERS[file_format](source, columns=columns, compression=compression, **options)
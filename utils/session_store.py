@@ -0,0 +1,411 @@
+"""
+Process-wide accounting and eviction for dataframes held by Streamlit sessions.
+
+Every session keeps its uploaded frames in a SessionFrames mapping backed by
+one shared SessionStore. The store records the deep memory use of each frame
+and enforces a single budget for the whole process: once resident frames
+exceed it, the least recently used ones (from any session) are spilled to
+local Parquet files and transparently reloaded on the next access. Frames a
+session touches during a script rerun stay loaded until the rerun ends, so
+later stages of the same rerun never reload what an earlier stage spilled.
+Caches attached to idle sessions (cleaning results, explorer indexes) count
+against the same budget and are cleared if spilling frames is not enough.
+"""
+import atexit
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from collections.abc import MutableMapping
+from contextlib import contextmanager
+
+import pandas as pd
+
+from utils import settings
+from utils.dtypes import memory_bytes
+
+
+def current_session_id():
+    """
+    Identify the Streamlit session running the current script.
+
+    Returns:
+        str: Session id, or "local" outside a Streamlit script run
+    """
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        ctx = get_script_run_ctx()
+    except ImportError:
+        ctx = None
+    return ctx.session_id if ctx is not None else "local"
+
+
+def session_liveness():
+    """
+    Get a check for whether a Streamlit session is still connected.
+
+    Returns:
+        callable or None: Predicate taking a session id, or None when no runtime is running
+    """
+    try:
+        from streamlit import runtime
+        if not runtime.exists():
+            return None
+        return runtime.get_instance().is_active_session
+    except (ImportError, RuntimeError):
+        return None
+
+
+class _Entry:
+    """Bookkeeping for one stored frame."""
+
+    __slots__ = ('frame', 'memory_bytes', 'path', 'disk_bytes', 'last_access')
+
+    def __init__(self, frame, size):
+        self.frame = frame
+        self.memory_bytes = size
+        self.path = None
+        self.disk_bytes = 0
+        self.last_access = time.monotonic()
+
+
+class SessionStore:
+    """
+    Frames of every session with a shared memory budget and Parquet spilling.
+    """
+
+    def __init__(self, spill_dir, budget_bytes):
+        self.spill_dir = spill_dir
+        self.budget_bytes = budget_bytes
+        self.spills = 0
+        self.reloads = 0
+        self._entries = {}  # (session_id, namespace, key) -> _Entry, in insertion order
+        self._caches = {}  # session_id -> {cache name: cache with current_bytes and clear()}
+        self._last_seen = {}  # session_id -> monotonic time of the last access
+        self._pinned = {}  # session_id -> (nesting depth, entry keys touched by the running rerun)
+        self._lock = threading.RLock()
+
+    @property
+    def resident_bytes(self):
+        """int: Memory used by frames that are currently loaded."""
+        return sum(entry.memory_bytes for entry in self._entries.values() if entry.frame is not None)
+
+    def put(self, session_id, namespace, key, frame):
+        """
+        Store a frame, spilling older frames if the budget is exceeded.
+
+        Args:
+            session_id (str): Owning session
+            namespace (str): Group of frames within the session, e.g. "dataframes"
+            key (str): Frame name, usually the file key
+            frame (pd.DataFrame): Frame to store
+        """
+        # Query-backed frames live on disk already and cost no memory here
+        size = 0 if getattr(frame, 'out_of_core', False) else memory_bytes(frame)
+        with self._lock:
+            old = self._entries.pop((session_id, namespace, key), None)
+            if old is not None:
+                self._remove_file(old.path)
+            self._entries[(session_id, namespace, key)] = _Entry(frame, size)
+            self._last_seen[session_id] = time.monotonic()
+            self._touch(session_id, namespace, key)
+            self._enforce_budget(keep=(session_id, namespace, key))
+
+    def get(self, session_id, namespace, key):
+        """
+        Fetch a frame, reloading it from its spill file if needed.
+
+        Args:
+            session_id (str): Owning session
+            namespace (str): Group of frames within the session
+            key (str): Frame name
+
+        Returns:
+            pd.DataFrame: Stored frame
+
+        Raises:
+            KeyError: If no such frame is stored
+        """
+        with self._lock:
+            entry = self._entries[(session_id, namespace, key)]
+            entry.last_access = self._last_seen[session_id] = time.monotonic()
+            self._touch(session_id, namespace, key)
+            if entry.frame is None:
+                entry.frame = self._read_spill(entry.path)
+                self._remove_file(entry.path)
+                entry.path, entry.disk_bytes = None, 0
+                self.reloads += 1
+                self._enforce_budget(keep=(session_id, namespace, key))
+            return entry.frame
+
+    @contextmanager
+    def rerun(self, session_id):
+        """
+        Keep every frame a session reads or stores loaded until its script rerun ends.
+
+        The budget may be exceeded while the rerun holds its frames; it is
+        enforced again as soon as the block exits.
+
+        Args:
+            session_id (str): Session whose script is running
+        """
+        with self._lock:
+            depth, touched = self._pinned.get(session_id, (0, set()))
+            self._pinned[session_id] = (depth + 1, touched)
+        try:
+            yield
+        finally:
+            with self._lock:
+                depth, touched = self._pinned[session_id]
+                if depth > 1:
+                    self._pinned[session_id] = (depth - 1, touched)
+                else:
+                    del self._pinned[session_id]
+                    self._enforce_budget(keep=None)
+
+    def remove(self, session_id, namespace, key):
+        """Forget a frame and delete its spill file."""
+        with self._lock:
+            entry = self._entries.pop((session_id, namespace, key))
+            self._remove_file(entry.path)
+
+    def keys(self, session_id, namespace):
+        """
+        List stored frame names in insertion order.
+
+        Args:
+            session_id (str): Owning session
+            namespace (str): Group of frames within the session
+
+        Returns:
+            list: Frame names
+        """
+        with self._lock:
+            return [key for (sid, ns, key) in self._entries if sid == session_id and ns == namespace]
+
+    def attach_cache(self, session_id, cache, name="pipeline"):
+        """
+        Register a session's cache so its memory is accounted and can be reclaimed.
+
+        Args:
+            session_id (str): Owning session
+            cache: Object with a current_bytes attribute and a clear() method,
+                e.g. a PipelineCache or a FrameIndex
+            name (str): Name of the cache within the session; attaching another
+                cache under the same name replaces it
+        """
+        with self._lock:
+            self._caches.setdefault(session_id, {})[name] = cache
+            self._last_seen.setdefault(session_id, time.monotonic())
+
+    def detach_cache(self, session_id, name):
+        """Stop accounting a session's cache, e.g. when the file it belongs to is removed."""
+        with self._lock:
+            caches = self._caches.get(session_id, {})
+            caches.pop(name, None)
+            if not caches:
+                self._caches.pop(session_id, None)
+
+    def drop_session(self, session_id):
+        """Forget every frame and cache of a session."""
+        with self._lock:
+            for entry_key in [entry_key for entry_key in self._entries if entry_key[0] == session_id]:
+                self._remove_file(self._entries.pop(entry_key).path)
+            self._caches.pop(session_id, None)
+            self._last_seen.pop(session_id, None)
+            if session_id in self._pinned:
+                self._pinned[session_id][1].clear()
+        shutil.rmtree(os.path.join(self.spill_dir, session_id), ignore_errors=True)
+
+    def prune(self, is_active):
+        """
+        Drop the data of sessions that have disconnected.
+
+        Args:
+            is_active (callable): Predicate telling whether a session id is still
+                connected, e.g. from session_liveness(); None skips pruning
+
+        Returns:
+            int: Number of sessions dropped
+        """
+        if is_active is None:
+            return 0
+        with self._lock:
+            known = {entry_key[0] for entry_key in self._entries} | set(self._caches)
+        ended = [session_id for session_id in known if not is_active(session_id)]
+        for session_id in ended:
+            self.drop_session(session_id)
+        return len(ended)
+
+    def usage(self):
+        """
+        Summarize memory use per session.
+
+        Returns:
+            dict: Session id -> frames, spilled frames, memory bytes, disk bytes,
+                cache bytes and idle seconds
+        """
+        now = time.monotonic()
+        with self._lock:
+            sessions = {}
+            for (session_id, _, _), entry in self._entries.items():
+                row = sessions.setdefault(session_id, self._empty_usage())
+                row['frames'] += 1
+                if entry.frame is None:
+                    row['spilled'] += 1
+                    row['disk_bytes'] += entry.disk_bytes
+                else:
+                    row['memory_bytes'] += entry.memory_bytes
+            for session_id, caches in self._caches.items():
+                sessions.setdefault(session_id, self._empty_usage())['cache_bytes'] = sum(
+                    cache.current_bytes for cache in caches.values()
+                )
+            for session_id, row in sessions.items():
+                row['idle_seconds'] = now - self._last_seen.get(session_id, now)
+            return sessions
+
+    def stats(self):
+        """
+        Summarize the store as a whole.
+
+        Returns:
+            dict: Resident and cached bytes, budget, spill and reload counters
+        """
+        with self._lock:
+            return {
+                'resident_bytes': self.resident_bytes,
+                'cache_bytes': self._cache_bytes(),
+                'budget_bytes': self.budget_bytes,
+                'spills': self.spills,
+                'reloads': self.reloads,
+            }
+
+    @staticmethod
+    def _empty_usage():
+        return {'frames': 0, 'spilled': 0, 'memory_bytes': 0, 'disk_bytes': 0, 'cache_bytes': 0}
+
+    def _cache_bytes(self):
+        return sum(cache.current_bytes for caches in self._caches.values() for cache in caches.values())
+
+    def _touch(self, session_id, namespace, key):
+        pinned = self._pinned.get(session_id)
+        if pinned is not None:
+            pinned[1].add((session_id, namespace, key))
+
+    def _enforce_budget(self, keep):
+        """Spill least recently used frames, then clear the caches of idle sessions, until under budget."""
+        # Frames in use by a running rerun are not spilled; keep is the frame being stored or reloaded
+        pinned = {keep} if keep is not None else set()
+        for _, touched in self._pinned.values():
+            pinned |= touched
+        cache_bytes = self._cache_bytes()
+        if self.resident_bytes + cache_bytes <= self.budget_bytes:
+            return
+
+        victims = sorted(
+            (entry.last_access, entry_key) for entry_key, entry in self._entries.items()
+            if entry.frame is not None and entry.memory_bytes and entry_key not in pinned
+        )
+        for _, entry_key in victims:
+            if not self._spill(entry_key):
+                continue
+            if self.resident_bytes + cache_bytes <= self.budget_bytes:
+                return
+
+        # Cleaning results and indexes can be recomputed, so the idlest sessions give them up last
+        for session_id in sorted(self._caches, key=lambda sid: self._last_seen.get(sid, 0)):
+            if (keep and session_id == keep[0]) or session_id in self._pinned:
+                continue
+            for cache in self._caches[session_id].values():
+                cache.clear()
+            cache_bytes = self._cache_bytes()
+            if self.resident_bytes + cache_bytes <= self.budget_bytes:
+                return
+
+    def _spill(self, entry_key):
+        """
+        Write a resident frame to disk and release it from memory.
+
+        Returns:
+            bool: False if the frame has columns Arrow cannot represent and stays loaded
+        """
+        entry = self._entries[entry_key]
+        session_dir = os.path.join(self.spill_dir, entry_key[0])
+        os.makedirs(session_dir, mode=0o700, exist_ok=True)
+        path = os.path.join(session_dir, uuid.uuid4().hex + ".parquet")
+        try:
+            entry.frame.to_parquet(path)
+        except (ValueError, TypeError, NotImplementedError):
+            self._remove_file(path)
+            return False
+        entry.path, entry.disk_bytes = path, os.path.getsize(path)
+        entry.frame = None
+        self.spills += 1
+        return True
+
+    @staticmethod
+    def _read_spill(path):
+        # Only paths this store wrote itself are read, and only as Parquet
+        return pd.read_parquet(path)
+
+    @staticmethod
+    def _remove_file(path):
+        if path is None:
+            return
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+class SessionFrames(MutableMapping):
+    """
+    Dict-like view of one session's frames in a SessionStore.
+
+    Reads reload spilled frames on demand, so callers can treat it as a
+    plain dict of dataframes.
+    """
+
+    def __init__(self, store, session_id, namespace):
+        self.store = store
+        self.session_id = session_id
+        self.namespace = namespace
+
+    def __getitem__(self, key):
+        return self.store.get(self.session_id, self.namespace, key)
+
+    def __setitem__(self, key, frame):
+        self.store.put(self.session_id, self.namespace, key, frame)
+
+    def __delitem__(self, key):
+        self.store.remove(self.session_id, self.namespace, key)
+
+    def __iter__(self):
+        return iter(self.store.keys(self.session_id, self.namespace))
+
+    def __len__(self):
+        return len(self.store.keys(self.session_id, self.namespace))
+
+
+_session_store = None
+_session_store_lock = threading.Lock()
+
+
+def get_session_store():
+    """
+    Return the process-wide session store, creating it on first use.
+
+    Returns:
+        SessionStore: Store configured from utils.settings
+    """
+    global _session_store
+    with _session_store_lock:
+        if _session_store is None:
+            # A private directory per process, so no other user can read or replace spill files
+            os.makedirs(settings.CACHE_DIR, mode=0o700, exist_ok=True)
+            spill_dir = tempfile.mkdtemp(prefix="sessions-", dir=settings.CACHE_DIR)
+            atexit.register(shutil.rmtree, spill_dir, True)
+            _session_store = SessionStore(spill_dir, settings.SESSION_MEMORY_BUDGET_BYTES)
+        return _session_store
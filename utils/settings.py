@@ -0,0 +1,81 @@
+"""
+Runtime settings for the Data Sweeper application.
+
+Every value can be overridden through an environment variable so that
+deployments can tune the app without code changes.
+"""
+import os
+import tempfile
+
+
+def _env_int(name, default):
+    """
+    Read an integer setting from the environment.
+
+    Args:
+        name (str): Environment variable name
+        default (int): Value used when the variable is unset or invalid
+
+    Returns:
+        int: Parsed setting value
+    """
+    try:
+        return int(os.environ.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+# Directory holding columnar spill files for the parse cache
+CACHE_DIR = os.environ.get(
+    "DATA_SWEEPER_CACHE_DIR",
+    os.path.join(tempfile.gettempdir(), "data_sweeper_cache")
+)
+
+# Maximum number of bytes the parse cache may keep on disk (default 2 GiB)
+CACHE_MAX_BYTES = _env_int("DATA_SWEEPER_CACHE_MAX_BYTES", 2 * 1024 ** 3)
+
+# Rows parsed per chunk when streaming CSV uploads
+CSV_CHUNK_ROWS = _env_int("DATA_SWEEPER_CSV_CHUNK_ROWS", 100_000)
+
+# CSV uploads at least this large are streamed in chunks (default 16 MiB)
+CSV_STREAMING_MIN_BYTES = _env_int("DATA_SWEEPER_CSV_STREAMING_MIN_BYTES", 16 * 1024 ** 2)
+
+# Memory all sessions' uploaded frames and cleaning results may use before the
+# least recently used frames are spilled to disk (default 8 GiB)
+SESSION_MEMORY_BUDGET_BYTES = _env_int("DATA_SWEEPER_SESSION_MEMORY_BUDGET_BYTES", 8 * 1024 ** 3)
+
+# Show the per-session memory panel in the sidebar (set to 1 on admin deployments)
+ADMIN_PANEL = bool(_env_int("DATA_SWEEPER_ADMIN_PANEL", 0))
+
+# Port serving stage metrics in Prometheus text format at /metrics (0 disables it)
+METRICS_PORT = _env_int("DATA_SWEEPER_METRICS_PORT", 0)
+
+# Pre-import heavy dependencies and build throwaway figures in the background at startup
+WARMUP = bool(_env_int("DATA_SWEEPER_WARMUP", 1))
+
+# Peak memory loading or combining files may reach (default 4 GiB)
+MEMORY_CEILING_BYTES = _env_int("DATA_SWEEPER_MEMORY_CEILING_BYTES", 4 * 1024 ** 3)
+
+# Maximum number of points sent to the browser per chart before server-side reduction
+CHART_POINT_BUDGET = _env_int("DATA_SWEEPER_CHART_POINT_BUDGET", 5_000)
+
+# Memory the preview explorer may spend on sort orders and indexes per file (default 512 MiB)
+EXPLORER_INDEX_BUDGET_BYTES = _env_int("DATA_SWEEPER_EXPLORER_INDEX_BUDGET_BYTES", 512 * 1024 ** 2)
+
+# Rows serialized per chunk when exporting files
+EXPORT_CHUNK_ROWS = _env_int("DATA_SWEEPER_EXPORT_CHUNK_ROWS", 50_000)
+
+# Zip members larger than this spill from memory to a temporary file while serialized (default 32 MiB)
+EXPORT_SPOOL_BYTES = _env_int("DATA_SWEEPER_EXPORT_SPOOL_BYTES", 32 * 1024 ** 2)
+
+# Right-hand join inputs at least this large are joined in chunks (default 256 MiB)
+JOIN_CHUNK_MIN_BYTES = _env_int("DATA_SWEEPER_JOIN_CHUNK_MIN_BYTES", 256 * 1024 ** 2)
+
+# Left rows joined per chunk by the chunked join strategy
+JOIN_CHUNK_ROWS = _env_int("DATA_SWEEPER_JOIN_CHUNK_ROWS", 250_000)
+
+# Worker threads used for per-file work such as parsing, cleaning and export
+WORKER_COUNT = _env_int("DATA_SWEEPER_WORKERS", min(8, os.cpu_count() or 1))
+
+# Memory limit handed to the embedded DuckDB engine for out-of-core files
+DUCKDB_MEMORY_LIMIT = os.environ.get("DATA_SWEEPER_DUCKDB_MEMORY_LIMIT", "2GB")
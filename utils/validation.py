@@ -0,0 +1,484 @@
+"""
+Upload sniffing and declarative, vectorized data validation.
+
+sniff_csv inspects the first bytes of a CSV file to detect its encoding,
+delimiter, header and ragged rows before anything is parsed. Column rules
+are plain dicts, e.g.
+``{'age': {'type': 'integer', 'min': 0, 'max': 120, 'not_null': True},
+'email': {'regex': r'[^@]+@[^@]+', 'unique': True}}``, checked with whole-column
+pandas/numpy operations one chunk at a time, so a CSV can be validated while
+it streams through the same chunked reader the app loads it with.
+"""
+import codecs
+import csv
+import gzip
+import io
+import itertools
+import json
+import re
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from utils.csv_stream import iter_csv_chunks
+from utils.dedup import SortedHashSet
+from utils.readers import detect_format, read_file, require_codec
+
+SNIFF_BYTES = 64 * 1024
+
+SNIFF_DELIMITERS = ",;\t|"
+
+# Characters of the sample used to pick the delimiter
+SNIFF_HEAD_CHARS = 8192
+
+# Rows of the sample used to detect a header
+SNIFF_HEADER_ROWS = 50
+
+RULE_TYPES = ('integer', 'float', 'number', 'string', 'boolean', 'datetime')
+
+RULE_KEYS = ('type', 'min', 'max', 'regex', 'allowed', 'unique', 'not_null')
+
+BOOLEAN_STRINGS = ('true', 'false', 'yes', 'no', 't', 'f', 'y', 'n', '1', '0', '1.0', '0.0')
+
+# Offending rows kept per violated rule
+SAMPLE_ROWS = 5
+
+
+def _read_sample(source, compression, sample_bytes):
+    """Read the first (decompressed) bytes of a file and rewind it."""
+    if isinstance(source, str):
+        with open(source, 'rb') as handle:
+            return _read_sample(handle, compression, sample_bytes)
+    require_codec(compression)
+    source.seek(0)
+    try:
+        if compression == 'gzip':
+            return gzip.GzipFile(fileobj=source).read(sample_bytes)
+        if compression == 'zstd':
+            import zstandard
+            return zstandard.ZstdDecompressor().stream_reader(source).read(sample_bytes)
+        return source.read(sample_bytes)
+    finally:
+        source.seek(0)
+
+
+def _decode_sample(sample, truncated):
+    """Guess the encoding of a byte sample and decode it."""
+    if sample.startswith(codecs.BOM_UTF8):
+        encoding = 'utf-8-sig'
+    elif sample.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return 'utf-16', sample.decode('utf-16', errors='ignore')
+    else:
+        encoding = None
+    if truncated and b"\n" in sample:
+        # Drop the last, possibly cut, line (and any cut multi-byte character)
+        sample = sample[:sample.rindex(b"\n") + 1]
+    for candidate in ([encoding] if encoding else ['utf-8', 'cp1252']):
+        try:
+            return candidate, sample.decode(candidate)
+        except UnicodeDecodeError:
+            continue
+    return 'latin-1', sample.decode('latin-1')
+
+
+def _field_counts(text, delimiter):
+    """Number of fields in each non-empty line of a text sample."""
+    return np.array([len(row) for row in csv.reader(io.StringIO(text), delimiter=delimiter) if row], dtype=np.int64)
+
+
+def _detect_delimiter(text):
+    """
+    Pick the candidate delimiter that splits the most lines into the same number of fields.
+
+    Unlike csv.Sniffer this tolerates a few ragged lines in the sample.
+    """
+    best, best_score = ',', (0.0, 0)
+    for delimiter in SNIFF_DELIMITERS:
+        counts = _field_counts(text, delimiter)
+        if not len(counts):
+            continue
+        modal = int(np.bincount(counts).argmax())
+        if modal < 2:
+            continue
+        score = (float(np.mean(counts == modal)), modal)
+        if score > best_score:
+            best, best_score = delimiter, score
+    return best
+
+
+def _is_number(text):
+    try:
+        float(text)
+        return True
+    except ValueError:
+        return False
+
+
+def _has_header(rows):
+    """
+    Decide whether the first row is a header.
+
+    Only a number in the first row of a column that is numeric further down
+    counts as evidence against a header, so text-only files keep theirs.
+    """
+    if len(rows) < 2:
+        return True
+    first, rest = rows[0], rows[1:]
+    for i, value in enumerate(first):
+        below = [row[i] for row in rest if len(row) > i and row[i] != '']
+        if below and all(_is_number(cell) for cell in below):
+            return not _is_number(value)
+    return True
+
+
+def sniff_csv(source, compression=None, sample_bytes=SNIFF_BYTES):
+    """
+    Detect the layout of a CSV file from its first bytes, without parsing it.
+
+    Args:
+        source: Uploaded file object or path
+        compression (str): None, "gzip" or "zstd"
+        sample_bytes (int): Number of (decompressed) bytes to inspect
+
+    Returns:
+        dict: 'encoding', 'delimiter', 'has_header', 'columns'
+            (header names or None), 'field_count', 'rows_sampled' and
+            'ragged_lines' (1-based line numbers whose field count differs)
+    """
+    sample = _read_sample(source, compression, sample_bytes)
+    encoding, text = _decode_sample(sample, truncated=len(sample) >= sample_bytes)
+
+    delimiter = _detect_delimiter(text[:SNIFF_HEAD_CHARS])
+    rows = list(itertools.islice(csv.reader(io.StringIO(text), delimiter=delimiter), SNIFF_HEADER_ROWS))
+    has_header = _has_header([row for row in rows if row])
+    counts = _field_counts(text, delimiter)
+    field_count = int(np.bincount(counts).argmax()) if len(counts) else 0
+    ragged = (np.flatnonzero(counts != field_count) + 1).tolist()
+    return {
+        'encoding': encoding,
+        'delimiter': delimiter,
+        'has_header': has_header,
+        'columns': rows[0] if rows and has_header else None,
+        'field_count': field_count,
+        'rows_sampled': len(counts),
+        'ragged_lines': ragged,
+    }
+
+
+def csv_read_options(sniffed):
+    """
+    Translate sniff_csv results into pd.read_csv options that differ from the defaults.
+
+    Args:
+        sniffed (dict): Result of sniff_csv
+
+    Returns:
+        dict: Keyword arguments for pd.read_csv
+    """
+    options = {}
+    if sniffed['delimiter'] != ',':
+        options['sep'] = sniffed['delimiter']
+    if sniffed['encoding'] not in ('utf-8', 'utf-8-sig'):
+        options['encoding'] = sniffed['encoding']
+    if not sniffed['has_header']:
+        options['header'] = None
+    return options
+
+
+def check_rules(rules):
+    """
+    Check a rule set before running it.
+
+    Args:
+        rules (dict): Column name -> rule spec with any of RULE_KEYS
+
+    Returns:
+        dict: Copies of the rule specs
+
+    Raises:
+        ValueError: If a rule key, type or pattern is invalid
+    """
+    checked = {}
+    for col, spec in rules.items():
+        unknown = set(spec) - set(RULE_KEYS)
+        if unknown:
+            raise ValueError(f"Unknown rules for {col!r}: {sorted(unknown)}")
+        if spec.get('type') and spec['type'] not in RULE_TYPES:
+            raise ValueError(f"Unknown type for {col!r}: {spec['type']}")
+        spec = dict(spec)
+        if spec.get('regex'):
+            try:
+                re.compile(spec['regex'])
+            except re.error as e:
+                raise ValueError(f"Invalid pattern for {col!r}: {e}") from e
+        checked[col] = spec
+    return checked
+
+
+def _numbers(series):
+    """View a column as numbers, with non-numeric values as NaN."""
+    if pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype):
+        return series
+    return pd.to_numeric(series, errors='coerce')
+
+
+def _datetimes(series):
+    """View a column as timestamps, with unparseable values as NaT."""
+    if pd.api.types.is_datetime64_any_dtype(series.dtype):
+        return series
+    # The format is inferred once from the first value and applied vectorized;
+    # values in other formats count as invalid
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', UserWarning)
+        return pd.to_datetime(series, errors='coerce')
+
+
+def _type_violations(series, expected, present):
+    """Mask of non-null values that do not have the expected type."""
+    dtype = series.dtype
+    if expected == 'string':
+        if dtype == object:
+            return present & ~series.map(type).eq(str)
+        return np.zeros(len(series), dtype=bool)
+    if expected == 'boolean':
+        if pd.api.types.is_bool_dtype(dtype):
+            return np.zeros(len(series), dtype=bool)
+        normalized = series.astype('str').str.strip().str.lower()
+        return present & ~normalized.isin(BOOLEAN_STRINGS)
+    if expected == 'datetime':
+        return present & _datetimes(series).isna()
+
+    if pd.api.types.is_bool_dtype(dtype):
+        return present
+    numbers = _numbers(series)
+    bad = present & numbers.isna()
+    if expected == 'integer' and not pd.api.types.is_integer_dtype(numbers.dtype):
+        bad |= (numbers % 1).fillna(0) != 0
+    return bad
+
+
+def _range_violations(series, spec):
+    """Mask of values below 'min' or above 'max'."""
+    low, high = spec.get('min'), spec.get('max')
+    if spec.get('type') == 'datetime' or pd.api.types.is_datetime64_any_dtype(series.dtype):
+        values = _datetimes(series)
+        low = pd.Timestamp(low) if low is not None else None
+        high = pd.Timestamp(high) if high is not None else None
+    else:
+        values = _numbers(series)
+    bad = np.zeros(len(series), dtype=bool)
+    if low is not None:
+        bad |= (values < low).fillna(False).to_numpy(dtype=bool)
+    if high is not None:
+        bad |= (values > high).fillna(False).to_numpy(dtype=bool)
+    return bad
+
+
+def _regex_violations(series, pattern, present):
+    """Mask of non-null values that do not fully match a pattern."""
+    text = series if pd.api.types.is_string_dtype(series.dtype) and series.dtype != object else series.astype('str')
+    return present & ~text.str.fullmatch(pattern).fillna(False).astype(bool)
+
+
+class _Accumulator:
+    """Counts and sampled rows of one violated rule, gathered across chunks."""
+
+    def __init__(self, column, rule, expected):
+        self.column = column
+        self.rule = rule
+        self.expected = expected
+        self.count = 0
+        self.samples = []
+
+    def add(self, chunk, mask, offset, sample_size):
+        positions = np.flatnonzero(np.asarray(mask, dtype=bool))
+        if not len(positions):
+            return
+        self.count += len(positions)
+        needed = sample_size - len(self.samples)
+        if needed > 0:
+            rows = chunk.iloc[positions[:needed]]
+            for position, record in zip(positions[:needed], rows.to_dict('records')):
+                self.samples.append({'row': int(offset + position), **record})
+
+    def report(self):
+        return {
+            'column': self.column,
+            'rule': self.rule,
+            'expected': self.expected,
+            'violations': self.count,
+            'sample': self.samples,
+        }
+
+
+def _describe_rule(rule, spec):
+    """Short human-readable statement of what a rule expects."""
+    if rule == 'type':
+        return spec['type']
+    if rule == 'range':
+        low = spec.get('min')
+        high = spec.get('max')
+        if low is not None and high is not None:
+            return f"between {low} and {high}"
+        return f">= {low}" if low is not None else f"<= {high}"
+    if rule == 'regex':
+        return f"matches {spec['regex']}"
+    if rule == 'allowed':
+        return f"one of {list(spec['allowed'])}"
+    return {'unique': "no repeated values", 'not_null': "no missing values"}[rule]
+
+
+def validate_chunks(chunks, rules, sample_size=SAMPLE_ROWS):
+    """
+    Check column rules over a sequence of dataframe chunks.
+
+    Each rule is one vectorized pass over the chunk's column. Uniqueness is
+    exact within a chunk and uses 64-bit value hashes across chunks; the first
+    occurrence of a value is valid and every repeat is a violation.
+
+    Args:
+        chunks (iterable): DataFrames sharing the same columns, in row order
+        rules (dict): Column name -> rule spec, see check_rules
+        sample_size (int): Offending rows kept per violated rule
+
+    Returns:
+        dict: 'rows' checked, 'passed', 'missing_columns' and a list of
+            'violations' with 'column', 'rule', 'expected', 'violations'
+            (count) and 'sample' (offending rows with their 0-based 'row')
+    """
+    rules = check_rules(rules)
+    accumulators = {}
+    seen = {col: SortedHashSet() for col, spec in rules.items() if spec.get('unique')}
+    unseen = {}  # hashes of the previous chunk, added to seen only if another chunk follows
+    missing_columns = None
+    rows = 0
+
+    def accumulate(col, rule, spec, chunk, mask):
+        key = (col, rule)
+        if key not in accumulators:
+            accumulators[key] = _Accumulator(col, rule, _describe_rule(rule, spec))
+        accumulators[key].add(chunk, mask, rows, sample_size)
+
+    for chunk in chunks:
+        if missing_columns is None:
+            missing_columns = [col for col in rules if col not in chunk.columns]
+        for col, spec in rules.items():
+            if col not in chunk.columns:
+                continue
+            series = chunk[col]
+            nulls = series.isna().to_numpy()
+            present = ~nulls
+            if spec.get('not_null'):
+                accumulate(col, 'not_null', spec, chunk, nulls)
+            if spec.get('type'):
+                accumulate(col, 'type', spec, chunk, _type_violations(series, spec['type'], present))
+            if spec.get('min') is not None or spec.get('max') is not None:
+                accumulate(col, 'range', spec, chunk, _range_violations(series, spec))
+            if spec.get('regex'):
+                accumulate(col, 'regex', spec, chunk, _regex_violations(series, spec['regex'], present))
+            if spec.get('allowed') is not None:
+                accumulate(col, 'allowed', spec, chunk, present & ~series.isin(list(spec['allowed'])).to_numpy())
+            if spec.get('unique'):
+                repeated = series.duplicated().to_numpy() & present
+                hashes = pd.util.hash_pandas_object(series, index=False).to_numpy()
+                if col in unseen:
+                    seen[col].add(unseen.pop(col))
+                if len(seen[col]):
+                    repeated |= seen[col].contains(hashes) & present
+                unseen[col] = hashes[present]
+                accumulate(col, 'unique', spec, chunk, repeated)
+        rows += len(chunk)
+
+    violations = [acc.report() for acc in accumulators.values() if acc.count]
+    missing_columns = missing_columns or []
+    return {
+        'rows': rows,
+        'passed': not violations and not missing_columns,
+        'missing_columns': missing_columns,
+        'violations': violations,
+    }
+
+
+def validate_frame(df, rules, sample_size=SAMPLE_ROWS, chunk_rows=None):
+    """
+    Check column rules on a loaded dataframe.
+
+    Query-backed frames (see utils/backends.py) are streamed in chunks
+    instead of being materialized.
+
+    Args:
+        df (pd.DataFrame): Data to check
+        rules (dict): Column name -> rule spec
+        sample_size (int): Offending rows kept per violated rule
+        chunk_rows (int): Rows per chunk for query-backed frames
+
+    Returns:
+        dict: Report, see validate_chunks
+    """
+    if getattr(df, 'out_of_core', False):
+        columns = [col for col in df.columns if col in rules]
+        projected = df.project(columns) if columns else df
+        return validate_chunks(projected.iter_chunks(chunk_rows), rules, sample_size)
+    return validate_chunks([df], rules, sample_size)
+
+
+def validate_csv(source, rules, compression=None, chunksize=None, sample_size=SAMPLE_ROWS, **read_options):
+    """
+    Check column rules on a CSV file while it streams, without keeping it in memory.
+
+    The delimiter, encoding and header are sniffed first unless given in read_options.
+
+    Args:
+        source: Uploaded file object or path
+        rules (dict): Column name -> rule spec
+        compression (str): None, "gzip" or "zstd"
+        chunksize (int): Rows per chunk, defaults to settings.CSV_CHUNK_ROWS
+        sample_size (int): Offending rows kept per violated rule
+        **read_options: Extra keyword arguments for pd.read_csv
+
+    Returns:
+        dict: Report, see validate_chunks, plus the 'sniffed' layout
+    """
+    sniffed = sniff_csv(source, compression)
+    options = {**csv_read_options(sniffed), **read_options}
+    if rules and options.get('header', 'infer') is not None:
+        # Only the ruled columns are parsed
+        options.setdefault('usecols', lambda name: name in rules)
+    report = validate_chunks(
+        iter_csv_chunks(source, chunksize, compression=compression, **options), rules, sample_size
+    )
+    report['sniffed'] = sniffed
+    return report
+
+
+def validate_path(path, rules, sample_size=SAMPLE_ROWS):
+    """
+    Check column rules on a file on disk, streaming CSV files in chunks.
+
+    Args:
+        path (str): Input file
+        rules (dict): Column name -> rule spec
+        sample_size (int): Offending rows kept per violated rule
+
+    Returns:
+        dict: Report, see validate_chunks
+    """
+    file_format, compression = detect_format(path)
+    if file_format == 'csv':
+        return validate_csv(path, rules, compression, sample_size=sample_size)
+    return validate_frame(read_file(path), rules, sample_size)
+
+
+def load_rules(path):
+    """
+    Load a rule set from a JSON file mapping column names to rule specs.
+
+    Args:
+        path (str): Path to the JSON file
+
+    Returns:
+        dict: Checked rules
+    """
+    with open(path, encoding='utf-8') as rules_file:
+        return check_rules(json.load(rules_file))
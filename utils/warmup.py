@@ -0,0 +1,133 @@
+"""
+Background warm-up of heavy dependencies and first-use work.
+
+Stage modules import plotly.express, xlsxwriter, openpyxl, pyarrow and duckdb
+only when their stage first runs, so a fresh process paints the upload page
+without them (streamlit itself imports plotly and plotly.graph_objects).
+warm_up() pays those imports and builds throwaway Plotly figures (the first
+figure of each kind validates Plotly's trace schema, which costs more than the
+import) ahead of time. Byte-compiling the project belongs to the image build
+or deploy step, not here, so the running app never writes to its own folder.
+start_warmup() runs it once per process on a daemon thread, either from
+serve.py before the server accepts connections or from the first script run.
+"""
+import importlib
+import threading
+import time
+
+# Optional packages warmed if installed, in rough order of first use
+WARMUP_MODULES = (
+    'numpy',
+    'pandas',
+    'pyarrow',
+    'pyarrow.parquet',
+    'plotly.graph_objects',
+    'plotly.express',
+    'openpyxl',
+    'python_calamine',
+    'xlsxwriter',
+    'duckdb',
+)
+
+
+def _import_modules():
+    for name in WARMUP_MODULES:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            continue
+
+
+def _build_figures():
+    """Build and serialize one small figure per chart the visualizer draws."""
+    try:
+        import pandas as pd
+        import plotly.express as px
+        import plotly.graph_objects as go
+    except ImportError:
+        return
+    frame = pd.DataFrame({'x': [1.0, 2.0, 3.0], 'y': [3.0, 1.0, 2.0]})
+    figures = [
+        go.Figure(go.Bar(x=frame['x'], y=frame['y'])),
+        go.Figure(go.Box(x=["x"], q1=[1], median=[2], q3=[3], lowerfence=[1], upperfence=[3])),
+        go.Figure(go.Scattergl(x=frame['x'], y=frame['y'], mode='markers')),
+        go.Figure(go.Heatmap(z=[[1, 2], [3, 4]])),
+        px.histogram(frame, x='x'),
+        px.box(frame, y='y'),
+        px.scatter(frame, x='x', y='y'),
+        px.line(frame, y='y'),
+    ]
+    for fig in figures:
+        fig.update_layout(title="warm-up")
+        fig.to_json()
+
+
+WARMUP_STEPS = (
+    ('imports', _import_modules),
+    ('figures', _build_figures),
+)
+
+
+def warm_up(on_step=None):
+    """
+    Run every warm-up step in the calling thread.
+
+    A failing step is skipped; warm-up is only an optimization.
+
+    Args:
+        on_step (callable): Called with (step name, seconds) after each step
+
+    Returns:
+        dict: Step name -> seconds taken
+    """
+    timings = {}
+    for name, step in WARMUP_STEPS:
+        start = time.perf_counter()
+        try:
+            step()
+        except Exception:
+            pass
+        timings[name] = time.perf_counter() - start
+        if on_step is not None:
+            on_step(name, timings[name])
+    return timings
+
+
+_warmup_thread = None
+_warmup_timings = {}
+_warmup_lock = threading.Lock()
+
+
+def start_warmup():
+    """
+    Start warm_up() on a daemon thread, once per process.
+
+    Returns:
+        threading.Thread: The warm-up thread
+    """
+    global _warmup_thread
+    with _warmup_lock:
+        if _warmup_thread is None:
+            _warmup_thread = threading.Thread(
+                target=warm_up,
+                kwargs={'on_step': _warmup_timings.__setitem__},
+                name="data-sweeper-warmup",
+                daemon=True
+            )
+            _warmup_thread.start()
+        return _warmup_thread
+
+
+def warmup_status():
+    """
+    Report the progress of the background warm-up.
+
+    Returns:
+        dict: 'started' and 'done' flags, plus 'timings' of finished steps
+    """
+    thread = _warmup_thread
+    return {
+        'started': thread is not None,
+        'done': thread is not None and not thread.is_alive(),
+        'timings': dict(_warmup_timings),
+    }